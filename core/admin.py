@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Categoria, Ingrediente, Receita, Usuario, Perfil
+from .models import (
+    Categoria, Ingrediente, IngredienteReceita, Receita, Usuario, Perfil, GeracaoReceita, CacheGeracao,
+    ListaDeCompra, IngredienteListaCompra,
+)
 
 @admin.register(Perfil)
 class PerfilAdmin(admin.ModelAdmin):
@@ -15,20 +18,57 @@ class CategoriaAdmin(admin.ModelAdmin):
 @admin.register(Ingrediente)
 class IngredienteAdmin(admin.ModelAdmin):
     list_display = ('nome', 'categoria', 'caloria')
+    list_select_related = ('categoria',)
     search_fields = ('nome',)
     list_filter = ('categoria',)
     ordering = ('nome',)
 
+class IngredienteReceitaInline(admin.TabularInline):
+    model = IngredienteReceita
+    extra = 1
+    autocomplete_fields = ('ingrediente',)
+
 @admin.register(Receita)
 class ReceitaAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'tempo_preparo', 'is_ai_generated')
+    list_display = ('titulo', 'tempo_preparo', 'total_caloria', 'is_ai_generated')
     search_fields = ('titulo',)
     list_filter = ('is_ai_generated',)
-    readonly_fields = ('is_ai_generated',)
+    readonly_fields = ('is_ai_generated', 'total_caloria')
+    inlines = (IngredienteReceitaInline,)
 
 @admin.register(Usuario)
 class UsuarioAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'perfil', 'is_active')
+    list_select_related = ('perfil',)
     search_fields = ('username', 'email')
     list_filter = ('perfil', 'is_active')
     ordering = ('username',)
+
+class IngredienteListaCompraInline(admin.TabularInline):
+    model = IngredienteListaCompra
+    extra = 0
+    autocomplete_fields = ('ingrediente',)
+    readonly_fields = ('ocorrencias',)
+
+@admin.register(ListaDeCompra)
+class ListaDeCompraAdmin(admin.ModelAdmin):
+    list_display = ('id', 'usuario', 'data_inicio', 'data_fim', 'is_active')
+    list_select_related = ('usuario',)
+    list_filter = ('is_active',)
+    search_fields = ('usuario__username',)
+    inlines = (IngredienteListaCompraInline,)
+
+@admin.register(GeracaoReceita)
+class GeracaoReceitaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'receita', 'criado_em', 'atualizado_em')
+    list_select_related = ('receita',)
+    list_filter = ('status',)
+    search_fields = ('prompt',)
+    readonly_fields = ('receita', 'criado_em', 'atualizado_em')
+
+@admin.register(CacheGeracao)
+class CacheGeracaoAdmin(admin.ModelAdmin):
+    list_display = ('prompt_normalizado', 'modelo', 'hits', 'latencia_ms', 'gerado_em', 'ultimo_acesso')
+    search_fields = ('prompt_normalizado',)
+    ordering = ('-ultimo_acesso',)
+    readonly_fields = ('chave', 'hits', 'latencia_ms', 'reservado_em', 'gerado_em', 'ultimo_acesso')
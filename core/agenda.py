@@ -0,0 +1,153 @@
+# core/agenda.py
+"""
+Feed iCalendar (.ics) das agendas alimentares.
+
+Cada ``AgendaAlimentar`` tem um número de versão que sobe a cada refeição
+incluída, alterada ou retirada (mantido pelos signals de core/signals.py).
+A versão serve de ETag do feed, de modo que clientes que consultam a agenda
+com frequência recebem 304 com uma única consulta, e de token de
+sincronização: ``?desde=<versao>`` devolve apenas os eventos alterados desde
+então, mais os retirados (``RemocaoAgenda``) como eventos cancelados.
+"""
+from datetime import datetime, time, timedelta, timezone as fuso
+from itertools import groupby
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AgendaAlimentar, Refeicao, RefeicaoAgenda, RemocaoAgenda
+
+PRODID = '-//Luiggis//Agenda Alimentar//PT'
+DURACAO = timedelta(hours=1)
+
+# Horário de cada tipo de refeição (hora local, sem fuso)
+HORARIOS = {
+    Refeicao.CAFE_MANHA: time(8),
+    Refeicao.ALMOCO: time(12),
+    Refeicao.LANCHE: time(16),
+    Refeicao.JANTAR: time(19),
+    Refeicao.CEIA: time(21),
+}
+
+
+# --- Versões (chamadas pelos signals) ---
+
+def _nova_versao(agenda_id):
+    AgendaAlimentar.objects.filter(pk=agenda_id).update(versao=F('versao') + 1, atualizado_em=timezone.now())
+    return AgendaAlimentar.objects.filter(pk=agenda_id).values_list('versao', flat=True).first()
+
+
+def registrar_alteracao(refeicoes):
+    """ Marca como alterados os eventos das refeições (ids) em todas as suas agendas. """
+    vinculos = RefeicaoAgenda.objects.filter(refeicao__in=refeicoes, agenda_alimentar__isnull=False)
+    for agenda_id in set(vinculos.values_list('agenda_alimentar_id', flat=True)):
+        versao = _nova_versao(agenda_id)
+        vinculos.filter(agenda_alimentar_id=agenda_id).update(versao=versao)
+
+
+def registrar_remocao(agenda_id, refeicoes):
+    """ Registra que as refeições (ids) saíram da agenda. """
+    refeicoes = [pk for pk in refeicoes if pk]
+    if agenda_id and refeicoes:
+        versao = _nova_versao(agenda_id)
+        RemocaoAgenda.objects.bulk_create(
+            [RemocaoAgenda(agenda_alimentar_id=agenda_id, refeicao_id=pk, versao=versao) for pk in refeicoes]
+        )
+
+
+# --- Geração do .ics ---
+
+def _texto(valor):
+    return (
+        str(valor).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def _linha(conteudo):
+    """ Linha terminada em CRLF, dobrada a cada 75 octetos (RFC 5545, 3.1). """
+    dados = conteudo.encode('utf-8')
+    partes = []
+    while len(dados) > 75:
+        corte = 75 if not partes else 74
+        # Não corta no meio de um caractere UTF-8
+        while corte and (dados[corte] & 0xC0) == 0x80:
+            corte -= 1
+        partes.append(dados[:corte])
+        dados = dados[corte:]
+    partes.append(dados)
+    return b'\r\n '.join(partes) + b'\r\n'
+
+
+def _carimbo(momento):
+    return momento.astimezone(fuso.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _evento(refeicao_id, data, tipo, versao, titulos, carimbo):
+    inicio = datetime.combine(data, HORARIOS.get(tipo, time(12)))
+    nome_tipo = dict(Refeicao.TIPO_REFEICAO_CHOICES).get(tipo, 'Refeição')
+    resumo = f"{nome_tipo}: {', '.join(titulos)}" if titulos else nome_tipo
+    return b''.join(_linha(linha) for linha in (
+        'BEGIN:VEVENT',
+        f'UID:refeicao-{refeicao_id}@luiggis',
+        f'DTSTAMP:{carimbo}',
+        f'DTSTART:{inicio:%Y%m%dT%H%M%S}',
+        f'DTEND:{inicio + DURACAO:%Y%m%dT%H%M%S}',
+        f'SEQUENCE:{versao}',
+        f'SUMMARY:{_texto(resumo)}',
+        'END:VEVENT',
+    ))
+
+
+def _cancelado(refeicao_id, versao, carimbo):
+    return b''.join(_linha(linha) for linha in (
+        'BEGIN:VEVENT',
+        f'UID:refeicao-{refeicao_id}@luiggis',
+        f'DTSTAMP:{carimbo}',
+        f'SEQUENCE:{versao}',
+        'STATUS:CANCELLED',
+        'END:VEVENT',
+    ))
+
+
+def gerar_ics(agenda, desde=None):
+    """
+    Gera o calendário em pedaços de bytes. Os eventos e os títulos das
+    receitas vêm de uma única consulta, lida em fluxo.
+    """
+    carimbo = _carimbo(agenda.atualizado_em or timezone.now())
+    yield b''.join(_linha(linha) for linha in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{_texto(f"Refeições de {agenda.usuario.username}")}',
+        f'X-LUIGGIS-SYNC-TOKEN:{agenda.versao}',
+    ))
+
+    vinculos = RefeicaoAgenda.objects.filter(agenda_alimentar=agenda, refeicao__isnull=False)
+    if desde is not None:
+        vinculos = vinculos.filter(versao__gt=desde)
+    linhas = (
+        vinculos.order_by('refeicao__date', 'refeicao__tipo_refeicao', 'refeicao_id', 'refeicao__receitarefeicao__id')
+        .values_list('refeicao_id', 'refeicao__date', 'refeicao__tipo_refeicao', 'versao',
+                     'refeicao__receitarefeicao__receita__titulo')
+        .iterator(chunk_size=2000)
+    )
+    for (refeicao_id, data, tipo, versao), grupo in groupby(linhas, key=lambda linha: linha[:4]):
+        titulos = [titulo for *_, titulo in grupo if titulo]
+        yield _evento(refeicao_id, data, tipo, versao, titulos, carimbo)
+
+    if desde is not None:
+        # Refeições retiradas (e não incluídas de novo) desde o token
+        remocoes = (
+            RemocaoAgenda.objects.filter(agenda_alimentar=agenda, versao__gt=desde)
+            .exclude(refeicao_id__in=RefeicaoAgenda.objects.filter(
+                agenda_alimentar=agenda, refeicao__isnull=False
+            ).values('refeicao_id'))
+            .order_by('refeicao_id', '-versao')
+            .values_list('refeicao_id', 'versao')
+        )
+        for refeicao_id, grupo in groupby(remocoes, key=lambda linha: linha[0]):
+            yield _cancelado(refeicao_id, next(grupo)[1], carimbo)
+
+    yield _linha('END:VCALENDAR')
@@ -0,0 +1,180 @@
+# core/benchmark.py
+"""
+Benchmark das views e das consultas principais contra a base atual
+(normalmente uma base sintética de ``gerar_dados_sinteticos``).
+
+Cada caso roda uma vez para aquecer caches e índices e depois
+``repeticoes`` vezes; o relatório JSON guarda, por caso, os tempos (mínimo,
+mediana e p95), as consultas SQL e o tempo gasto nelas, além do commit e
+dos volumes da base, para comparar dois commits com ``comparar``.
+"""
+import json
+import statistics
+import subprocess
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import busca, compatibilidade, compras, planejamento
+from .middleware import ContadorSQL
+from .models import (
+    AgendaAlimentar, Dieta, Ingrediente, IngredienteReceita, Receita, ReceitaRefeicao, Refeicao, Usuario,
+)
+
+VERSAO_RELATORIO = 1
+MODELOS_CONTADOS = (Ingrediente, Receita, IngredienteReceita, Usuario, Refeicao, ReceitaRefeicao)
+
+
+class ErroBenchmark(Exception):
+    """ A base não tem os dados de que os casos precisam, ou um caso falhou. """
+
+
+def _sem_gravar(funcao):
+    """ Roda ``funcao`` numa transação desfeita no final, para repetir casos que gravam. """
+    def executar():
+        with transaction.atomic():
+            funcao()
+            transaction.set_rollback(True)
+    return executar
+
+
+def _get(client, url):
+    def executar():
+        response = client.get(url)
+        if response.status_code >= 400:
+            raise ErroBenchmark(f"GET {url}: {response.status_code}")
+        if response.streaming:
+            # Consome a resposta, senão o tempo não inclui a geração do conteúdo
+            for _ in response.streaming_content:
+                pass
+    return executar
+
+
+def _recarregar(modulo):
+    def executar():
+        modulo._indice.versao = None
+        modulo.obter_indice()
+    return executar
+
+
+def casos():
+    """ ``{nome: função sem argumentos}``, com objetos de exemplo escolhidos de forma estável. """
+    dieta = Dieta.objects.filter(is_active=True).order_by('id').first()
+    receita = Receita.objects.order_by('id').first()
+    agenda = AgendaAlimentar.objects.filter(usuario_id=dieta.usuario_id).first() if dieta else None
+    ingrediente = Ingrediente.objects.order_by('id').values_list('nome', flat=True).first()
+    if not (dieta and receita and agenda and ingrediente):
+        raise ErroBenchmark("A base precisa de ingredientes, receitas e de um usuário com dieta e agenda.")
+    datas = Refeicao.objects.filter(usuario_id=dieta.usuario_id).aggregate(inicio=Min('date'), fim=Max('date'))
+    inicio = datas['inicio'] or date.today()
+    # O planejamento pula dias que já têm refeições; planeja a semana seguinte à última
+    proxima_semana = datas['fim'] + timedelta(days=1) if datas['fim'] else date.today()
+    termo = ingrediente[:4]
+    usuario = dieta.usuario
+    client = Client()
+
+    return {
+        'view:landing': _get(client, reverse('landing')),
+        'view:lista_ingredientes': _get(client, reverse('lista_ingredientes')),
+        'view:busca_ingredientes': _get(client, f"{reverse('busca_ingredientes')}?q={termo}"),
+        'view:catalogo_ingredientes': _get(client, reverse('catalogo_ingredientes')),
+        'view:lista_receitas': _get(client, reverse('lista_receitas')),
+        'view:lista_receitas_filtrada': _get(
+            client, f"{reverse('lista_receitas')}?min_caloria=500&max_caloria=800"
+        ),
+        'view:detalhes_receita': _get(client, reverse('detalhes_receita', kwargs={'pk': receita.pk})),
+        'view:receitas_compativeis': _get(client, reverse('receitas_compativeis', kwargs={'pk': usuario.pk})),
+        'view:agenda_ics': _get(client, reverse('agenda_ics', kwargs={'token': agenda.token})),
+        'consulta:gerar_lista_compras': _sem_gravar(
+            lambda: compras.gerar_lista(usuario, inicio, inicio + timedelta(days=6))
+        ),
+        'consulta:planejar_semana': _sem_gravar(
+            lambda: planejamento.planejar_dieta(dieta, proxima_semana, planejamento.Planejador(seed=0))
+        ),
+        'consulta:carregar_indice_busca': _recarregar(busca),
+        'consulta:carregar_indice_compatibilidade': _recarregar(compatibilidade),
+    }
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento
+    tempos, consultas, tempos_sql = [], [], []
+    for _ in range(repeticoes):
+        sql = ContadorSQL()
+        with connection.execute_wrapper(sql):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        consultas.append(sql.consultas)
+        tempos_sql.append(sql.segundos)
+    tempos.sort()
+    return {
+        'min_ms': round(tempos[0] * 1000, 3),
+        'mediana_ms': round(statistics.median(tempos) * 1000, 3),
+        'p95_ms': round(tempos[max(0, -(-len(tempos) * 95 // 100) - 1)] * 1000, 3),
+        'consultas': max(consultas),
+        'sql_ms': round(statistics.median(tempos_sql) * 1000, 3),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(repeticoes=5, nomes=None, ao_medir=None):
+    """ Mede os casos (todos, ou os de ``nomes``) e devolve o relatório. """
+    todos = casos()
+    desconhecidos = set(nomes or ()) - set(todos)
+    if desconhecidos:
+        raise ErroBenchmark(f"Casos desconhecidos: {', '.join(sorted(desconhecidos))}.")
+    resultados = {}
+    for nome, funcao in todos.items():
+        if nomes and nome not in nomes:
+            continue
+        resultados[nome] = medir(funcao, repeticoes)
+        if ao_medir:
+            ao_medir(nome, resultados[nome])
+    return {
+        'versao': VERSAO_RELATORIO,
+        'gerado_em': timezone.now().isoformat(),
+        'commit': _commit(),
+        'banco': connection.vendor,
+        'repeticoes': repeticoes,
+        'volumes': {model._meta.model_name: model.objects.count() for model in MODELOS_CONTADOS},
+        'casos': resultados,
+    }
+
+
+def salvar(relatorio, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+
+def carregar(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def comparar(base, atual):
+    """
+    Gera ``(caso, mediana base, mediana atual, variação, consultas base, consultas atual)``
+    para os casos presentes nos dois relatórios; a variação é relativa à base.
+    """
+    for nome, medicao in atual['casos'].items():
+        anterior = base['casos'].get(nome)
+        if anterior is None:
+            continue
+        antes, depois = anterior['mediana_ms'], medicao['mediana_ms']
+        variacao = (depois - antes) / antes if antes else 0.0
+        yield nome, antes, depois, variacao, anterior['consultas'], medicao['consultas']
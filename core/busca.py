@@ -0,0 +1,265 @@
+# core/busca.py
+"""
+Busca e autocomplete de ingredientes, sem diferença de acentos e caixa.
+
+Dois backends, escolhidos por ``settings.BUSCA_BACKEND``:
+
+* ``memoria``: índice no processo com uma lista ordenada de termos (busca por
+  prefixo com ``bisect``) e um índice invertido de trigramas para tolerar
+  erros de digitação. É atualizado incrementalmente pelos signals; quando
+  outro processo altera os ingredientes (detectado pelo contador
+  ``versao_ingredientes``), relê os ids do log das versões que perdeu, ou
+  é reconstruído se ficou atrás demais.
+* ``postgres``: usa ``pg_trgm`` e ``unaccent`` com o índice GIN criado na
+  migração ``0006``.
+
+``auto`` usa o PostgreSQL quando ele é o banco configurado.
+"""
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import contadores
+from .models import Contador, Ingrediente
+from .texto import normalizar, palavras, trigramas
+
+# Pesos do ranking
+NOME_PREFIXO = 3
+PALAVRA_PREFIXO = 2
+CATEGORIA_PREFIXO = 1
+SIMILARIDADE_MINIMA = 0.3
+
+
+class IndiceIngredientes:
+    """ Índice em memória de prefixos e trigramas dos nomes de ingredientes. """
+    PESOS = (NOME_PREFIXO, PALAVRA_PREFIXO, CATEGORIA_PREFIXO)
+
+    def __init__(self):
+        # Os hooks de on_commit alteram o índice enquanto outras threads buscam:
+        # escritas e leituras passam pela mesma trava (reentrante)
+        self.lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self):
+        self.itens = {}  # id -> (nome, categoria)
+        # Uma lista ordenada de (termo normalizado, id) por peso do ranking
+        self.termos = {peso: [] for peso in self.PESOS}
+        self.por_trigrama = {}  # trigrama -> {id}
+        self.trigramas = {}  # id -> trigramas do nome
+        self.versao = None
+        self.marca = None  # da versão no log de alterações (core/contadores.py)
+
+    def _termos(self, nome, categoria):
+        nome_normalizado = normalizar(nome)
+        palavras_nome = set(nome_normalizado.split())
+        termos = [(nome_normalizado, NOME_PREFIXO)]
+        termos.extend((palavra, PALAVRA_PREFIXO) for palavra in palavras_nome - {nome_normalizado})
+        if categoria:
+            termos.extend((palavra, CATEGORIA_PREFIXO) for palavra in set(palavras(categoria)))
+        return termos, trigramas(nome_normalizado, normalizado=True)
+
+    def _indexar_trigramas(self, pk, trigramas_nome):
+        self.trigramas[pk] = trigramas_nome
+        for trigrama in trigramas_nome:
+            self.por_trigrama.setdefault(trigrama, set()).add(pk)
+
+    def adicionar(self, pk, nome, categoria=None):
+        if pk in self.itens:
+            self.remover(pk)
+        self.itens[pk] = (nome, categoria)
+        termos, trigramas_nome = self._termos(nome, categoria)
+        for termo, peso in termos:
+            insort(self.termos[peso], (termo, pk))
+        self._indexar_trigramas(pk, trigramas_nome)
+
+    def remover(self, pk):
+        if pk not in self.itens:
+            return
+        termos, _ = self._termos(*self.itens.pop(pk))
+        for termo, peso in termos:
+            lista = self.termos[peso]
+            posicao = bisect_left(lista, (termo, pk))
+            if posicao < len(lista) and lista[posicao] == (termo, pk):
+                del lista[posicao]
+        for trigrama in self.trigramas.pop(pk):
+            ids = self.por_trigrama[trigrama]
+            ids.discard(pk)
+            if not ids:
+                del self.por_trigrama[trigrama]
+
+    def carregar(self, linhas):
+        """ Reconstrói o índice de uma vez a partir de ``(id, nome, categoria)``. """
+        self._limpar()
+        for pk, nome, categoria in linhas:
+            self.itens[pk] = (nome, categoria)
+            termos, trigramas_nome = self._termos(nome, categoria)
+            for termo, peso in termos:
+                self.termos[peso].append((termo, pk))
+            self._indexar_trigramas(pk, trigramas_nome)
+        for lista in self.termos.values():
+            lista.sort()
+
+    def _prefixos(self, consulta, limite):
+        """ Até ``limite`` ids por peso cujos termos começam com a consulta. """
+        pontos = {}
+        for peso in self.PESOS:
+            lista = self.termos[peso]
+            encontrados = 0
+            for posicao in range(bisect_left(lista, (consulta,)), len(lista)):
+                termo, pk = lista[posicao]
+                if not termo.startswith(consulta) or encontrados == limite:
+                    break
+                if pk not in pontos:
+                    pontos[pk] = peso
+                    encontrados += 1
+        return pontos
+
+    def parecidos(self, consulta, similaridade_minima=SIMILARIDADE_MINIMA):
+        """ Ids com similaridade de trigramas (Jaccard) com a consulta normalizada acima do mínimo. """
+        alvo = trigramas(consulta, normalizado=True)
+        if not alvo:
+            return {}
+        with self.lock:
+            return self._parecidos(alvo, similaridade_minima)
+
+    def _parecidos(self, alvo, similaridade_minima):
+        # Para atingir a similaridade mínima é preciso compartilhar ao menos
+        # ``minimo`` trigramas, logo basta olhar as listas dos menos frequentes
+        minimo = max(1, int(similaridade_minima * len(alvo) + 0.999))
+        raros = sorted(alvo, key=lambda t: len(self.por_trigrama.get(t, ())))
+        candidatos = set()
+        for trigrama in raros[:len(alvo) - minimo + 1]:
+            candidatos.update(self.por_trigrama.get(trigrama, ()))
+        parecidos = {}
+        for pk in candidatos:
+            trigramas_nome = self.trigramas[pk]
+            similaridade = len(alvo & trigramas_nome) / len(alvo | trigramas_nome)
+            if similaridade >= similaridade_minima:
+                parecidos[pk] = similaridade
+        return parecidos
+
+    def buscar(self, consulta, limite=10):
+        consulta = normalizar(consulta)
+        if not consulta:
+            return []
+        with self.lock:
+            pontos = self._prefixos(consulta, limite)
+            if len(pontos) < limite:
+                # Complementa com nomes parecidos (erros de digitação)
+                for pk, similaridade in self.parecidos(consulta).items():
+                    pontos.setdefault(pk, similaridade)
+
+            melhores = sorted(pontos, key=lambda pk: (-pontos[pk], len(self.itens[pk][0]), self.itens[pk][0]))
+            return [
+                {'id': pk, 'nome': self.itens[pk][0], 'categoria': self.itens[pk][1]}
+                for pk in melhores[:limite]
+            ]
+
+
+_indice = IndiceIngredientes()
+_lock = _indice.lock
+
+
+def _versao_atual():
+    return contadores.valores(Contador.VERSAO_INGREDIENTES)[Contador.VERSAO_INGREDIENTES]
+
+
+def _na_versao(versao):
+    """ O índice está na versão (e não numa homônima desfeita por rollback)? """
+    return (
+        _indice.versao == versao and _indice.marca is not None
+        and _indice.marca == contadores.marca(Contador.VERSAO_INGREDIENTES, versao)
+    )
+
+
+def _reler(ids):
+    """ Reindexa os ingredientes (ids) com os dados atuais; os que não existem mais saem. """
+    encontrados = set()
+    for pk, nome, categoria in Ingrediente.objects.filter(pk__in=ids).values_list('id', 'nome', 'categoria__nome'):
+        _indice.adicionar(pk, nome, categoria)
+        encontrados.add(pk)
+    for pk in set(ids) - encontrados:
+        _indice.remover(pk)
+
+
+def obter_indice():
+    """ Índice do processo, posto em dia se outro processo alterou os ingredientes. """
+    versao = _versao_atual()
+    if _indice.versao != versao:
+        with _lock:
+            if _indice.versao != versao:
+                ids, marca = contadores.alteracoes(Contador.VERSAO_INGREDIENTES, _indice.versao, _indice.marca, versao)
+                if ids is None:
+                    _indice.carregar(
+                        Ingrediente.objects.values_list('id', 'nome', 'categoria__nome').iterator(chunk_size=5000)
+                    )
+                else:
+                    _reler(ids)
+                _indice.versao, _indice.marca = versao, marca
+    return _indice
+
+
+def notificar_alteracao(ingredientes=(), removidos=(), recarregar=False):
+    """
+    Registra uma alteração nos ingredientes (``ingredientes`` como tuplas
+    ``(id, nome, categoria)``). A versão sobe na transação corrente; após o
+    commit, o índice deste processo aplica a mudança se estava exatamente na
+    versão anterior, ou alcança a versão pelo log na próxima busca.
+    """
+    ingredientes, removidos = list(ingredientes), list(removidos)
+    ids = None if recarregar else [pk for pk, _, _ in ingredientes] + removidos
+    versao, marca = contadores.registrar_versao(Contador.VERSAO_INGREDIENTES, ids)
+
+    def aplicar():
+        with _lock:
+            if recarregar:
+                _indice.versao = None
+                return
+            if not _na_versao(versao - 1):
+                return
+            for pk in removidos:
+                _indice.remover(pk)
+            for pk, nome, categoria in ingredientes:
+                _indice.adicionar(pk, nome, categoria)
+            _indice.versao, _indice.marca = versao, marca
+
+    transaction.on_commit(aplicar)
+
+
+def backend():
+    escolhido = settings.BUSCA_BACKEND
+    if escolhido == 'auto':
+        return 'postgres' if connection.vendor == 'postgresql' else 'memoria'
+    return escolhido
+
+
+def buscar_postgres(consulta, limite=10):
+    """ Mesma busca usando pg_trgm; depende do índice criado na migração 0006. """
+    termo = normalizar(consulta)
+    if not termo:
+        return []
+    termo_like = termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.id, i.nome, c.nome
+              FROM core_ingrediente i
+              LEFT JOIN core_categoria c ON c.id = i.categoria_id
+             WHERE core_unaccent(lower(i.nome)) %% %s
+                OR core_unaccent(lower(i.nome)) LIKE %s
+             ORDER BY core_unaccent(lower(i.nome)) LIKE %s DESC,
+                      similarity(core_unaccent(lower(i.nome)), %s) DESC,
+                      length(i.nome), i.nome
+             LIMIT %s
+            """,
+            [termo, f'%{termo_like}%', f'{termo_like}%', termo, limite],
+        )
+        return [{'id': pk, 'nome': nome, 'categoria': categoria} for pk, nome, categoria in cursor.fetchall()]
+
+
+def buscar(consulta, limite=10):
+    if backend() == 'postgres':
+        return buscar_postgres(consulta, limite)
+    return obter_indice().buscar(consulta, limite)
@@ -0,0 +1,350 @@
+# core/busca_semantica.py
+"""
+Busca de receitas por significado aproximado ("frango com limão no forno"),
+sobre título, instruções e nomes dos ingredientes, sem serviço externo.
+
+Cada receita vira um vetor de ``settings.BUSCA_RECEITAS_DIMENSOES`` posições
+por *feature hashing*: cada termo (palavra normalizada e seu prefixo de cinco
+letras, um radical grosseiro) cai numa posição e num sinal dados pelo seu
+hash, com peso ``1 + log(tf)``; título e ingredientes contam em dobro. As
+posições são pesadas pelo IDF, calculado na reconstrução, e os vetores são
+normalizados, de modo que a similaridade de cosseno é um produto escalar.
+
+Os vetores ficam em ``settings.BUSCA_RECEITAS_DIR``, em três arquivos crus:
+
+* ``receitas.vetores``: matriz float32, uma linha por posição;
+* ``receitas.ids``: int64, o id da receita de cada linha (0 = linha livre);
+* ``receitas.idf``: float32, o peso de cada dimensão.
+
+Os processos mapeiam os arquivos com ``numpy.memmap`` (as páginas ficam no
+cache do sistema, compartilhadas entre os workers) e os remapeiam quando o
+arquivo é trocado ou cresce. As alterações das receitas, avisadas pelos
+signals, regravam só as linhas afetadas, sob ``flock``; o IDF só muda na
+reconstrução (comando ``indexar_busca_receitas``, ou o worker
+``processar_geracoes`` ao iniciar, se o índice ainda não existe). A busca
+nunca constrói o índice: enquanto ele não existe, não encontra nada.
+"""
+import fcntl
+import hashlib
+import math
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import IngredienteReceita, Receita
+from .texto import PALAVRAS_VAZIAS, palavras
+
+PESO_TITULO = 2
+PESO_INGREDIENTES = 2
+TAMANHO_RADICAL = 5
+
+VETORES = 'receitas.vetores'
+IDS = 'receitas.ids'
+IDF = 'receitas.idf'
+
+
+# --- Vetorização ---
+
+def _termos(texto, peso, termos):
+    for palavra in palavras(texto or ''):
+        if palavra in PALAVRAS_VAZIAS:
+            continue
+        termos[palavra] += peso
+        if len(palavra) > TAMANHO_RADICAL:
+            termos[palavra[:TAMANHO_RADICAL] + '*'] += peso
+    return termos
+
+
+def termos_receita(titulo, instrucoes, ingredientes=()):
+    """ Contagem ponderada dos termos de uma receita (``ingredientes``: nomes). """
+    termos = Counter()
+    _termos(titulo, PESO_TITULO, termos)
+    _termos(instrucoes, 1, termos)
+    for nome in ingredientes:
+        _termos(nome, PESO_INGREDIENTES, termos)
+    return termos
+
+
+def termos_consulta(consulta):
+    return _termos(consulta, 1, Counter())
+
+
+@lru_cache(maxsize=200_000)
+def _posicao(termo, dimensoes):
+    """ Posição e sinal do termo no vetor; o sinal faz as colisões se anularem em média. """
+    valor = int.from_bytes(hashlib.blake2b(termo.encode(), digest_size=8).digest(), 'little')
+    return valor % dimensoes, 1.0 if valor >> 63 else -1.0
+
+
+def frequencias(termos, dimensoes):
+    """ Vetor de frequências (sem IDF nem normalização). """
+    vetor = np.zeros(dimensoes, dtype=np.float32)
+    if termos:
+        posicoes, pesos = [], []
+        for termo, quantidade in termos.items():
+            posicao, sinal = _posicao(termo, dimensoes)
+            posicoes.append(posicao)
+            pesos.append(sinal * (1 + math.log(quantidade)))
+        np.add.at(vetor, posicoes, pesos)
+    return vetor
+
+
+def _normalizar(matriz):
+    normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+    np.divide(matriz, normas, out=matriz, where=normas > 0)
+    return matriz
+
+
+def vetorizar(termos, idf):
+    return _normalizar(frequencias(termos, len(idf)) * idf)
+
+
+# --- Arquivos ---
+
+class IndiceVetorial:
+    """ Matriz de vetores das receitas em disco, mapeada em memória. """
+
+    def __init__(self, diretorio, dimensoes):
+        self.diretorio = Path(diretorio)
+        self.dimensoes = dimensoes
+        self._mapa = None  # (identificação dos arquivos, vetores, ids, idf)
+        self._lock = threading.Lock()
+
+    def caminho(self, nome):
+        return self.diretorio / nome
+
+    def existe(self):
+        try:
+            return os.path.getsize(self.caminho(IDF)) == self.dimensoes * 4 and self.caminho(VETORES).exists()
+        except OSError:
+            return False
+
+    @contextmanager
+    def trava(self, nome='receitas.trava', compartilhada=False):
+        """ Trava entre processos (``flock``) sobre um arquivo do diretório. """
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        with open(self.caminho(nome), 'a') as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def _identificacao(self):
+        return tuple(
+            (estado.st_ino, estado.st_size)
+            for estado in (os.stat(self.caminho(VETORES)), os.stat(self.caminho(IDS)), os.stat(self.caminho(IDF)))
+        )
+
+    def mapear(self):
+        """ ``(vetores, ids, idf)`` somente leitura, remapeados se os arquivos mudaram. """
+        with self._lock:
+            identificacao = self._identificacao()
+            if self._mapa is None or self._mapa[0] != identificacao:
+                with self.trava(compartilhada=True):
+                    identificacao = self._identificacao()
+                    ids = np.memmap(self.caminho(IDS), dtype=np.int64, mode='r')
+                    vetores = np.memmap(self.caminho(VETORES), dtype=np.float32, mode='r').reshape(
+                        -1, self.dimensoes
+                    )
+                    idf = np.fromfile(self.caminho(IDF), dtype=np.float32)
+                linhas = min(len(ids), len(vetores))
+                self._mapa = (identificacao, vetores[:linhas], ids[:linhas], idf)
+            return self._mapa[1:]
+
+    def _abrir_para_escrita(self, linhas=None):
+        """ Mapeia ids e vetores para escrita, crescendo os arquivos até ``linhas``. """
+        if linhas is not None:
+            # ids primeiro: quem ler no meio do caminho considera o menor dos dois
+            for nome, largura in ((IDS, 8), (VETORES, 4 * self.dimensoes)):
+                with open(self.caminho(nome), 'r+b') as arquivo:
+                    arquivo.truncate(linhas * largura)
+        ids = np.memmap(self.caminho(IDS), dtype=np.int64, mode='r+')
+        vetores = np.memmap(self.caminho(VETORES), dtype=np.float32, mode='r+').reshape(-1, self.dimensoes)
+        return vetores, ids
+
+    def gravar(self, linhas):
+        """
+        Aplica ``{receita_id: vetor}`` no índice; vetor ``None`` remove a
+        receita. Reaproveita linhas livres e dobra os arquivos quando faltam.
+        """
+        with self.trava():
+            vetores, ids = self._abrir_para_escrita()
+            ocupadas = np.flatnonzero(np.isin(ids, np.fromiter(linhas, dtype=np.int64, count=len(linhas))))
+            posicoes = {int(ids[i]): i for i in ocupadas}
+            novas = [pk for pk, vetor in linhas.items() if vetor is not None and pk not in posicoes]
+            livres = np.flatnonzero(ids == 0)[:len(novas)].tolist()
+            if len(livres) < len(novas):
+                capacidade = len(ids)
+                total = max(2 * capacidade, capacidade + len(novas) - len(livres))
+                del vetores, ids
+                vetores, ids = self._abrir_para_escrita(total)
+                livres.extend(range(capacidade, total))
+            posicoes.update(zip(novas, livres))
+
+            for pk, vetor in linhas.items():
+                if pk not in posicoes:
+                    continue
+                posicao = posicoes[pk]
+                if vetor is None:
+                    ids[posicao] = 0
+                    vetores[posicao] = 0
+                else:
+                    # O vetor antes do id: uma busca concorrente nunca vê o id com a linha velha de outra receita
+                    vetores[posicao] = vetor
+                    vetores.flush()
+                    ids[posicao] = pk
+            vetores.flush()
+            ids.flush()
+
+    def consultar(self, vetor, limite):
+        """ ``[(receita_id, cosseno)]`` das linhas mais próximas do vetor (já normalizado). """
+        vetores, ids, _ = self.mapear()
+        if not len(ids):
+            return []
+        similaridades = vetores @ vetor
+        similaridades[ids == 0] = -1
+        limite = min(limite, len(similaridades))
+        melhores = np.argpartition(-similaridades, limite - 1)[:limite]
+        melhores = melhores[np.argsort(-similaridades[melhores], kind='stable')]
+        return [(int(ids[i]), float(similaridades[i])) for i in melhores if similaridades[i] > 0]
+
+
+_indices = {}
+_lock = threading.Lock()
+
+
+def obter_indice():
+    chave = (str(settings.BUSCA_RECEITAS_DIR), settings.BUSCA_RECEITAS_DIMENSOES)
+    with _lock:
+        if chave not in _indices:
+            _indices[chave] = IndiceVetorial(*chave)
+        return _indices[chave]
+
+
+# --- Manutenção ---
+
+def _documentos(receitas):
+    """ ``{receita_id: termos}`` das receitas dadas (ids) que existem. """
+    receitas = list(receitas)
+    nomes = {}
+    for receita, nome in IngredienteReceita.objects.filter(
+        receita__in=receitas
+    ).values_list('receita_id', 'ingrediente__nome'):
+        nomes.setdefault(receita, []).append(nome)
+    return {
+        pk: termos_receita(titulo, instrucoes, nomes.get(pk, ()))
+        for pk, titulo, instrucoes in Receita.objects.filter(pk__in=receitas).values_list('id', 'titulo', 'instrucoes')
+    }
+
+
+def atualizar(receitas):
+    """ Regrava no índice as receitas dadas (ids); as que não existem mais saem dele. """
+    indice = obter_indice()
+    receitas = set(receitas)
+    if not receitas or not indice.existe():
+        return 0
+    _, _, idf = indice.mapear()
+    documentos = _documentos(receitas)
+    indice.gravar({
+        pk: vetorizar(documentos[pk], idf) if pk in documentos else None
+        for pk in receitas
+    })
+    return len(documentos)
+
+
+def notificar_alteracao(receitas):
+    """ Atualiza as receitas no índice após o commit (se o índice já foi construído). """
+    receitas = {pk for pk in receitas if pk is not None}
+    if receitas:
+        transaction.on_commit(lambda: atualizar(receitas), robust=True)
+
+
+def reconstruir(lote=2000):
+    """
+    Refaz o índice com todas as receitas e recalcula o IDF. Os arquivos novos
+    são escritos à parte e trocados de uma vez; as receitas alteradas durante
+    a reconstrução são reaplicadas em seguida. Devolve o total indexado.
+    """
+    indice = obter_indice()
+    dimensoes = indice.dimensoes
+    indice.diretorio.mkdir(parents=True, exist_ok=True)
+    # Margem para transações que começaram antes e terminam durante a leitura
+    inicio = timezone.now() - timedelta(minutes=1)
+    pks = list(Receita.objects.order_by('pk').values_list('pk', flat=True))
+    capacidade = len(pks) + max(64, len(pks) // 8)
+    novo = {nome: indice.caminho(nome + '.novo') for nome in (VETORES, IDS, IDF)}
+    vetores = np.memmap(novo[VETORES], dtype=np.float32, mode='w+', shape=(capacidade, dimensoes))
+    ids = np.memmap(novo[IDS], dtype=np.int64, mode='w+', shape=(capacidade,))
+
+    documentos_por_dimensao = np.zeros(dimensoes, dtype=np.int64)
+    total = 0
+    for inicio_lote in range(0, len(pks), lote):
+        for pk, termos in sorted(_documentos(pks[inicio_lote:inicio_lote + lote]).items()):
+            vetores[total] = frequencias(termos, dimensoes)
+            ids[total] = pk
+            documentos_por_dimensao += vetores[total] != 0
+            total += 1
+
+    # IDF suavizado, como no scikit-learn; depois cada linha é pesada e normalizada
+    idf = (np.log((1 + total) / (1 + documentos_por_dimensao)) + 1).astype(np.float32)
+    for inicio_lote in range(0, total, lote):
+        bloco = vetores[inicio_lote:inicio_lote + lote]
+        bloco *= idf
+        _normalizar(bloco)
+    vetores.flush()
+    ids.flush()
+    del vetores, ids
+    idf.tofile(novo[IDF])
+
+    with indice.trava():
+        for nome, caminho in novo.items():
+            os.replace(caminho, indice.caminho(nome))
+
+    existentes = set(Receita.objects.values_list('pk', flat=True))
+    alteradas = set(Receita.objects.filter(atualizado_em__gte=inicio).values_list('pk', flat=True))
+    atualizar(alteradas | (set(pks) - existentes))
+    return total
+
+
+def construir_se_preciso(lote=2000):
+    """ Constrói o índice se ele ainda não existe; devolve o total indexado ou ``None``. """
+    indice = obter_indice()
+    if indice.existe():
+        return None
+    with indice.trava('receitas.construcao'):
+        # Outro processo pode tê-lo construído enquanto este aguardava a trava
+        return None if indice.existe() else reconstruir(lote)
+
+
+# --- Consultas ---
+
+def buscar(consulta, limite=10):
+    """ ``[{'id', 'titulo', 'semelhanca'}]`` das receitas mais próximas da consulta. """
+    termos = termos_consulta(consulta)
+    if not termos:
+        return []
+    indice = obter_indice()
+    if not indice.existe():
+        return []  # construído pelo comando ou pelo worker, nunca durante a requisição
+    _, _, idf = indice.mapear()
+    vetor = vetorizar(termos, idf)
+    if not vetor.any():
+        return []
+    # Pede folga para as linhas de receitas apagadas que ainda não saíram do índice
+    encontradas = indice.consultar(vetor, limite + 10)
+    titulos = dict(Receita.objects.filter(pk__in=[pk for pk, _ in encontradas]).values_list('id', 'titulo'))
+    return [
+        {'id': pk, 'titulo': titulos[pk], 'semelhanca': round(similaridade, 4)}
+        for pk, similaridade in encontradas
+        if pk in titulos
+    ][:limite]
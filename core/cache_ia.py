@@ -0,0 +1,210 @@
+# core/cache_ia.py
+"""
+Cache persistente das respostas da IA.
+
+As entradas são indexadas pelo prompt normalizado (sem diferença de caixa,
+acentos ou ordem dos itens), pela instrução de sistema e pelo modelo. O
+tamanho é limitado por LRU (``IA_CACHE_MAX_ENTRADAS``) e cada resposta vale
+por ``IA_CACHE_TTL`` segundos. Uma entrada sem resposta marca uma geração em
+andamento: chamadas idênticas, em qualquer processo, aguardam por ela.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CacheGeracao
+from .texto import normalizar
+
+# Contadores do processo atual; os totais persistentes ficam nas entradas
+estatisticas = {'hits': 0, 'misses': 0, 'aguardados': 0}
+
+_SEPARADORES = re.compile(r'\s*(?:[,;]|\be\b)\s*')
+
+
+def normalizar_prompt(prompt):
+    """
+    Reduz o prompt a uma forma canônica: minúsculo, sem acentos, com os itens
+    separados por vírgula/";"/"e"/quebra de linha ordenados e sem repetição.
+    """
+    itens = (item.strip(' .!') for item in _SEPARADORES.split(normalizar(prompt.replace('\n', ','))))
+    return ', '.join(sorted({item for item in itens if item}))
+
+
+def calcular_chave(prompt_normalizado, system_instruction, modelo):
+    bruto = '\x1f'.join([prompt_normalizado, system_instruction, modelo])
+    return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+
+# Resultados de ``_tentar``: o que fazer a seguir com a chave
+RESPOSTA, GERAR, AGUARDAR, REPETIR = 'resposta', 'gerar', 'aguardar', 'repetir'
+
+
+def _tentar(chave, normalizado, modelo, aguardou):
+    """
+    Um passo do protocolo de reserva: devolve ``(RESPOSTA, texto)``,
+    ``(GERAR, entrada)`` se este processo reservou a chave, ``(AGUARDAR, None)``
+    se outra geração idêntica está em andamento ou ``(REPETIR, None)``.
+    """
+    agora = timezone.now()
+    entrada = CacheGeracao.objects.filter(chave=chave).first()
+
+    if entrada is None:
+        try:
+            with transaction.atomic():
+                entrada = CacheGeracao.objects.create(
+                    chave=chave, prompt_normalizado=normalizado, modelo=modelo,
+                    reservado_em=agora, ultimo_acesso=agora,
+                )
+        except IntegrityError:
+            return REPETIR, None  # outro processo reservou a chave primeiro
+        return GERAR, entrada
+
+    if entrada.resposta is not None and not _expirada(entrada, agora):
+        CacheGeracao.objects.filter(pk=entrada.pk).update(hits=F('hits') + 1, ultimo_acesso=agora)
+        estatisticas['aguardados' if aguardou else 'hits'] += 1
+        return RESPOSTA, entrada.resposta
+
+    abandonada = entrada.resposta is None and entrada.reservado_em < agora - timedelta(
+        seconds=settings.IA_CACHE_ESPERA
+    )
+    if entrada.resposta is not None or abandonada:
+        # Resposta vencida ou geração abandonada: assume a entrada se ninguém o fez antes
+        assumida = CacheGeracao.objects.filter(
+            pk=entrada.pk, reservado_em=entrada.reservado_em
+        ).update(resposta=None, gerado_em=None, reservado_em=agora)
+        if assumida:
+            entrada.reservado_em = agora
+            return GERAR, entrada
+        return REPETIR, None
+
+    return AGUARDAR, None
+
+
+def obter_ou_gerar(prompt, gerar, system_instruction, modelo):
+    """
+    Devolve a resposta em cache para o prompt ou chama ``gerar()`` uma única
+    vez, compartilhando o resultado com os pedidos idênticos que chegarem
+    enquanto a geração está em andamento.
+    """
+    normalizado = normalizar_prompt(prompt)
+    chave = calcular_chave(normalizado, system_instruction, modelo)
+    prazo_espera = time.monotonic() + settings.IA_CACHE_ESPERA
+    aguardou = False
+
+    while True:
+        acao, valor = _tentar(chave, normalizado, modelo, aguardou)
+        if acao == RESPOSTA:
+            return valor
+        if acao == GERAR:
+            return _gerar(valor, gerar)
+        if acao == AGUARDAR:
+            if time.monotonic() > prazo_espera:
+                estatisticas['misses'] += 1
+                return gerar()
+            aguardou = True
+            time.sleep(settings.IA_CACHE_INTERVALO)
+
+
+async def aobter_ou_gerar(prompt, agerar, system_instruction, modelo):
+    """
+    Versão assíncrona de ``obter_ou_gerar`` para ``agerar`` corrotina: a
+    reserva é a mesma, e a espera por uma geração idêntica não ocupa thread.
+    """
+    normalizado = normalizar_prompt(prompt)
+    chave = calcular_chave(normalizado, system_instruction, modelo)
+    prazo_espera = time.monotonic() + settings.IA_CACHE_ESPERA
+    aguardou = False
+    tentar = sync_to_async(_tentar)
+
+    while True:
+        acao, valor = await tentar(chave, normalizado, modelo, aguardou)
+        if acao == RESPOSTA:
+            return valor
+        if acao == GERAR:
+            return await _agerar(valor, agerar)
+        if acao == AGUARDAR:
+            if time.monotonic() > prazo_espera:
+                estatisticas['misses'] += 1
+                return await agerar()
+            aguardou = True
+            await asyncio.sleep(settings.IA_CACHE_INTERVALO)
+
+
+def _expirada(entrada, agora):
+    return entrada.gerado_em < agora - timedelta(seconds=settings.IA_CACHE_TTL)
+
+
+def _gerar(entrada, gerar):
+    """ Chama a IA para uma entrada reservada por este processo e grava a resposta. """
+    inicio = time.monotonic()
+    try:
+        resposta = gerar()
+    except BaseException:
+        _liberar(entrada)
+        raise
+    _gravar(entrada, resposta, inicio)
+    return resposta
+
+
+async def _agerar(entrada, agerar):
+    inicio = time.monotonic()
+    try:
+        resposta = await agerar()
+    except BaseException:
+        # Inclui o cancelamento (cliente do stream desconectado); blindado para
+        # que um segundo cancelamento não deixe a reserva para trás
+        await asyncio.shield(sync_to_async(_liberar)(entrada))
+        raise
+    await sync_to_async(_gravar)(entrada, resposta, inicio)
+    return resposta
+
+
+def _liberar(entrada):
+    # Libera a chave para que os pedidos em espera tentem por conta própria
+    CacheGeracao.objects.filter(pk=entrada.pk, reservado_em=entrada.reservado_em).delete()
+
+
+def _gravar(entrada, resposta, inicio):
+    agora = timezone.now()
+    CacheGeracao.objects.filter(pk=entrada.pk, reservado_em=entrada.reservado_em).update(
+        resposta=resposta,
+        gerado_em=agora,
+        ultimo_acesso=agora,
+        latencia_ms=int((time.monotonic() - inicio) * 1000),
+    )
+    estatisticas['misses'] += 1
+    remover_excedentes()
+
+
+def remover_excedentes():
+    """ Remove entradas vencidas e as menos usadas recentemente além do limite. """
+    vencimento = timezone.now() - timedelta(seconds=settings.IA_CACHE_TTL)
+    CacheGeracao.objects.filter(gerado_em__lt=vencimento).delete()
+    excedentes = list(
+        CacheGeracao.objects.order_by('-ultimo_acesso')
+        .values_list('pk', flat=True)[settings.IA_CACHE_MAX_ENTRADAS:]
+    )
+    if excedentes:
+        CacheGeracao.objects.filter(pk__in=excedentes).delete()
+
+
+def resumo():
+    """ Totais persistentes: entradas, hits e tempo de IA economizado. """
+    totais = CacheGeracao.objects.filter(resposta__isnull=False).aggregate(
+        hits=Sum('hits'),
+        economia_ms=Sum(F('hits') * F('latencia_ms')),
+    )
+    return {
+        'entradas': CacheGeracao.objects.count(),
+        'hits': totais['hits'] or 0,
+        'economia_ms': totais['economia_ms'] or 0,
+        'processo': dict(estatisticas),
+    }
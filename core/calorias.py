@@ -0,0 +1,74 @@
+# core/calorias.py
+"""
+Calorias das receitas.
+
+``Receita.total_caloria`` é a soma, sobre ``IngredienteReceita``, das calorias
+do ingrediente (por porção de 100g/100ml) multiplicadas pela quantidade.
+O total é recalculado no banco, por ``UPDATE`` com subconsulta, apenas para as
+receitas afetadas por cada alteração; ``recalcular_todas`` refaz tudo em lotes.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+from django.utils import timezone
+
+from . import fragmentos
+from .models import IngredienteReceita, Receita
+
+# Calorias de uma linha de IngredienteReceita, na unidade em que foi informada
+CALORIAS_DO_ITEM = F('ingrediente__caloria') * Case(
+    When(unidade=IngredienteReceita.PORCAO, then=F('quantidade')),
+    # Multiplicar por 0.01 evita a divisão inteira do SQLite quando a quantidade é inteira
+    default=F('quantidade') * Value(Decimal('0.01')),
+    output_field=DecimalField(max_digits=12, decimal_places=4),
+)
+
+
+def calorias_do_item(caloria, quantidade, unidade):
+    """ Mesma conta de ``CALORIAS_DO_ITEM``, em Python. """
+    fator = quantidade if unidade == IngredienteReceita.PORCAO else quantidade / 100
+    return caloria * fator
+
+
+def _total_subquery():
+    soma = (
+        IngredienteReceita.objects.filter(receita=OuterRef('pk'))
+        .values('receita')
+        .annotate(total=Sum(CALORIAS_DO_ITEM))
+        .values('total')
+    )
+    return Cast(Round(Coalesce(Subquery(soma), Value(0), output_field=DecimalField())), IntegerField())
+
+
+def recalcular_receitas(receitas):
+    """
+    Recalcula o total das receitas dadas (ids ou queryset) num único UPDATE,
+    que também renova ``atualizado_em`` (o detalhe da receita mudou).
+    """
+    return Receita.objects.filter(pk__in=receitas).update(
+        total_caloria=_total_subquery(), atualizado_em=timezone.now()
+    )
+
+
+def recalcular_por_ingrediente(ingredientes):
+    """ Recalcula as receitas que usam os ingredientes dados (após mudar ``caloria``). """
+    receitas = IngredienteReceita.objects.filter(ingrediente__in=ingredientes).values('receita')
+    return recalcular_receitas(receitas)
+
+
+def recalcular_todas(lote=5000):
+    """
+    Recalcula todas as receitas em faixas de ``lote`` ids: cada faixa é uma
+    única passada agregada sobre a tabela de junção, feita pelo banco.
+    Devolve o número de receitas atualizadas; os fragmentos cacheados de
+    todas as receitas são descartados (o ``UPDATE`` não dispara signals).
+    """
+    atualizadas = 0
+    ultimo = Receita.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for inicio in range(0, ultimo + 1, lote):
+        atualizadas += Receita.objects.filter(pk__gte=inicio, pk__lt=inicio + lote).update(
+            total_caloria=_total_subquery(), atualizado_em=timezone.now()
+        )
+    fragmentos.invalidar_tudo(Receita)
+    return atualizadas
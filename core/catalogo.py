@@ -0,0 +1,33 @@
+# core/catalogo.py
+"""
+Catálogo de nomes de ingredientes usado pelo formulário de geração por IA.
+
+O JSON é montado uma vez por versão (contador ``versao_ingredientes``, que
+sobe a cada alteração em ingredientes) e guardado no processo; a view o serve
+com ETag e, quando pedido pela URL versionada, com cache de longa duração.
+"""
+import json
+import threading
+
+from . import contadores
+from .models import Contador, Ingrediente
+
+_catalogo = {'versao': None, 'conteudo': b''}
+_lock = threading.Lock()
+
+
+def versao_atual():
+    return contadores.valores(Contador.VERSAO_INGREDIENTES)[Contador.VERSAO_INGREDIENTES]
+
+
+def conteudo(versao):
+    """ JSON do catálogo na ``versao`` informada (a atual, lida por quem chama). """
+    if _catalogo['versao'] != versao:
+        with _lock:
+            if _catalogo['versao'] != versao:
+                nomes = list(Ingrediente.objects.order_by('nome').values_list('nome', flat=True).distinct())
+                _catalogo['conteudo'] = json.dumps(
+                    {'versao': versao, 'ingredientes': nomes}, ensure_ascii=False
+                ).encode('utf-8')
+                _catalogo['versao'] = versao
+    return _catalogo['conteudo']
@@ -0,0 +1,182 @@
+# core/compatibilidade.py
+"""
+Receitas compatíveis com as restrições de uma dieta.
+
+Uma receita é compatível quando não usa nenhum dos ingredientes restritos da
+dieta (``Dieta.ingredientes_restritos``). Em vez de um anti-join no banco a
+cada pedido, cada processo mantém um índice invertido ingrediente -> receitas
+e a lista ordenada de todas as receitas: as proibidas são a união das listas
+dos ingredientes restritos, e as compatíveis são percorridas da mais recente
+para a mais antiga, pulando as proibidas.
+
+O índice segue o mesmo esquema de ``core/busca.py``: o contador
+``versao_receitas`` sobe a cada alteração, e após o commit o processo que a
+fez aplica a mudança no próprio índice; os demais releem, na próxima
+consulta, as receitas registradas no log das versões que perderam (ou
+recarregam tudo, se ficaram atrás demais).
+"""
+import threading
+from bisect import bisect_left, insort
+
+from django.db import transaction
+
+from . import contadores
+from .models import Contador, Dieta, IngredienteDieta, IngredienteReceita, Receita
+
+
+class IndiceCompatibilidade:
+    """ Receitas por ingrediente, e ingredientes por receita, em memória. """
+
+    def __init__(self):
+        # Como em core/busca.py: hooks de on_commit e leituras usam a mesma trava
+        self.lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self):
+        self.receitas = []  # ids em ordem crescente
+        self.por_ingrediente = {}  # ingrediente -> {receitas}
+        self.ingredientes = {}  # receita -> (ingredientes)
+        self.versao = None
+        self.marca = None  # da versão no log de alterações (core/contadores.py)
+
+    def _vincular(self, receita, ingredientes):
+        self.ingredientes[receita] = tuple(ingredientes)
+        for ingrediente in ingredientes:
+            self.por_ingrediente.setdefault(ingrediente, set()).add(receita)
+
+    def remover(self, receita):
+        posicao = bisect_left(self.receitas, receita)
+        if posicao < len(self.receitas) and self.receitas[posicao] == receita:
+            del self.receitas[posicao]
+        for ingrediente in self.ingredientes.pop(receita, ()):
+            receitas = self.por_ingrediente[ingrediente]
+            receitas.discard(receita)
+            if not receitas:
+                del self.por_ingrediente[ingrediente]
+
+    def atualizar(self, receita, ingredientes):
+        """ (Re)indexa uma receita existente com seus ingredientes atuais. """
+        if receita in self.ingredientes:
+            self.remover(receita)
+        insort(self.receitas, receita)
+        self._vincular(receita, ingredientes)
+
+    def carregar(self, receitas, vinculos):
+        """ Reconstrói a partir dos ids das receitas e de pares ``(receita, ingrediente)``. """
+        self._limpar()
+        self.receitas = sorted(receitas)
+        por_receita = {receita: [] for receita in self.receitas}
+        for receita, ingrediente in vinculos:
+            por_receita[receita].append(ingrediente)
+        for receita, ingredientes in por_receita.items():
+            self._vincular(receita, ingredientes)
+
+    def proibidas(self, restritos):
+        proibidas = set()
+        with self.lock:
+            for ingrediente in restritos:
+                proibidas |= self.por_ingrediente.get(ingrediente, set())
+        return proibidas
+
+    def total_compativeis(self, restritos):
+        with self.lock:
+            return len(self.receitas) - len(self.proibidas(restritos))
+
+    def compativeis(self, restritos, limite=None, antes_de=None):
+        """
+        Ids das receitas compatíveis, da mais recente para a mais antiga.
+        ``antes_de`` continua a partir de um id já visto (paginação).
+        """
+        with self.lock:
+            proibidas = self.proibidas(restritos)
+            fim = len(self.receitas) if antes_de is None else bisect_left(self.receitas, antes_de)
+            encontradas = []
+            for posicao in range(fim - 1, -1, -1):
+                receita = self.receitas[posicao]
+                if receita not in proibidas:
+                    encontradas.append(receita)
+                    if len(encontradas) == limite:
+                        break
+            return encontradas
+
+
+_indice = IndiceCompatibilidade()
+_lock = _indice.lock
+
+
+def _versao_atual():
+    return contadores.valores(Contador.VERSAO_RECEITAS)[Contador.VERSAO_RECEITAS]
+
+
+def _na_versao(versao):
+    """ O índice está na versão (e não numa homônima desfeita por rollback)? """
+    return (
+        _indice.versao == versao and _indice.marca is not None
+        and _indice.marca == contadores.marca(Contador.VERSAO_RECEITAS, versao)
+    )
+
+
+def _reler(receitas):
+    """ Reindexa as receitas (ids) com os ingredientes atuais; as que não existem mais saem. """
+    existentes = set(Receita.objects.filter(pk__in=receitas).values_list('id', flat=True))
+    ingredientes = {receita: [] for receita in existentes}
+    for receita, ingrediente in IngredienteReceita.objects.filter(
+        receita__in=existentes
+    ).values_list('receita_id', 'ingrediente_id'):
+        ingredientes[receita].append(ingrediente)
+    for receita in set(receitas) - existentes:
+        _indice.remover(receita)
+    for receita, ids in ingredientes.items():
+        _indice.atualizar(receita, ids)
+
+
+def obter_indice():
+    """ Índice do processo, posto em dia se outro processo alterou as receitas. """
+    versao = _versao_atual()
+    if _indice.versao != versao:
+        with _lock:
+            if _indice.versao != versao:
+                receitas, marca = contadores.alteracoes(Contador.VERSAO_RECEITAS, _indice.versao, _indice.marca, versao)
+                if receitas is None:
+                    _indice.carregar(
+                        Receita.objects.values_list('id', flat=True).iterator(chunk_size=5000),
+                        IngredienteReceita.objects.values_list(
+                            'receita_id', 'ingrediente_id'
+                        ).iterator(chunk_size=5000),
+                    )
+                else:
+                    _reler(receitas)
+                _indice.versao, _indice.marca = versao, marca
+    return _indice
+
+
+def notificar_alteracao(receitas=(), recarregar=False):
+    """
+    Registra que as receitas (ids) ou seus ingredientes mudaram. Após o commit,
+    se o índice deste processo estava exatamente na versão anterior, ele relê
+    apenas essas receitas; caso contrário alcança a versão pelo log na
+    próxima consulta.
+    """
+    receitas = set(receitas)
+    versao, marca = contadores.registrar_versao(Contador.VERSAO_RECEITAS, None if recarregar else receitas)
+
+    def aplicar():
+        with _lock:
+            if recarregar:
+                _indice.versao = None
+            elif _na_versao(versao - 1):
+                _reler(receitas)
+                _indice.versao, _indice.marca = versao, marca
+
+    transaction.on_commit(aplicar)
+
+
+def dieta_ativa(usuario):
+    """ A dieta ativa mais recente do usuário, ou ``None``. """
+    return Dieta.objects.filter(usuario=usuario, is_active=True).order_by('-id').first()
+
+
+def ingredientes_restritos(dieta):
+    if dieta is None:
+        return []
+    return list(IngredienteDieta.objects.filter(dieta=dieta).values_list('ingrediente_id', flat=True))
@@ -0,0 +1,131 @@
+# core/compras.py
+"""
+Listas de compras a partir das refeições planejadas.
+
+``gerar_lista`` agrega, numa única consulta, os ingredientes das receitas das
+refeições do usuário no período (Refeicao -> ReceitaRefeicao -> Receita ->
+IngredienteReceita) e grava a lista com um ``bulk_create``. Depois disso, as
+listas ativas são mantidas por diferença: cada receita incluída ou retirada
+de uma refeição do período soma ou subtrai seus ingredientes (ver
+core/signals.py), sem gerar a lista de novo.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+
+from .models import IngredienteListaCompra, IngredienteReceita, ListaDeCompra, Refeicao
+
+# Quantidade de um IngredienteReceita em gramas/mililitros (uma porção = 100)
+QUANTIDADE_BASE = Case(
+    When(unidade=IngredienteReceita.PORCAO, then=F('quantidade') * Value(Decimal('100'))),
+    default=F('quantidade'),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def gerar_lista(usuario, inicio, fim):
+    """ Cria a lista de compras das refeições de ``usuario`` entre ``inicio`` e ``fim``. """
+    itens = (
+        IngredienteReceita.objects.filter(
+            receita__receitarefeicao__refeicao__usuario=usuario,
+            receita__receitarefeicao__refeicao__date__range=(inicio, fim),
+        )
+        .values('ingrediente')
+        .annotate(ocorrencias=Count('id'), total=Sum(QUANTIDADE_BASE))
+        .order_by()
+    )
+    with transaction.atomic():
+        lista = ListaDeCompra.objects.create(usuario=usuario, data_inicio=inicio, data_fim=fim)
+        IngredienteListaCompra.objects.bulk_create([
+            IngredienteListaCompra(
+                lista_de_compra=lista,
+                ingrediente_id=item['ingrediente'],
+                ocorrencias=item['ocorrencias'],
+                quantidade=item['total'],
+            )
+            for item in itens
+        ])
+    return lista
+
+
+def ajustar(vinculos, sinal):
+    """
+    Soma (``sinal=1``) ou subtrai (``sinal=-1``) das listas ativas afetadas os
+    ingredientes de pares ``(receita_id, refeicao_id)`` incluídos ou retirados.
+    """
+    vinculos = [(receita, refeicao) for receita, refeicao in vinculos if receita and refeicao]
+    if not vinculos:
+        return
+    refeicoes = {
+        pk: (usuario, data)
+        for pk, usuario, data in Refeicao.objects.filter(
+            pk__in={refeicao for _, refeicao in vinculos}
+        ).values_list('id', 'usuario_id', 'date')
+    }
+    if not refeicoes:
+        return
+    datas = [data for _, data in refeicoes.values()]
+    listas = list(ListaDeCompra.objects.filter(
+        is_active=True,
+        usuario__in={usuario for usuario, _ in refeicoes.values()},
+        data_inicio__lte=max(datas),
+        data_fim__gte=min(datas),
+    ).values_list('id', 'usuario_id', 'data_inicio', 'data_fim'))
+    if not listas:
+        return
+
+    # Quantas vezes cada receita entra em cada lista
+    receitas_por_lista = defaultdict(lambda: defaultdict(int))
+    for receita, refeicao in vinculos:
+        if refeicao not in refeicoes:
+            continue
+        usuario, data = refeicoes[refeicao]
+        for lista, dono, inicio, fim in listas:
+            if dono == usuario and inicio <= data <= fim:
+                receitas_por_lista[lista][receita] += 1
+    if not receitas_por_lista:
+        return
+
+    ingredientes_por_receita = defaultdict(list)
+    for receita, ingrediente, quantidade in IngredienteReceita.objects.filter(
+        receita__in={receita for receitas in receitas_por_lista.values() for receita in receitas}
+    ).annotate(base=QUANTIDADE_BASE).values_list('receita_id', 'ingrediente_id', 'base'):
+        ingredientes_por_receita[receita].append((ingrediente, quantidade))
+
+    deltas = defaultdict(lambda: [0, Decimal(0)])  # (lista, ingrediente) -> [ocorrências, quantidade]
+    for lista, receitas in receitas_por_lista.items():
+        for receita, vezes in receitas.items():
+            for ingrediente, quantidade in ingredientes_por_receita[receita]:
+                delta = deltas[lista, ingrediente]
+                delta[0] += sinal * vezes
+                delta[1] += sinal * vezes * quantidade
+    _aplicar(deltas)
+
+
+def _aplicar(deltas):
+    with transaction.atomic():
+        existentes = {
+            (item.lista_de_compra_id, item.ingrediente_id): item
+            for item in IngredienteListaCompra.objects.select_for_update().filter(
+                lista_de_compra__in={lista for lista, _ in deltas},
+                ingrediente__in={ingrediente for _, ingrediente in deltas},
+            )
+        }
+        novos, alterados, removidos = [], [], []
+        for (lista, ingrediente), (ocorrencias, quantidade) in deltas.items():
+            item = existentes.get((lista, ingrediente))
+            if item is None:
+                if ocorrencias > 0:
+                    novos.append(IngredienteListaCompra(
+                        lista_de_compra_id=lista, ingrediente_id=ingrediente,
+                        ocorrencias=ocorrencias, quantidade=quantidade,
+                    ))
+                continue
+            item.ocorrencias += ocorrencias
+            item.quantidade = max(item.quantidade + quantidade, Decimal(0))
+            (alterados if item.ocorrencias > 0 else removidos).append(item)
+        IngredienteListaCompra.objects.bulk_create(novos)
+        IngredienteListaCompra.objects.bulk_update(alterados, ['ocorrencias', 'quantidade'])
+        IngredienteListaCompra.objects.filter(pk__in=[item.pk for item in removidos]).delete()
@@ -0,0 +1,109 @@
+# core/contadores.py
+"""
+Contadores materializados (tabela ``Contador``).
+
+Os incrementos usam ``UPDATE ... SET valor = valor + n`` e rodam na mesma
+transação da escrita que os originou, então um rollback desfaz os dois.
+
+Os contadores de versão (``versao_*``) guardam também, em ``AlteracaoVersao``,
+quais ids mudaram em cada versão: quem está poucas versões atrás aplica só
+essas mudanças (``alteracoes``) em vez de recarregar tudo.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AlteracaoVersao, Contador, Ingrediente, Receita
+
+# Versões mantidas no log; atrasos maiores recarregam tudo
+VERSOES_NO_LOG = 500
+
+
+def incrementar(nome, delta=1):
+    if not delta:
+        return
+    if Contador.objects.filter(nome=nome).update(valor=F('valor') + delta):
+        return
+    try:
+        with transaction.atomic():
+            Contador.objects.create(nome=nome, valor=delta)
+    except IntegrityError:
+        # Criado por outro processo entre o UPDATE e o INSERT
+        Contador.objects.filter(nome=nome).update(valor=F('valor') + delta)
+
+
+def definir(nome, valor):
+    Contador.objects.update_or_create(nome=nome, defaults={'valor': valor})
+
+
+def valores(*nomes):
+    """ Lê vários contadores numa única consulta; ausentes valem 0. """
+    encontrados = dict(Contador.objects.filter(nome__in=nomes).values_list('nome', 'valor'))
+    return {nome: encontrados.get(nome, 0) for nome in nomes}
+
+
+def registrar_versao(nome, ids=None):
+    """
+    Sobe o contador de versão ``nome`` e registra os ids alterados (``None``
+    quando tudo deve ser recarregado). Devolve ``(versao, marca)``.
+    """
+    incrementar(nome)
+    versao = valores(nome)[nome]
+    alteracao = AlteracaoVersao.objects.create(
+        contador=nome, versao=versao, ids=None if ids is None else sorted(set(ids))
+    )
+    if versao % 100 == 0:
+        AlteracaoVersao.objects.filter(contador=nome, versao__lte=versao - VERSOES_NO_LOG).delete()
+    return versao, alteracao.marca
+
+
+def marca(nome, versao):
+    """ Marca da versão no log, ou ``None`` se ela não está (mais) registrada. """
+    return AlteracaoVersao.objects.filter(contador=nome, versao=versao).values_list('marca', flat=True).first()
+
+
+def alteracoes(nome, desde, marca_desde, ate):
+    """
+    ``(ids, marca)`` para pôr em dia um índice que está na versão ``desde``:
+    ``ids`` são os alterados depois dela até ``ate``, ou ``None`` se for
+    preciso recarregar tudo (atraso maior que o log, versões já podadas,
+    ``desde`` desfeita por rollback ou alguma versão que pediu recarga
+    completa); ``marca`` é a da versão ``ate``.
+    """
+    alcancavel = desde is not None and marca_desde is not None and 0 < ate - desde <= VERSOES_NO_LOG
+    registros = list(
+        AlteracaoVersao.objects.filter(contador=nome, versao__gte=desde if alcancavel else ate, versao__lte=ate)
+        .order_by('versao').values_list('versao', 'marca', 'ids')
+    )
+    marca_ate = registros[-1][1] if registros and registros[-1][0] == ate else None
+    if not alcancavel or len(registros) != ate - desde + 1 or registros[0][1] != marca_desde:
+        return None, marca_ate
+    ids = [ids for _, _, ids in registros[1:]]
+    if None in ids:
+        return None, marca_ate
+    return set().union(*ids), marca_ate
+
+
+async def avalores(*nomes):
+    """ Versão assíncrona de ``valores``, para as views assíncronas. """
+    encontrados = {
+        nome: valor async for nome, valor in Contador.objects.filter(nome__in=nomes).values_list('nome', 'valor')
+    }
+    return {nome: encontrados.get(nome, 0) for nome in nomes}
+
+
+def contar():
+    """ Totais calculados direto nas tabelas (consultas de COUNT). """
+    return {
+        Contador.INGREDIENTES: Ingrediente.objects.count(),
+        Contador.RECEITAS: Receita.objects.count(),
+        Contador.RECEITAS_IA: Receita.objects.filter(is_ai_generated=True).count(),
+    }
+
+
+def recalcular():
+    """ Reconstrói os contadores a partir das tabelas. """
+    totais = contar()
+    with transaction.atomic():
+        for nome, valor in totais.items():
+            definir(nome, valor)
+    return totais
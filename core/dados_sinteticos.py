@@ -0,0 +1,230 @@
+# core/dados_sinteticos.py
+"""
+Bases sintéticas para medir views e consultas em volumes de produção.
+
+``GeradorDados`` cria ingredientes, receitas (com seus ingredientes),
+usuários (com dieta, restrições e agenda) e refeições (com receitas, dieta e
+agenda) a partir de uma semente: numa base vazia, a mesma semente e as mesmas
+quantidades produzem as mesmas linhas, tokens das agendas inclusive (só as
+datas de criação e alteração mudam). As inserções são feitas em
+``bulk_create`` por lotes, sem os signals de core/signals.py; os dados
+derivados (calorias, contadores e índices em memória) são reconstruídos uma
+única vez no final.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+
+from . import busca, busca_semantica, calorias, compatibilidade, contadores, duplicatas, fragmentos
+from .models import (
+    AgendaAlimentar, Categoria, Dieta, Ingrediente, IngredienteDieta, IngredienteReceita, Perfil, Receita,
+    ReceitaRefeicao, Refeicao, RefeicaoAgenda, RefeicaoDieta, RestricaoAlimentar, Usuario, UsuarioRestricao,
+)
+
+# Quantidades por escala; "producao" é o volume esperado em produção
+ESCALAS = {
+    'teste': {'ingredientes': 50, 'receitas': 200, 'usuarios': 10, 'refeicoes': 1_000},
+    'media': {'ingredientes': 2_000, 'receitas': 10_000, 'usuarios': 500, 'refeicoes': 100_000},
+    'producao': {'ingredientes': 10_000, 'receitas': 100_000, 'usuarios': 5_000, 'refeicoes': 1_000_000},
+}
+
+CATEGORIAS = [
+    "Carnes", "Aves", "Peixes", "Laticínios", "Grãos", "Legumes", "Verduras", "Frutas",
+    "Temperos", "Óleos", "Oleaginosas", "Bebidas",
+]
+ALIMENTOS = [
+    "Arroz", "Feijão", "Frango", "Carne Moída", "Tilápia", "Ovo", "Leite", "Queijo", "Tomate", "Cebola",
+    "Alho", "Batata", "Cenoura", "Abobrinha", "Brócolis", "Espinafre", "Banana", "Maçã", "Aveia", "Açúcar",
+    "Farinha de Trigo", "Azeite", "Manteiga", "Castanha", "Amendoim", "Iogurte", "Milho", "Lentilha",
+    "Grão-de-bico", "Mandioca",
+]
+VARIACOES = ["", "Integral", "Orgânico", "Light", "Defumado", "Cozido", "Cru", "em Pó", "Ralado", "Fatiado"]
+PRATOS = ["Risoto", "Salada", "Sopa", "Torta", "Bolo", "Refogado", "Escondidinho", "Omelete", "Assado", "Creme"]
+RESTRICOES = [
+    ("Lactose", "Intolerância à lactose"), ("Glúten", "Doença celíaca"), ("Vegetariano", "Sem carnes"),
+    ("Vegano", "Sem produtos de origem animal"), ("Amendoim", "Alergia a amendoim"),
+    ("Frutos do mar", "Alergia a frutos do mar"),
+]
+# Três refeições por dia para cada usuário
+TIPOS_DO_DIA = [Refeicao.CAFE_MANHA, Refeicao.ALMOCO, Refeicao.JANTAR]
+
+
+class GeradorDados:
+    """
+    Gera a base em ordem (ingredientes, receitas, usuários, refeições),
+    guardando apenas os ids necessários para as tabelas de junção.
+    """
+
+    def __init__(self, seed=0, lote=5000, inicio=date(2026, 1, 5), prefixo='sint'):
+        self.rng = random.Random(seed)
+        self.lote = lote
+        self.inicio = inicio
+        self.prefixo = f'{prefixo}{seed}'
+        self.ingredientes = []
+        self.receitas = []
+        self.usuarios = []  # (usuario_id, dieta_id, agenda_id)
+        self.totais = {}
+
+    def _inserir(self, model, objs):
+        # QuerySet puro: o bulk_create de BulkSignalQuerySet avisaria índices e
+        # contadores a cada lote, e eles são reconstruídos no final
+        objs = models.QuerySet(model).bulk_create(objs, batch_size=self.lote)
+        self.totais[model._meta.model_name] = self.totais.get(model._meta.model_name, 0) + len(objs)
+        return objs
+
+    def _em_lotes(self, total, criar):
+        """ Chama ``criar(inicio, fim)`` para cada faixa de ``lote`` itens, cada uma numa transação. """
+        for inicio in range(0, total, self.lote):
+            with transaction.atomic():
+                criar(inicio, min(inicio + self.lote, total))
+
+    def gerar(self, ingredientes, receitas, usuarios, refeicoes, ao_concluir_etapa=None):
+        for etapa, quantidade in (
+            (self.gerar_ingredientes, ingredientes),
+            (self.gerar_receitas, receitas),
+            (self.gerar_usuarios, usuarios),
+            (self.gerar_refeicoes, refeicoes),
+        ):
+            etapa(quantidade)
+            if ao_concluir_etapa:
+                ao_concluir_etapa(etapa.__name__, self.totais)
+        self.finalizar()
+        return self.totais
+
+    # --- Etapas ---
+
+    def gerar_ingredientes(self, quantidade):
+        Categoria.objects.bulk_create([Categoria(nome=nome) for nome in CATEGORIAS], ignore_conflicts=True)
+        categorias = list(Categoria.objects.filter(nome__in=CATEGORIAS).order_by('nome').values_list('id', flat=True))
+
+        def criar(inicio, fim):
+            objs = self._inserir(Ingrediente, [
+                Ingrediente(
+                    nome=f"{self.rng.choice(ALIMENTOS)} {self.rng.choice(VARIACOES)} {i}".replace('  ', ' '),
+                    caloria=self.rng.randint(5, 900),
+                    categoria_id=self.rng.choice(categorias),
+                )
+                for i in range(inicio, fim)
+            ])
+            self.ingredientes.extend(o.pk for o in objs)
+
+        self._em_lotes(quantidade, criar)
+
+    def _quantidade(self):
+        if self.rng.random() < 0.7:
+            return Decimal(self.rng.randint(5, 30)) / 10, IngredienteReceita.PORCAO
+        unidade = self.rng.choice([IngredienteReceita.GRAMA, IngredienteReceita.MILILITRO])
+        return Decimal(self.rng.randint(10, 500)), unidade
+
+    def gerar_receitas(self, quantidade):
+        def criar(inicio, fim):
+            objs = self._inserir(Receita, [
+                Receita(
+                    titulo=f"{self.rng.choice(PRATOS)} de {self.rng.choice(ALIMENTOS)} {i}",
+                    instrucoes="Misture os ingredientes e cozinhe até o ponto.",
+                    tempo_preparo=self.rng.randint(5, 120),
+                    is_ai_generated=self.rng.random() < 0.3,
+                )
+                for i in range(inicio, fim)
+            ])
+            itens = []
+            for receita in objs:
+                escolhidos = self.rng.sample(self.ingredientes, min(self.rng.randint(3, 10), len(self.ingredientes)))
+                for ingrediente in escolhidos:
+                    quantidade, unidade = self._quantidade()
+                    itens.append(IngredienteReceita(
+                        receita_id=receita.pk, ingrediente_id=ingrediente, quantidade=quantidade, unidade=unidade,
+                    ))
+            self._inserir(IngredienteReceita, itens)
+            self.receitas.extend(o.pk for o in objs)
+
+        self._em_lotes(quantidade, criar)
+
+    def gerar_usuarios(self, quantidade):
+        perfil, _ = Perfil.objects.get_or_create(tipo="Comum")
+        restricoes = []
+        for tipo, descricao in RESTRICOES:
+            restricao, _ = RestricaoAlimentar.objects.get_or_create(tipo=tipo, defaults={'descricao': descricao})
+            restricoes.append(restricao.pk)
+
+        def criar(inicio, fim):
+            usuarios = self._inserir(Usuario, [
+                # Senha inutilizável: evita o custo do hash e o login desses usuários
+                Usuario(username=f"{self.prefixo}-{i:07d}", email=f"{self.prefixo}-{i}@example.com",
+                        password='!', perfil_id=perfil.pk)
+                for i in range(inicio, fim)
+            ])
+            dietas, agendas, restritos, escolhidas = [], [], [], []
+            for usuario in usuarios:
+                minimo = self.rng.randint(3, 4)
+                dietas.append(Dieta(
+                    usuario_id=usuario.pk, min_refeicao=minimo, max_refeicao=self.rng.randint(minimo, 5),
+                    total_caloria=self.rng.randrange(1500, 3001, 50),
+                ))
+                # O token padrão (uuid4) não sairia igual com a mesma semente
+                token = uuid.UUID(int=self.rng.getrandbits(128), version=4)
+                agendas.append(AgendaAlimentar(usuario_id=usuario.pk, token=token))
+                escolhidas.append(self.rng.sample(restricoes, self.rng.randint(0, 2)))
+            dietas = self._inserir(Dieta, dietas)
+            agendas = self._inserir(AgendaAlimentar, agendas)
+            vinculos = []
+            for usuario, dieta, suas_restricoes in zip(usuarios, dietas, escolhidas):
+                escolhidos = self.rng.sample(self.ingredientes, min(self.rng.randint(0, 5), len(self.ingredientes)))
+                restritos.extend(
+                    IngredienteDieta(dieta_id=dieta.pk, ingrediente_id=ingrediente) for ingrediente in escolhidos
+                )
+                vinculos.extend(
+                    UsuarioRestricao(usuario_id=usuario.pk, restricao_alimentar_id=restricao)
+                    for restricao in suas_restricoes
+                )
+            self._inserir(IngredienteDieta, restritos)
+            self._inserir(UsuarioRestricao, vinculos)
+            self.usuarios.extend((u.pk, d.pk, a.pk) for u, d, a in zip(usuarios, dietas, agendas))
+
+        self._em_lotes(quantidade, criar)
+
+    def gerar_refeicoes(self, quantidade):
+        if quantidade and not (self.usuarios and self.receitas):
+            raise ValueError("Refeições precisam de usuários e receitas.")
+        total_usuarios = len(self.usuarios)
+
+        def criar(inicio, fim):
+            refeicoes, donos = [], []
+            for i in range(inicio, fim):
+                # Cada usuário recebe as refeições em sequência: três por dia
+                usuario, dieta, agenda = self.usuarios[i % total_usuarios]
+                posicao = i // total_usuarios
+                refeicoes.append(Refeicao(
+                    usuario_id=usuario,
+                    date=self.inicio + timedelta(days=posicao // len(TIPOS_DO_DIA)),
+                    tipo_refeicao=TIPOS_DO_DIA[posicao % len(TIPOS_DO_DIA)],
+                ))
+                donos.append((dieta, agenda))
+            refeicoes = self._inserir(Refeicao, refeicoes)
+            receitas, dietas, agendas = [], [], []
+            for refeicao, (dieta, agenda) in zip(refeicoes, donos):
+                receitas.extend(
+                    ReceitaRefeicao(refeicao_id=refeicao.pk, receita_id=receita)
+                    for receita in self.rng.sample(self.receitas, min(self.rng.randint(1, 2), len(self.receitas)))
+                )
+                dietas.append(RefeicaoDieta(refeicao_id=refeicao.pk, dieta_id=dieta))
+                agendas.append(RefeicaoAgenda(refeicao_id=refeicao.pk, agenda_alimentar_id=agenda))
+            self._inserir(ReceitaRefeicao, receitas)
+            self._inserir(RefeicaoDieta, dietas)
+            self._inserir(RefeicaoAgenda, agendas)
+
+        self._em_lotes(quantidade, criar)
+
+    def finalizar(self):
+        """ Reconstrói o que os signals manteriam: calorias, assinaturas, contadores, índices e fragmentos. """
+        calorias.recalcular_todas(lote=self.lote)
+        duplicatas.indexar_todas(lote=self.lote)
+        if busca_semantica.obter_indice().existe():
+            busca_semantica.reconstruir(lote=self.lote)
+        fragmentos.invalidar_tudo(Ingrediente)
+        contadores.recalcular()
+        busca.notificar_alteracao(recarregar=True)
+        compatibilidade.notificar_alteracao(recarregar=True)
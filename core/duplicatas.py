@@ -0,0 +1,261 @@
+# core/duplicatas.py
+"""
+Receitas quase iguais, por MinHash e LSH.
+
+Cada receita tem duas assinaturas MinHash (``AssinaturaReceita``) sobre
+conjuntos de termos normalizados:
+
+* ``tema``: palavras do título e do prompt que a gerou. Um prompt novo é
+  comparado com ela antes de chamar a IA, para oferecer uma receita que já
+  existe (``semelhantes_ao_prompt``);
+* ``conteudo``: pares de palavras do título e das instruções, mais as
+  palavras do título e os ingredientes vinculados. Uma receita recém-gerada é comparada com ela antes
+  de ser gravada (``duplicata_de``), e o comando
+  ``mesclar_receitas_duplicadas`` agrupa e mescla as cópias já gravadas.
+
+A semelhança estimada é a fração de posições iguais entre duas assinaturas
+(aproxima o índice de Jaccard dos conjuntos). Para não comparar com todas as
+receitas, cada assinatura é cortada em ``BANDAS`` faixas e cada faixa vira
+uma chave (``BandaReceita``): só as receitas com alguma chave em comum são
+comparadas. Com 32 faixas de 4 valores, pares com semelhança 0,7 viram
+candidatos com probabilidade de 99,9%.
+
+As assinaturas são refeitas pelos signals de core/signals.py sempre que a
+receita ou seus ingredientes mudam.
+"""
+import hashlib
+import random
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+
+from .models import AssinaturaReceita, BandaReceita, GeracaoReceita, IngredienteReceita, Receita, ReceitaRefeicao
+from .texto import PALAVRAS_VAZIAS, palavras
+
+PERMUTACOES = 128
+BANDAS = 32
+LINHAS = PERMUTACOES // BANDAS
+
+# Semelhança mínima para oferecer uma receita ao prompt e para considerar duas receitas a mesma
+LIMIAR_PROMPT = 0.7
+LIMIAR_RECEITA = 0.8
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = (1 << 32) - 1
+# Coeficientes fixos: as assinaturas precisam ser iguais em todos os processos
+_aleatorio = random.Random(20260901)
+_A = np.array([_aleatorio.randrange(1, _MASCARA) for _ in range(PERMUTACOES)], dtype=np.uint64)
+_B = np.array([_aleatorio.randrange(0, _MASCARA) for _ in range(PERMUTACOES)], dtype=np.uint64)
+_VAZIA = np.full(PERMUTACOES, _MASCARA, dtype=np.uint32)
+
+
+# --- Termos ---
+
+def _palavras(*textos):
+    return [palavra for texto in textos if texto for palavra in palavras(texto) if palavra not in PALAVRAS_VAZIAS]
+
+
+def termos_tema(titulo, prompt=None):
+    return set(_palavras(titulo, prompt))
+
+
+def termos_conteudo(titulo, instrucoes, ingredientes=()):
+    sequencia = _palavras(titulo, instrucoes)
+    termos = {f'{a} {b}' for a, b in zip(sequencia, sequencia[1:])}
+    # O título pesa mais: receitas com as mesmas instruções e títulos diferentes não são a mesma
+    termos.update(f'titulo:{palavra}' for palavra in _palavras(titulo))
+    termos.update(f'#{ingrediente}' for ingrediente in ingredientes)
+    return termos
+
+
+# --- Assinaturas ---
+
+def _hash32(termo):
+    return int.from_bytes(hashlib.blake2b(termo.encode(), digest_size=4).digest(), 'little')
+
+
+def assinatura(termos):
+    """ Assinatura MinHash (``PERMUTACOES`` inteiros de 32 bits) de um conjunto de termos. """
+    if not termos:
+        return _VAZIA.copy()
+    valores = np.fromiter((_hash32(termo) for termo in termos), dtype=np.uint64, count=len(termos))
+    # (a * x + b) mod p, sem estouro: a, b e x têm 32 bits
+    permutados = (_A[:, None] * valores[None, :] + _B[:, None]) % _PRIMO & _MASCARA
+    return permutados.min(axis=1).astype(np.uint32)
+
+
+def semelhanca(a, b):
+    """ Estimativa do índice de Jaccard entre os conjuntos das duas assinaturas. """
+    if (a == _MASCARA).all() or (b == _MASCARA).all():
+        return 0.0  # conjunto vazio não se parece com nada
+    return float(np.count_nonzero(a == b)) / PERMUTACOES
+
+
+def chaves(tipo, valores):
+    """ Uma chave de 63 bits por faixa da assinatura. """
+    if (valores == _MASCARA).all():
+        return []
+    resultado = []
+    for banda in range(BANDAS):
+        faixa = valores[banda * LINHAS:(banda + 1) * LINHAS].tobytes()
+        digest = hashlib.blake2b(tipo.encode() + bytes([banda]) + faixa, digest_size=8).digest()
+        resultado.append(int.from_bytes(digest, 'little', signed=True))
+    return resultado
+
+
+def _ler(dados):
+    return np.frombuffer(bytes(dados), dtype=np.uint32)
+
+
+# --- Manutenção ---
+
+def indexar(receitas):
+    """ Refaz as assinaturas e chaves das receitas dadas (ids); as removidas são ignoradas. """
+    receitas = set(receitas)
+    if not receitas:
+        return 0
+    linhas = list(Receita.objects.filter(pk__in=receitas).values_list('id', 'titulo', 'instrucoes', 'prompt_geracao'))
+    ingredientes = {}
+    for receita, ingrediente in IngredienteReceita.objects.filter(
+        receita__in=receitas
+    ).values_list('receita_id', 'ingrediente_id'):
+        ingredientes.setdefault(receita, []).append(ingrediente)
+
+    assinaturas, bandas = [], []
+    for pk, titulo, instrucoes, prompt in linhas:
+        tema = assinatura(termos_tema(titulo, prompt))
+        conteudo = assinatura(termos_conteudo(titulo, instrucoes, ingredientes.get(pk, ())))
+        assinaturas.append(AssinaturaReceita(receita_id=pk, tema=tema.tobytes(), conteudo=conteudo.tobytes()))
+        for tipo, valores in ((BandaReceita.TEMA, tema), (BandaReceita.CONTEUDO, conteudo)):
+            bandas.extend(BandaReceita(receita_id=pk, tipo=tipo, chave=chave) for chave in chaves(tipo, valores))
+
+    with transaction.atomic():
+        BandaReceita.objects.filter(receita__in=receitas).delete()
+        AssinaturaReceita.objects.filter(receita__in=receitas).delete()
+        AssinaturaReceita.objects.bulk_create(assinaturas)
+        BandaReceita.objects.bulk_create(bandas)
+    return len(assinaturas)
+
+
+def indexar_todas(lote=2000):
+    """ Refaz as assinaturas de todas as receitas, em faixas de ``lote`` ids. """
+    total = 0
+    ultimo = Receita.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for inicio in range(0, ultimo + 1, lote):
+        total += indexar(Receita.objects.filter(pk__gte=inicio, pk__lt=inicio + lote).values_list('pk', flat=True))
+    return total
+
+
+# --- Consultas ---
+
+def _candidatas(tipo, valores, campo):
+    """ ``{receita_id: assinatura}`` das receitas com alguma chave em comum. """
+    ids = set(BandaReceita.objects.filter(
+        tipo=tipo, chave__in=chaves(tipo, valores)
+    ).values_list('receita_id', flat=True))
+    if not ids:
+        return {}
+    return {
+        receita: _ler(dados)
+        for receita, dados in AssinaturaReceita.objects.filter(receita__in=ids).values_list('receita_id', campo)
+    }
+
+
+def _mais_semelhantes(tipo, valores, campo, limiar, limite):
+    encontradas = sorted(
+        (
+            (valor, receita)
+            for receita, outra in _candidatas(tipo, valores, campo).items()
+            if (valor := semelhanca(valores, outra)) >= limiar
+        ),
+        key=lambda item: (-item[0], item[1]),
+    )[:limite]
+    receitas = Receita.objects.in_bulk([receita for _, receita in encontradas])
+    return [(valor, receitas[receita]) for valor, receita in encontradas if receita in receitas]
+
+
+def semelhantes_ao_prompt(prompt, limite=3, limiar=LIMIAR_PROMPT):
+    """ ``[(semelhança, receita)]`` das receitas cujo tema se parece com o prompt, das mais parecidas. """
+    return _mais_semelhantes(
+        BandaReceita.TEMA, assinatura(termos_tema(prompt)), 'tema', limiar, limite,
+    )
+
+
+def duplicata_de(titulo, instrucoes, ingredientes=(), limiar=LIMIAR_RECEITA):
+    """ A receita gravada mais parecida com o conteúdo dado, se passar do limiar; senão ``None``. """
+    encontradas = _mais_semelhantes(
+        BandaReceita.CONTEUDO, assinatura(termos_conteudo(titulo, instrucoes, ingredientes)), 'conteudo',
+        limiar, 1,
+    )
+    return encontradas[0][1] if encontradas else None
+
+
+def grupos_duplicados(limiar=LIMIAR_RECEITA):
+    """
+    Grupos (listas ordenadas de ids, com dois ou mais) de receitas quase
+    iguais entre si: pares candidatos pelas chaves de conteúdo, confirmados
+    pela assinatura e unidos transitivamente.
+    """
+    repetidas = (
+        BandaReceita.objects.filter(tipo=BandaReceita.CONTEUDO)
+        .values('chave').annotate(total=Count('id')).filter(total__gt=1).values('chave')
+    )
+    baldes = {}
+    for chave, receita in BandaReceita.objects.filter(
+        tipo=BandaReceita.CONTEUDO, chave__in=repetidas
+    ).values_list('chave', 'receita_id').iterator(chunk_size=5000):
+        baldes.setdefault(chave, set()).add(receita)
+    if not baldes:
+        return []
+
+    envolvidas = set().union(*baldes.values())
+    assinaturas = {}
+    for receita, dados in AssinaturaReceita.objects.filter(
+        receita__in=envolvidas
+    ).values_list('receita_id', 'conteudo').iterator(chunk_size=5000):
+        assinaturas[receita] = _ler(dados)
+
+    pai = {}
+
+    def raiz(receita):
+        while pai.get(receita, receita) != receita:
+            pai[receita] = pai.get(pai[receita], pai[receita])  # encurta o caminho
+            receita = pai[receita]
+        return receita
+
+    for membros in baldes.values():
+        membros = sorted(membros)
+        for i, a in enumerate(membros):
+            for b in membros[i + 1:]:
+                ra, rb = raiz(a), raiz(b)
+                if ra != rb and semelhanca(assinaturas[a], assinaturas[b]) >= limiar:
+                    pai[max(ra, rb)] = min(ra, rb)
+
+    grupos = {}
+    for receita in pai:
+        grupos.setdefault(raiz(receita), {raiz(receita)}).add(receita)
+    return sorted(sorted(grupo) for grupo in grupos.values())
+
+
+def mesclar(grupo):
+    """
+    Mantém a receita mais antiga do grupo e mescla nela as demais: as
+    refeições e os pedidos de geração passam a apontar para ela e as cópias
+    são apagadas. Devolve o número de receitas apagadas.
+    """
+    principal, *copias = sorted(grupo)
+    with transaction.atomic():
+        # Pelos models, e não por update(), para que listas de compras e agendas
+        # acompanhem a troca (signals)
+        vinculadas = set(ReceitaRefeicao.objects.filter(receita=principal).values_list('refeicao_id', flat=True))
+        for vinculo in ReceitaRefeicao.objects.filter(receita__in=copias):
+            refeicao = vinculo.refeicao_id
+            vinculo.delete()
+            if refeicao and refeicao not in vinculadas:
+                ReceitaRefeicao.objects.create(receita_id=principal, refeicao_id=refeicao)
+                vinculadas.add(refeicao)
+        GeracaoReceita.objects.filter(receita__in=copias).update(receita=principal)
+        IngredienteReceita.objects.filter(receita__in=copias).delete()
+        Receita.objects.filter(pk__in=copias).delete()
+    return len(copias)
@@ -18,6 +18,9 @@ class ReceitaIAForm(forms.ModelForm):
     Formulário para geração de receita via IA.
     Apenas o prompt_geracao é obrigatório; outros campos serão preenchidos pela IA.
     """
+    # Enviado pelo botão "Gerar mesmo assim", quando já há receitas parecidas com o prompt
+    gerar_mesmo_assim = forms.BooleanField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Receita
         fields = ['prompt_geracao']
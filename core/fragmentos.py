@@ -0,0 +1,102 @@
+# core/fragmentos.py
+"""
+Versões dos fragmentos de template cacheados por objeto.
+
+As linhas das listas de receitas e de ingredientes e o corpo do detalhe da
+receita ficam no cache com ``{% cache %}``, numa chave com o id do objeto e
+a sua ``versao_cache``. A versão junta dois tokens guardados no próprio
+cache: um por objeto, apagado quando o objeto (ou algo que aparece no seu
+fragmento) muda, e um por model, apagado quando todos mudam de uma vez. Um
+token apagado é recriado com outro valor na próxima leitura, e os
+fragmentos antigos deixam de ser usados e expiram sozinhos.
+
+As invalidações vêm dos signals de core/signals.py e das rotinas que gravam
+sem signals (``bulk_update``, ``UPDATE`` em massa).
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _chave(model, pk):
+    return f'fragmento:{model._meta.label_lower}:{pk}'
+
+
+def _chave_geral(model):
+    return f'fragmento:{model._meta.label_lower}'
+
+
+def _versionar(objetos, achados):
+    """ Define ``versao_cache`` nos objetos; devolve os tokens que faltavam, para gravar. """
+    model = type(objetos[0])
+    novos = {}
+    geral = achados.get(_chave_geral(model)) or novos.setdefault(_chave_geral(model), uuid.uuid4().hex[:12])
+    for obj in objetos:
+        chave = _chave(model, obj.pk)
+        token = achados.get(chave) or novos.setdefault(chave, uuid.uuid4().hex[:12])
+        obj.versao_cache = f'{geral}.{token}'
+    return novos
+
+
+def _chaves(objetos):
+    model = type(objetos[0])
+    return [_chave_geral(model)] + [_chave(model, obj.pk) for obj in objetos]
+
+
+def versionar(objetos):
+    """ Define ``versao_cache`` nos objetos (todos do mesmo model), com uma leitura do cache. """
+    objetos = list(objetos)
+    if objetos:
+        novos = _versionar(objetos, cache.get_many(_chaves(objetos)))
+        if novos:
+            cache.set_many(novos, settings.FRAGMENTOS_TTL)
+    return objetos
+
+
+async def aversionar(objetos):
+    objetos = list(objetos)
+    if objetos:
+        novos = _versionar(objetos, await cache.aget_many(_chaves(objetos)))
+        if novos:
+            await cache.aset_many(novos, settings.FRAGMENTOS_TTL)
+    return objetos
+
+
+def _apagar(chaves):
+    cache.delete_many(chaves)
+    # De novo após o commit: uma requisição que leu os dados antigos antes dele
+    # pode ter recriado o token nesse meio tempo
+    transaction.on_commit(lambda: cache.delete_many(chaves))
+
+
+def invalidar(model, pks):
+    """ Descarta os fragmentos dos objetos ``pks`` de ``model``. """
+    chaves = [_chave(model, pk) for pk in set(pks) if pk is not None]
+    if chaves:
+        _apagar(chaves)
+
+
+def invalidar_tudo(*models):
+    """ Descarta os fragmentos de todos os objetos dos models dados. """
+    _apagar([_chave_geral(model) for model in models])
+
+
+class FragmentosMixin:
+    """
+    Para listas com ``get`` assíncrono herdado: versiona os objetos exibidos
+    (``object_list``) antes de o template ser renderizado e
+    passa o TTL dos fragmentos no contexto (``ttl_fragmentos``). Views que
+    definem o próprio ``get`` chamam ``aversionar`` nele.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        response = await super().get(request, *args, **kwargs)
+        contexto = getattr(response, 'context_data', None)
+        if contexto is not None:
+            await aversionar(contexto['object_list'])
+        return response
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(ttl_fragmentos=settings.FRAGMENTOS_TTL, **kwargs)
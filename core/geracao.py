@@ -0,0 +1,242 @@
+# core/geracao.py
+"""
+Fila de geração de receitas por IA.
+
+A view apenas enfileira um ``GeracaoReceita``; os processos do comando
+``processar_geracoes`` reservam os pedidos pendentes, chamam a IA e salvam
+a ``Receita`` resultante. Em ``atender_fila`` cada processo mantém muitas
+gerações aguardando a IA ao mesmo tempo, num único loop de eventos.
+"""
+import asyncio
+import json
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from . import cache_ia, duplicatas, ia, resolvedor
+from .models import GeracaoReceita, IngredienteReceita, Receita
+from .provedor_ia import obter_provedor
+
+logger = logging.getLogger(__name__)
+
+
+def enfileirar(prompt):
+    """ Cria um pedido de geração pendente para o prompt. """
+    return GeracaoReceita.objects.create(prompt=prompt)
+
+
+def reservar_proxima():
+    """
+    Reserva o pedido pendente mais antigo para este processo.
+
+    No PostgreSQL a leitura usa ``SKIP LOCKED`` para que vários workers não
+    disputem a mesma linha; o ``UPDATE`` condicional garante a exclusividade
+    também nos bancos sem esse recurso (SQLite).
+    """
+    pendentes = GeracaoReceita.objects.filter(status=GeracaoReceita.PENDENTE).order_by('id')
+    while True:
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                geracao = pendentes.select_for_update(skip_locked=True).first()
+                if geracao is None:
+                    return None
+                reservados = _marcar_processando(geracao.pk)
+        else:
+            # Sem transação explícita: no SQLite, promover uma leitura a escrita
+            # dentro da mesma transação falha na hora em vez de aguardar o lock.
+            geracao = pendentes.first()
+            if geracao is None:
+                return None
+            reservados = _marcar_processando(geracao.pk)
+        if reservados:
+            geracao.status = GeracaoReceita.PROCESSANDO
+            return geracao
+
+
+def _marcar_processando(pk):
+    return GeracaoReceita.objects.filter(
+        pk=pk, status=GeracaoReceita.PENDENTE
+    ).update(status=GeracaoReceita.PROCESSANDO, atualizado_em=timezone.now())
+
+
+def salvar_receita(prompt, dados):
+    """
+    Cria a ``Receita`` a partir dos campos devolvidos pela IA, com os
+    ingredientes reconhecidos (ver core/resolvedor.py), ou devolve uma já
+    gravada quase idêntica a ela (ver core/duplicatas.py).
+    """
+    itens = resolvedor.resolver_itens(dados.get('ingredientes', ()))
+    existente = duplicatas.duplicata_de(dados['titulo'], dados['instrucoes'], [pk for pk, _, _ in itens])
+    if existente is not None:
+        logger.info("Receita gerada para %r já existe: %s", prompt[:50], existente.pk)
+        return existente
+    receita = montar_receita(prompt, dados)
+    with transaction.atomic():
+        receita.save()
+        IngredienteReceita.objects.bulk_create(montar_itens(receita, itens))
+    return receita
+
+
+def montar_receita(prompt, dados):
+    """ ``Receita`` (ainda não salva) com os campos devolvidos pela IA. """
+    return Receita(
+        titulo=dados['titulo'][:Receita._meta.get_field('titulo').max_length],
+        instrucoes=dados['instrucoes'],
+        tempo_preparo=dados['tempo_preparo'],
+        prompt_geracao=prompt,
+        is_ai_generated=True,
+    )
+
+
+def montar_itens(receita, itens):
+    """ ``IngredienteReceita`` (não salvos) da receita para ``[(ingrediente_id, quantidade, unidade)]``. """
+    return [
+        IngredienteReceita(receita=receita, ingrediente_id=pk, quantidade=quantidade, unidade=unidade)
+        for pk, quantidade, unidade in itens
+    ]
+
+
+def _concluir(geracao, dados):
+    with transaction.atomic():
+        geracao.receita = salvar_receita(geracao.prompt, dados)
+        geracao.status = GeracaoReceita.CONCLUIDA
+        geracao.save(update_fields=['receita', 'status', 'atualizado_em'])
+
+
+def _registrar_falha(geracao, erro):
+    logger.error("Falha na geração %s", geracao.pk, exc_info=erro)
+    geracao.status = GeracaoReceita.ERRO
+    geracao.erro = f"Erro ao gerar receita com IA: {erro}"
+    geracao.save(update_fields=['status', 'erro', 'atualizado_em'])
+
+
+def processar(geracao, backend=None):
+    """ Executa um pedido já reservado e registra o resultado. """
+    try:
+        _concluir(geracao, ia.gerar_receita(geracao.prompt, backend=backend))
+    except Exception as e:
+        _registrar_falha(geracao, e)
+    return geracao
+
+
+async def aprocessar(geracao, backend=None):
+    """ Versão assíncrona de ``processar``: só o acesso ao banco usa thread. """
+    try:
+        dados = await ia.agerar_receita(geracao.prompt, backend=backend)
+        await sync_to_async(_concluir)(geracao, dados)
+    except Exception as e:
+        await sync_to_async(_registrar_falha)(geracao, e)
+    return geracao
+
+
+def processar_pendentes(backend=None, limite=None):
+    """ Processa pedidos pendentes até esvaziar a fila (ou atingir ``limite``). """
+    processados = 0
+    while limite is None or processados < limite:
+        geracao = reservar_proxima()
+        if geracao is None:
+            break
+        processar(geracao, backend=backend)
+        processados += 1
+    return processados
+
+
+async def atender_fila(backend=None, concorrencia=100, intervalo=1.0, uma_vez=False):
+    """
+    Mantém até ``concorrencia`` pedidos em andamento, reservando outro assim
+    que um termina. Com ``uma_vez``, encerra quando a fila esvazia e os
+    pedidos em andamento terminam. Devolve o número de pedidos processados.
+    """
+    reservar = sync_to_async(reservar_proxima)
+    em_andamento = set()
+    processados = 0
+    while True:
+        geracao = await reservar() if len(em_andamento) < concorrencia else None
+        if geracao is not None:
+            em_andamento.add(asyncio.create_task(aprocessar(geracao, backend)))
+            processados += 1
+            continue
+        if not em_andamento:
+            if uma_vez:
+                return processados
+            await asyncio.sleep(intervalo)
+            continue
+        # Sem vagas ou sem pedidos: aguarda um terminar, mas volta à fila a cada intervalo
+        _, em_andamento = await asyncio.wait(em_andamento, timeout=intervalo, return_when=asyncio.FIRST_COMPLETED)
+
+
+def liberar_travadas(timeout=timedelta(minutes=10)):
+    """ Devolve à fila pedidos presos em processamento por um worker que morreu. """
+    limite = timezone.now() - timeout
+    return GeracaoReceita.objects.filter(
+        status=GeracaoReceita.PROCESSANDO, atualizado_em__lt=limite
+    ).update(status=GeracaoReceita.PENDENTE)
+
+
+def _evento(nome, dados):
+    """ Formata um evento Server-Sent Events. """
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+async def _repassar(tarefa, fila):
+    """ Itens postos na fila enquanto a tarefa roda (e os que sobrarem depois). """
+    while not (tarefa.done() and fila.empty()):
+        proximo = asyncio.ensure_future(fila.get())
+        await asyncio.wait({tarefa, proximo}, return_when=asyncio.FIRST_COMPLETED)
+        if proximo.done():
+            yield proximo.result()
+        else:
+            proximo.cancel()
+
+
+async def gerar_em_stream(prompt, provedor=None):
+    """
+    Gera a receita repassando os eventos SSE ``parcial`` (trechos do JSON),
+    ``concluida`` (URL da receita salva) ou ``erro``. Roda inteiramente no
+    loop de eventos: enquanto aguarda o modelo, nenhuma thread fica presa.
+    Com o cache ativo, pedidos idênticos em andamento são aguardados (como em
+    ``cache_ia.obter_ou_gerar``) e a resposta chega num único ``parcial``.
+    """
+    # Um comentário SSE imediato: o navegador recebe o primeiro byte sem esperar a IA
+    yield ": gerando\n\n"
+    provedor = provedor or obter_provedor()
+    partes = asyncio.Queue()
+
+    async def gerar():
+        recebidas = []
+        async for parte in provedor.gerar_stream(prompt, system_instruction=ia.SYSTEM_INSTRUCTION, modelo=ia.MODELO):
+            recebidas.append(parte)
+            partes.put_nowait(parte)
+        resposta = ''.join(recebidas)
+        ia.interpretar_resposta(resposta)  # só respostas válidas entram no cache
+        return resposta
+
+    if settings.IA_CACHE_ATIVO:
+        tarefa = asyncio.ensure_future(
+            cache_ia.aobter_ou_gerar(prompt, gerar, ia.SYSTEM_INSTRUCTION, ia.MODELO)
+        )
+    else:
+        tarefa = asyncio.ensure_future(gerar())
+    try:
+        repassou = False
+        async for parte in _repassar(tarefa, partes):
+            repassou = True
+            yield _evento('parcial', parte)
+        resposta = tarefa.result()
+        if not repassou:
+            # Veio do cache ou de uma geração idêntica de outro pedido
+            yield _evento('parcial', resposta)
+        receita = await sync_to_async(salvar_receita)(prompt, ia.interpretar_resposta(resposta))
+    except Exception as e:
+        logger.exception("Falha na geração em streaming")
+        yield _evento('erro', {'erro': f"Erro ao gerar receita com IA: {e}"})
+        return
+    finally:
+        # Cliente desconectado: não deixa a geração correndo sem ninguém para salvá-la
+        tarefa.cancel()
+    yield _evento('concluida', {'url': reverse('detalhes_receita', kwargs={'pk': receita.pk})})
@@ -0,0 +1,197 @@
+# core/geracao_lote.py
+"""
+Geração de receitas em lote, a partir de um arquivo de prompts.
+
+Os prompts são lidos em fluxo e gerados num único loop de eventos, com até
+``concorrencia`` chamadas em andamento e no máximo ``por_segundo`` chamadas
+iniciadas por segundo. As falhas transitórias são repetidas pelo provedor
+(``core.provedor_ia``); com o circuito aberto a geração aguarda a pausa e
+tenta de novo, em vez de descartar o resto do arquivo.
+
+As receitas prontas são gravadas a cada ``lote`` com um ``bulk_create`` e,
+logo depois, as linhas correspondentes entram no arquivo de progresso
+(JSONL, só acrescentado). Uma execução interrompida pode ser retomada com o
+mesmo arquivo: as linhas já concluídas são puladas e as que falharam são
+tentadas de novo. Prompts que já têm receita gerada, ou cuja receita sai
+quase igual a uma já gravada (core/duplicatas.py), reaproveitam a existente.
+"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from . import duplicatas, ia, resolvedor
+from .geracao import montar_itens, montar_receita
+from .models import IngredienteReceita, Receita
+from .provedor_ia import CircuitoAberto, obter_provedor
+
+
+@dataclass
+class Resultado:
+    lidas: int = 0
+    rejeitadas: int = 0
+    puladas: int = 0  # concluídas numa execução anterior
+    geradas: int = 0
+    reaproveitadas: int = 0
+    falhas: int = 0
+
+
+def ler_prompts(arquivo):
+    """
+    ``(número da linha, prompt)`` de um arquivo JSONL com objetos
+    ``{"prompt": ...}`` ou strings. Linhas sem prompt saem com ``None``.
+    """
+    for numero, linha in enumerate(arquivo, start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except ValueError:
+            yield numero, None
+            continue
+        prompt = dados.get('prompt') if isinstance(dados, dict) else dados
+        yield numero, prompt.strip() if isinstance(prompt, str) and prompt.strip() else None
+
+
+class LimiteTaxa:
+    """ Espaça o início das chamadas para no máximo ``por_segundo`` por segundo. """
+
+    def __init__(self, por_segundo=None, relogio=time.monotonic):
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self.relogio = relogio
+        self.proximo = 0.0
+
+    async def aguardar(self):
+        if not self.intervalo:
+            return
+        agora = self.relogio()
+        inicio = max(agora, self.proximo)
+        self.proximo = inicio + self.intervalo
+        if inicio > agora:
+            await asyncio.sleep(inicio - agora)
+
+
+class Progresso:
+    """ Registro das linhas já processadas: ``{"linha": n, "receita": id}`` ou ``{"linha": n, "erro": ...}``. """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.concluidas = set()
+        if self.caminho.exists():
+            with self.caminho.open(encoding='utf-8') as arquivo:
+                for linha in arquivo:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue  # última linha cortada por uma interrupção
+                    if 'receita' in registro:
+                        self.concluidas.add(registro['linha'])
+
+    def registrar(self, registros):
+        if not registros:
+            return
+        with self.caminho.open('a', encoding='utf-8') as arquivo:
+            arquivo.writelines(json.dumps(registro, ensure_ascii=False) + '\n' for registro in registros)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        self.concluidas.update(registro['linha'] for registro in registros if 'receita' in registro)
+
+
+class GeradorEmLote:
+    """ Gera e grava as receitas de uma sequência de ``(linha, prompt)``. """
+
+    def __init__(self, progresso, provedor=None, concorrencia=10, por_segundo=None, lote=100):
+        self.progresso = progresso
+        self.provedor = provedor or obter_provedor()
+        self.concorrencia = concorrencia
+        self.limite = LimiteTaxa(por_segundo)
+        self.lote = lote
+        self.resultado = Resultado()
+
+    async def _gerar(self, numero, prompt):
+        """ ``(linha, prompt, dados, erro)``: os campos da receita ou a exceção final. """
+        while True:
+            try:
+                return numero, prompt, await ia.agerar_receita(prompt, provedor=self.provedor), None
+            except CircuitoAberto:
+                await asyncio.sleep(self.provedor.circuito.pausa)
+            except Exception as e:
+                return numero, prompt, None, e
+
+    def _salvar(self, prontos):
+        """ Grava as receitas de ``prontos`` com um ``bulk_create`` e registra o progresso. """
+        geradas = [(numero, prompt, dados) for numero, prompt, dados, erro in prontos if erro is None]
+        registros = [
+            {'linha': numero, 'erro': f"{type(erro).__name__}: {erro}"}
+            for numero, _, _, erro in prontos if erro is not None
+        ]
+        self.resultado.falhas += len(registros)
+
+        # Prompts que já viraram receita (ex.: execução interrompida antes de gravar o progresso)
+        por_prompt = dict(Receita.objects.filter(
+            is_ai_generated=True, prompt_geracao__in={prompt for _, prompt, _ in geradas},
+        ).values_list('prompt_geracao', 'id'))
+        novas, vinculos = [], []
+        for numero, prompt, dados in geradas:
+            receita = por_prompt.get(prompt)
+            if receita is None:
+                itens = resolvedor.resolver_itens(dados.get('ingredientes', ()))
+                receita = duplicatas.duplicata_de(dados['titulo'], dados['instrucoes'], [pk for pk, _, _ in itens])
+                if receita is None:
+                    receita = montar_receita(prompt, dados)
+                    novas.append((receita, itens))
+                por_prompt[prompt] = receita
+            vinculos.append((numero, receita))
+        self.resultado.geradas += len(novas)
+        self.resultado.reaproveitadas += len(vinculos) - len(novas)
+
+        with transaction.atomic():
+            Receita.objects.bulk_create([receita for receita, _ in novas])
+            # Um único bulk_create com os ingredientes de todas as receitas do lote
+            IngredienteReceita.objects.bulk_create([
+                item for receita, itens in novas for item in montar_itens(receita, itens)
+            ])
+        registros.extend(
+            {'linha': numero, 'receita': receita if isinstance(receita, int) else receita.pk}
+            for numero, receita in vinculos
+        )
+        self.progresso.registrar(registros)
+
+    async def executar(self, pedidos, ao_salvar=None):
+        """ Processa os pedidos e devolve o ``Resultado``; ``ao_salvar(resultado)`` é chamado a cada lote. """
+        salvar = sync_to_async(self._salvar)
+        em_andamento, prontos = set(), []
+
+        async def aguardar(todos=False):
+            nonlocal em_andamento, prontos
+            if em_andamento:
+                feitos, em_andamento = await asyncio.wait(
+                    em_andamento, return_when=asyncio.ALL_COMPLETED if todos else asyncio.FIRST_COMPLETED,
+                )
+                prontos.extend(tarefa.result() for tarefa in feitos)
+            if len(prontos) >= self.lote or (todos and prontos):
+                await salvar(prontos)
+                prontos = []
+                if ao_salvar:
+                    ao_salvar(self.resultado)
+
+        for numero, prompt in pedidos:
+            self.resultado.lidas += 1
+            if prompt is None:
+                self.resultado.rejeitadas += 1
+                continue
+            if numero in self.progresso.concluidas:
+                self.resultado.puladas += 1
+                continue
+            while len(em_andamento) >= self.concorrencia:
+                await aguardar()
+            await self.limite.aguardar()
+            em_andamento.add(asyncio.create_task(self._gerar(numero, prompt)))
+        if em_andamento or prontos:
+            await aguardar(todos=True)
+        return self.resultado
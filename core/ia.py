@@ -0,0 +1,268 @@
+# core/ia.py
+"""
+Acesso ao modelo de IA usado para gerar receitas.
+
+O backend é escolhido por ``settings.IA_BACKEND`` (caminho pontilhado para uma
+classe), o que permite trocar o Gemini por um backend local nos testes e no
+worker de geração.
+
+As chamadas passam pelo provedor compartilhado do processo
+(``core.provedor_ia``), que limita a concorrência e repete falhas transitórias.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from . import cache_ia, metricas
+from .texto import PALAVRAS_VAZIAS, normalizar, palavras
+from .provedor_ia import ErroTransitorio, obter_provedor, Provedor
+
+MODELO = 'gemini-2.5-flash'
+
+SYSTEM_INSTRUCTION = (
+    "Você é um chef IA. Dada a lista de ingredientes e restrições do usuário, "
+    "gere uma receita completa. O resultado deve ser em JSON no formato: "
+    '{"titulo": "Nome da Receita", "instrucoes": "Passos...", "tempo_preparo": 30, '
+    '"ingredientes": [{"nome": "Arroz", "quantidade": 200, "unidade": "g"}]}. '
+    'Use "g", "ml" ou "porcao" como unidade e nomes simples de ingredientes, sem a quantidade.'
+)
+
+# Unidades aceitas em "ingredientes" (normalizadas) -> IngredienteReceita.unidade
+# Unidade aceita pela IA -> (unidade de IngredienteReceita, fator de conversão)
+UNIDADES = {
+    'g': ('g', 1), 'grama': ('g', 1), 'gramas': ('g', 1),
+    'kg': ('g', 1000), 'quilo': ('g', 1000), 'quilos': ('g', 1000),
+    'quilograma': ('g', 1000), 'quilogramas': ('g', 1000),
+    'ml': ('ml', 1), 'mililitro': ('ml', 1), 'mililitros': ('ml', 1),
+    'l': ('ml', 1000), 'litro': ('ml', 1000), 'litros': ('ml', 1000),
+    'porcao': ('porcao', 1), 'porcoes': ('porcao', 1), 'unidade': ('porcao', 1), 'unidades': ('porcao', 1),
+}
+QUANTIDADE_MAXIMA = Decimal('999999.99')
+TEMPO_MAXIMO = 7 * 24 * 60  # minutos; acima disso a resposta não é plausível
+_MINUTOS = re.compile(r'^\s*(\d+)\s*(?:min|minutos?)?\.?\s*$', re.IGNORECASE)
+
+
+class RespostaInvalida(ValueError):
+    """ A resposta da IA não tem o formato de uma receita. """
+
+
+class GeminiBackend:
+    """
+    Backend que chama a API do Gemini. É instanciado uma vez por processo
+    pelo provedor, então o cliente e suas conexões HTTP são reaproveitados.
+    """
+
+    def __init__(self):
+        from google import genai
+
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            raise EnvironmentError("GEMINI_API_KEY não configurada no ambiente.")
+        self._genai = genai
+        self.client = genai.Client(api_key=api_key)
+
+    def _config(self, system_instruction):
+        return self._genai.types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_mime_type="application/json",
+        )
+
+    def gerar(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        response = self.client.models.generate_content(
+            model=modelo,
+            contents=prompt,
+            config=self._config(system_instruction),
+        )
+        metricas.registrar_tokens(response.usage_metadata)
+        return response.text
+
+    async def agerar(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        """ Versão assíncrona de ``gerar``, pelo cliente assíncrono do Gemini. """
+        response = await self.client.aio.models.generate_content(
+            model=modelo,
+            contents=prompt,
+            config=self._config(system_instruction),
+        )
+        metricas.registrar_tokens(response.usage_metadata)
+        return response.text
+
+    async def gerar_stream(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        """ Produz o texto da resposta em partes, à medida que o modelo gera. """
+        stream = await self.client.aio.models.generate_content_stream(
+            model=modelo,
+            contents=prompt,
+            config=self._config(system_instruction),
+        )
+        uso = None
+        async for chunk in stream:
+            # O uso de tokens vem acumulado; vale o do último pedaço
+            uso = chunk.usage_metadata or uso
+            if chunk.text:
+                yield chunk.text
+        metricas.registrar_tokens(uso)
+
+
+class FakeBackend:
+    """
+    Backend local que devolve uma receita fixa sem acessar a rede.
+    Usado nos testes e para rodar o worker e benchmarks sem chave do Gemini;
+    ``latencia`` (segundos) e ``taxa_falha`` simulam o comportamento do serviço.
+    """
+
+    def __init__(self, latencia=None, taxa_falha=None):
+        self.latencia = settings.IA_FAKE_LATENCIA if latencia is None else latencia
+        self.taxa_falha = settings.IA_FAKE_TAXA_FALHA if taxa_falha is None else taxa_falha
+
+    PARTES_STREAM = 8
+
+    def _falhar_as_vezes(self):
+        if self.taxa_falha and random.random() < self.taxa_falha:
+            raise ErroTransitorio("Falha simulada pelo backend local.")
+
+    def _resposta(self, prompt):
+        # As palavras do prompt fazem as vezes de ingredientes, para exercitar a vinculação
+        nomes = [palavra for palavra in palavras(prompt) if palavra not in PALAVRAS_VAZIAS][:5]
+        return json.dumps({
+            'titulo': f'Receita de {prompt[:60]}',
+            'instrucoes': 'Misture os ingredientes e cozinhe por 20 minutos.',
+            'tempo_preparo': 20,
+            'ingredientes': [{'nome': nome, 'quantidade': 100, 'unidade': 'g'} for nome in nomes],
+        }, ensure_ascii=False)
+
+    def gerar(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        if self.latencia:
+            time.sleep(self.latencia)
+        self._falhar_as_vezes()
+        return self._resposta(prompt)
+
+    async def agerar(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        self._falhar_as_vezes()
+        return self._resposta(prompt)
+
+    async def gerar_stream(self, prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO):
+        self._falhar_as_vezes()
+        resposta = self._resposta(prompt)
+        tamanho = -(-len(resposta) // self.PARTES_STREAM)
+        for inicio in range(0, len(resposta), tamanho):
+            if self.latencia:
+                await asyncio.sleep(self.latencia / self.PARTES_STREAM)
+            yield resposta[inicio:inicio + tamanho]
+
+
+def _quantidade(valor, fator=1):
+    try:
+        quantidade = Decimal(str(valor).replace(',', '.'))
+        if not quantidade.is_finite():
+            return Decimal(1)
+        quantidade = (quantidade * fator).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return Decimal(1)
+    return quantidade if 0 < quantidade <= QUANTIDADE_MAXIMA else Decimal(1)
+
+
+def _ingredientes(itens):
+    """ ``[{'nome', 'quantidade', 'unidade'}]`` válidos da lista devolvida pela IA. """
+    if not isinstance(itens, list):
+        return []
+    resultado = []
+    for item in itens:
+        if isinstance(item, str):
+            item = {'nome': item}
+        if not isinstance(item, dict) or not isinstance(item.get('nome'), str) or not item['nome'].strip():
+            continue
+        unidade, fator = UNIDADES.get(normalizar(str(item.get('unidade') or '')).rstrip('.'), ('porcao', 1))
+        resultado.append({
+            'nome': item['nome'].strip()[:100],
+            'quantidade': _quantidade(item.get('quantidade', 1), fator),
+            'unidade': unidade,
+        })
+    return resultado
+
+
+def _texto(valor, padrao, campo, limite=None):
+    if valor is None:
+        return padrao
+    if isinstance(valor, list) and all(isinstance(parte, str) for parte in valor):
+        valor = '\n'.join(parte.strip() for parte in valor)  # passos numa lista
+    if not isinstance(valor, str):
+        raise RespostaInvalida(f"{campo} não é texto: {valor!r}")
+    valor = valor.strip()[:limite]
+    return valor or padrao
+
+
+def _tempo_preparo(valor):
+    """ Minutos como inteiro; aceita números e textos como ``"30 minutos"``. """
+    if valor is None:
+        return 20
+    if isinstance(valor, str):
+        encontrado = _MINUTOS.match(valor)
+        valor = int(encontrado.group(1)) if encontrado else valor
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, bool) or not isinstance(valor, int) or not 0 < valor <= TEMPO_MAXIMO:
+        raise RespostaInvalida(f"tempo_preparo inválido: {valor!r}")
+    return valor
+
+
+def interpretar_resposta(texto):
+    """
+    Converte o JSON devolvido pela IA nos campos usados por ``Receita`` e seus
+    ingredientes. Levanta ``RespostaInvalida`` (um ``ValueError``, como o erro
+    de JSON) se os campos não servem para gravar a receita.
+    """
+    dados = json.loads(texto)
+    if not isinstance(dados, dict):
+        raise RespostaInvalida("A resposta não é um objeto JSON.")
+    return {
+        'titulo': _texto(dados.get('titulo'), 'Receita Gerada', 'titulo', limite=100),
+        'instrucoes': _texto(dados.get('instrucoes'), 'Instruções não geradas.', 'instrucoes'),
+        'tempo_preparo': _tempo_preparo(dados.get('tempo_preparo')),
+        'ingredientes': _ingredientes(dados.get('ingredientes')),
+    }
+
+
+def gerar_receita(prompt, backend=None):
+    """
+    Gera uma receita para o prompt e devolve os campos já interpretados.
+    Com ``IA_CACHE_ATIVO``, prompts equivalentes reaproveitam a mesma resposta.
+    """
+    provedor = obter_provedor() if backend is None else Provedor(backend)
+
+    def chamar():
+        texto = provedor.gerar(prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO)
+        interpretar_resposta(texto)  # só respostas válidas entram no cache
+        return texto
+
+    if settings.IA_CACHE_ATIVO:
+        texto = cache_ia.obter_ou_gerar(prompt, chamar, SYSTEM_INSTRUCTION, MODELO)
+    else:
+        texto = chamar()
+    return interpretar_resposta(texto)
+
+
+async def agerar_receita(prompt, backend=None, provedor=None):
+    """
+    Versão assíncrona de ``gerar_receita``: enquanto aguarda o modelo (ou uma
+    geração idêntica em andamento) não ocupa thread. ``provedor`` permite
+    compartilhar um provedor próprio entre chamadas.
+    """
+    provedor = provedor or (obter_provedor() if backend is None else Provedor(backend))
+
+    async def chamar():
+        texto = await provedor.agerar(prompt, system_instruction=SYSTEM_INSTRUCTION, modelo=MODELO)
+        interpretar_resposta(texto)  # só respostas válidas entram no cache
+        return texto
+
+    if settings.IA_CACHE_ATIVO:
+        texto = await cache_ia.aobter_ou_gerar(prompt, chamar, SYSTEM_INSTRUCTION, MODELO)
+    else:
+        texto = await chamar()
+    return interpretar_resposta(texto)
@@ -0,0 +1,141 @@
+# core/importacao.py
+"""
+Importação em massa de tabelas de composição de alimentos.
+
+As linhas (dicionários com ``nome``, ``caloria`` e, opcionalmente,
+``categoria``) são lidas em fluxo e processadas em lotes: cada lote consulta
+os ingredientes existentes pelo nome, cria os novos com ``bulk_create`` e
+atualiza apenas os que mudaram com ``bulk_update``, numa transação. A memória
+usada depende do tamanho do lote, não do arquivo, e reimportar o mesmo
+arquivo não escreve nada.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import transaction
+
+from . import busca, calorias, fragmentos
+from .models import Categoria, Ingrediente, Receita
+
+
+@dataclass
+class Resultado:
+    lidas: int = 0
+    criados: int = 0
+    atualizados: int = 0
+    inalterados: int = 0
+    rejeitadas: int = 0
+    categorias_criadas: int = 0
+
+
+def ler_csv(arquivo, delimitador=','):
+    yield from csv.DictReader(arquivo, delimiter=delimitador)
+
+
+def ler_jsonl(arquivo):
+    """ Linhas que não são um objeto JSON saem como ``None`` e contam como rejeitadas. """
+    for linha in arquivo:
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except ValueError:
+            yield None
+            continue
+        yield dados if isinstance(dados, dict) else None
+
+
+class Importador:
+    """ Mantém o cache de categorias (nome -> id) entre os lotes. """
+
+    def __init__(self, lote=1000):
+        self.lote = lote
+        self.categorias = dict(Categoria.objects.values_list('nome', 'id'))
+        self.resultado = Resultado()
+
+    def importar(self, linhas, ao_concluir_lote=None):
+        linhas = iter(linhas)
+        while True:
+            bloco = list(islice(linhas, self.lote))
+            if not bloco:
+                return self.resultado
+            self.resultado.lidas += len(bloco)
+            with transaction.atomic():
+                self._importar_lote(bloco)
+            if ao_concluir_lote:
+                ao_concluir_lote(self.resultado)
+
+    def _limpar(self, linha):
+        """ ``(nome, caloria, categoria)`` da linha, ou ``None`` se for inválida. """
+        if linha is None:
+            return None
+        nome = (linha.get('nome') or '').strip()
+        categoria = (linha.get('categoria') or '').strip() or None
+        try:
+            caloria = round(float(str(linha.get('caloria')).replace(',', '.')))
+        except (ValueError, OverflowError):
+            return None
+        if not nome or len(nome) > 100 or caloria < 0 or (categoria and len(categoria) > 50):
+            return None
+        return nome, caloria, categoria
+
+    def _resolver_categorias(self, nomes):
+        faltando = {nome for nome in nomes if nome and nome not in self.categorias}
+        if not faltando:
+            return
+        # ignore_conflicts: outro processo pode ter criado a mesma categoria
+        Categoria.objects.bulk_create([Categoria(nome=nome) for nome in faltando], ignore_conflicts=True)
+        criadas = dict(Categoria.objects.filter(nome__in=faltando).values_list('nome', 'id'))
+        self.categorias.update(criadas)
+        self.resultado.categorias_criadas += len(criadas)
+
+    def _importar_lote(self, bloco):
+        # A última ocorrência de um nome no lote prevalece
+        dados = {}
+        for linha in bloco:
+            limpa = self._limpar(linha)
+            if limpa is None:
+                self.resultado.rejeitadas += 1
+                continue
+            dados[limpa[0]] = limpa
+        self._resolver_categorias(categoria for _, _, categoria in dados.values())
+
+        existentes = {}
+        for pk, nome, caloria, categoria_id in (
+            Ingrediente.objects.filter(nome__in=dados).order_by('-id')
+            .values_list('id', 'nome', 'caloria', 'categoria_id')
+        ):
+            existentes[nome] = (pk, caloria, categoria_id)  # o mais antigo prevalece
+
+        novos, alterados, caloria_alterada = [], [], []
+        for nome, caloria, categoria in dados.values():
+            categoria_id = self.categorias.get(categoria)
+            if nome not in existentes:
+                novos.append(Ingrediente(nome=nome, caloria=caloria, categoria_id=categoria_id))
+                continue
+            pk, caloria_atual, categoria_atual = existentes[nome]
+            if (caloria, categoria_id) == (caloria_atual, categoria_atual):
+                self.resultado.inalterados += 1
+                continue
+            alterados.append(Ingrediente(pk=pk, nome=nome, caloria=caloria, categoria_id=categoria_id))
+            if caloria != caloria_atual:
+                caloria_alterada.append(pk)
+
+        if novos:
+            # Contadores e índice de busca são atualizados pelo signal de bulk_create
+            Ingrediente.objects.bulk_create(novos)
+            self.resultado.criados += len(novos)
+        if alterados:
+            Ingrediente.objects.bulk_update(alterados, ['caloria', 'categoria'])
+            nomes_categorias = {pk: nome for nome, pk in self.categorias.items()}
+            busca.notificar_alteracao(ingredientes=[
+                (i.pk, i.nome, nomes_categorias.get(i.categoria_id)) for i in alterados
+            ])
+            # bulk_update não dispara signals
+            fragmentos.invalidar(Ingrediente, [i.pk for i in alterados])
+            self.resultado.atualizados += len(alterados)
+        if caloria_alterada:
+            calorias.recalcular_por_ingrediente(caloria_alterada)
+            fragmentos.invalidar_tudo(Receita)
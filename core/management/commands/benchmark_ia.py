@@ -0,0 +1,68 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.ia import FakeBackend
+from core.provedor_ia import Provedor
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede vazão e latência do provedor de IA contra o backend local, sem rede: com uma "
+        "thread por chamada (--modo threads) ou com todas as chamadas num loop de eventos (--modo async)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chamadas', type=int, default=200)
+        parser.add_argument('--modo', choices=['threads', 'async'], default='threads')
+        parser.add_argument('--threads', type=int, default=32, help="Chamadores simultâneos no modo threads.")
+        parser.add_argument('--latencia', type=float, default=0.1, help="Latência simulada (s).")
+        parser.add_argument('--taxa-falha', type=float, default=0.0, help="Fração de falhas transitórias.")
+        parser.add_argument('--max-simultaneas', type=int, default=None)
+
+    def handle(self, *args, **options):
+        provedor = Provedor(
+            FakeBackend(latencia=options['latencia'], taxa_falha=options['taxa_falha']),
+            max_simultaneas=options['max_simultaneas'],
+        )
+
+        def chamar(i):
+            inicio = time.perf_counter()
+            try:
+                provedor.gerar(f"prompt {i}")
+                return time.perf_counter() - inicio, None
+            except Exception as e:
+                return time.perf_counter() - inicio, type(e).__name__
+
+        async def achamar(i):
+            inicio = time.perf_counter()
+            try:
+                await provedor.agerar(f"prompt {i}")
+                return time.perf_counter() - inicio, None
+            except Exception as e:
+                return time.perf_counter() - inicio, type(e).__name__
+
+        async def todas_async():
+            return await asyncio.gather(*(achamar(i) for i in range(options['chamadas'])))
+
+        inicio = time.perf_counter()
+        if options['modo'] == 'async':
+            resultados = asyncio.run(todas_async())
+        else:
+            with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+                resultados = list(executor.map(chamar, range(options['chamadas'])))
+        total = time.perf_counter() - inicio
+
+        latencias = sorted(duracao for duracao, erro in resultados if erro is None)
+        erros = [erro for _, erro in resultados if erro]
+        self.stdout.write(f"Chamadas: {options['chamadas']} em {total:.2f}s "
+                          f"({options['chamadas'] / total:.1f}/s)")
+        if latencias:
+            p95 = latencias[int(len(latencias) * 0.95) - 1] if len(latencias) > 1 else latencias[0]
+            self.stdout.write(f"Latência p50: {statistics.median(latencias) * 1000:.0f}ms "
+                              f"p95: {p95 * 1000:.0f}ms")
+        self.stdout.write(f"Erros: {len(erros)} {sorted(set(erros))}")
+        self.stdout.write(f"Circuito: {provedor.circuito.estado}")
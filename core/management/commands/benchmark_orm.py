@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede as views e consultas principais contra a base atual e grava um relatório JSON; "
+        "com --comparar, mostra a variação em relação a um relatório anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--saida', help="Arquivo JSON do relatório.")
+        parser.add_argument('--comparar', metavar='RELATORIO', help="Relatório base (ex.: de outro commit).")
+        parser.add_argument('--caso', action='append', dest='casos', help="Mede só este caso (repetível).")
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError("--repeticoes deve ser ao menos 1.")
+        base = benchmark.carregar(options['comparar']) if options['comparar'] else None
+
+        def mostrar(nome, medicao):
+            self.stdout.write(
+                f"{nome:45} mediana {medicao['mediana_ms']:10.2f}ms  p95 {medicao['p95_ms']:10.2f}ms  "
+                f"{medicao['consultas']:4} consulta(s)  SQL {medicao['sql_ms']:10.2f}ms"
+            )
+
+        try:
+            relatorio = benchmark.executar(options['repeticoes'], options['casos'], ao_medir=mostrar)
+        except benchmark.ErroBenchmark as e:
+            raise CommandError(str(e))
+        if options['saida']:
+            benchmark.salvar(relatorio, options['saida'])
+            self.stdout.write(f"Relatório gravado em {options['saida']}.")
+
+        if base:
+            self.stdout.write(f"\nComparação com {base.get('commit') or options['comparar']}:")
+            for nome, antes, depois, variacao, consultas_antes, consultas_depois in benchmark.comparar(base, relatorio):
+                # Variações abaixo de 10% costumam ser ruído
+                estilo = self.style.ERROR if variacao > 0.1 else self.style.SUCCESS if variacao < -0.1 else str
+                consultas = ""
+                if consultas_antes != consultas_depois:
+                    consultas = f"  consultas {consultas_antes} -> {consultas_depois}"
+                self.stdout.write(estilo(f"{nome:45} {antes:10.2f}ms -> {depois:10.2f}ms ({variacao:+.0%}){consultas}"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core import cache_ia
+from core.models import CacheGeracao
+
+
+class Command(BaseCommand):
+    help = "Mostra a economia do cache de gerações por IA ou o esvazia."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limpar', action='store_true', help="Remove todas as entradas do cache.")
+
+    def handle(self, *args, **options):
+        if options['limpar']:
+            removidas, _ = CacheGeracao.objects.all().delete()
+            self.stdout.write(f"{removidas} entrada(s) removida(s).")
+            return
+
+        resumo = cache_ia.resumo()
+        self.stdout.write(f"Entradas: {resumo['entradas']}")
+        self.stdout.write(f"Hits: {resumo['hits']}")
+        self.stdout.write(f"Tempo de IA economizado: {resumo['economia_ms'] / 1000:.1f}s")
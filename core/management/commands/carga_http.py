@@ -0,0 +1,68 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera carga HTTP contra um servidor já em execução e mostra vazão e latência. "
+        "Rodado com os mesmos parâmetros contra o servidor WSGI e o ASGI, permite compará-los."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help="URLs completas, usadas em rodízio.")
+        parser.add_argument('--requisicoes', type=int, default=1000)
+        parser.add_argument('--concorrencia', type=int, default=50, help="Clientes simultâneos.")
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        alvos = [urlsplit(url) for url in options['urls']]
+        if any(alvo.scheme not in ('http', 'https') or not alvo.netloc for alvo in alvos):
+            raise CommandError("Informe URLs completas, ex.: http://localhost:8000/receitas/")
+        local = threading.local()
+
+        def conexao(alvo):
+            # Uma conexão keep-alive por cliente e servidor
+            conexoes = local.__dict__.setdefault('conexoes', {})
+            if alvo.netloc not in conexoes:
+                classe = HTTPSConnection if alvo.scheme == 'https' else HTTPConnection
+                conexoes[alvo.netloc] = classe(alvo.netloc, timeout=options['timeout'])
+            return conexoes[alvo.netloc]
+
+        def requisitar(i):
+            alvo = alvos[i % len(alvos)]
+            caminho = alvo.path or '/'
+            if alvo.query:
+                caminho += '?' + alvo.query
+            inicio = time.perf_counter()
+            try:
+                cliente = conexao(alvo)
+                cliente.request('GET', caminho)
+                resposta = cliente.getresponse()
+                resposta.read()
+                erro = None if resposta.status < 400 else f"HTTP {resposta.status}"
+            except Exception as e:
+                local.__dict__.get('conexoes', {}).pop(alvo.netloc, None)
+                erro = type(e).__name__
+            return time.perf_counter() - inicio, erro
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concorrencia']) as executor:
+            resultados = list(executor.map(requisitar, range(options['requisicoes'])))
+        total = time.perf_counter() - inicio
+
+        latencias = sorted(duracao for duracao, erro in resultados if erro is None)
+        erros = [erro for _, erro in resultados if erro]
+        self.stdout.write(f"Requisições: {options['requisicoes']} em {total:.2f}s "
+                          f"({options['requisicoes'] / total:.1f}/s)")
+        if latencias:
+            def percentil(p):
+                return latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000
+            self.stdout.write(f"Latência p50: {statistics.median(latencias) * 1000:.0f}ms "
+                              f"p95: {percentil(0.95):.0f}ms p99: {percentil(0.99):.0f}ms")
+        self.stdout.write(f"Erros: {len(erros)} {sorted(set(erros))}")
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dados_sinteticos import ESCALAS, GeradorDados
+from core.models import Receita, Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma base sintética e reprodutível (ingredientes, receitas, usuários com dietas e "
+        "restrições, refeições) para benchmarks. Quantidades avulsas sobrepõem as da escala."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=sorted(ESCALAS), default='teste')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--lote', type=int, default=5000, help="Linhas por bulk_create.")
+        for nome in ('ingredientes', 'receitas', 'usuarios', 'refeicoes'):
+            parser.add_argument(f'--{nome}', type=int, default=None)
+        parser.add_argument('--acrescentar', action='store_true',
+                            help="Permite gerar numa base que já tem dados (os ids deixam de ser reprodutíveis).")
+
+    def handle(self, *args, **options):
+        if not options['acrescentar'] and (Receita.objects.exists() or Usuario.objects.exists()):
+            raise CommandError("A base já tem dados; use uma base vazia ou --acrescentar.")
+        quantidades = {
+            nome: valor if options[nome] is None else options[nome]
+            for nome, valor in ESCALAS[options['escala']].items()
+        }
+
+        inicio = time.perf_counter()
+
+        def progresso(etapa, totais):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{etapa} concluída em {time.perf_counter() - inicio:.1f}s")
+
+        try:
+            totais = GeradorDados(seed=options['seed'], lote=options['lote']).gerar(
+                ao_concluir_etapa=progresso, **quantidades
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        resumo = ", ".join(f"{total} {nome}" for nome, total in totais.items())
+        self.stdout.write(self.style.SUCCESS(f"Base gerada em {time.perf_counter() - inicio:.1f}s: {resumo}."))
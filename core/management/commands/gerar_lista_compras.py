@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import compras
+from core.models import Usuario
+
+
+class Command(BaseCommand):
+    help = "Gera a lista de compras das refeições de um usuário num período."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario', help="Username do usuário.")
+        parser.add_argument('--inicio', type=date.fromisoformat, default=None,
+                            help="Primeiro dia (AAAA-MM-DD). Padrão: hoje.")
+        parser.add_argument('--dias', type=int, default=7, help="Quantidade de dias do período.")
+
+    def handle(self, *args, **options):
+        try:
+            usuario = Usuario.objects.get(username=options['usuario'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuário {options['usuario']} não encontrado.")
+        inicio = options['inicio'] or date.today()
+        lista = compras.gerar_lista(usuario, inicio, inicio + timedelta(days=options['dias'] - 1))
+        self.stdout.write(f"Lista {lista.pk} criada com {lista.ingredientes.count()} ingrediente(s).")
@@ -0,0 +1,82 @@
+import time
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+
+from core.geracao_lote import GeradorEmLote, Progresso, ler_prompts
+from core.ia import FakeBackend
+from core.provedor_ia import Provedor, obter_provedor
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera receitas com a IA a partir de um arquivo JSONL de prompts ({\"prompt\": ...} por linha), "
+        "com concorrência e taxa limitadas. Interrompido, retoma de onde parou pelo arquivo de progresso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--concorrencia', type=int, default=10, help="Chamadas à IA em andamento ao mesmo tempo.")
+        parser.add_argument('--por-segundo', type=float, default=None,
+                            help="Máximo de chamadas iniciadas por segundo (padrão: sem limite).")
+        parser.add_argument('--lote', type=int, default=100, help="Receitas gravadas por bulk_create.")
+        parser.add_argument('--tentativas', type=int, default=None,
+                            help="Tentativas por prompt em falhas transitórias (padrão: IA_TENTATIVAS).")
+        parser.add_argument('--progresso', help="Arquivo de progresso (padrão: <arquivo>.progresso).")
+        parser.add_argument('--recomecar', action='store_true', help="Ignora o progresso de execuções anteriores.")
+        parser.add_argument('--fake', action='store_true',
+                            help="Usa o backend local (sem rede), para medir a vazão.")
+        parser.add_argument('--latencia', type=float, default=0.1, help="Latência simulada com --fake (s).")
+        parser.add_argument('--taxa-falha', type=float, default=0.0,
+                            help="Fração de falhas transitórias simuladas com --fake.")
+
+    def handle(self, *args, **options):
+        if options['concorrencia'] < 1:
+            raise CommandError("--concorrencia deve ser ao menos 1.")
+        if options['lote'] < 1:
+            raise CommandError("--lote deve ser ao menos 1.")
+        if options['por_segundo'] is not None and options['por_segundo'] < 0:
+            raise CommandError("--por-segundo não pode ser negativo.")
+        caminho = Path(options['arquivo'])
+        if not caminho.is_file():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+        progresso = Path(options['progresso'] or f"{caminho}.progresso")
+        if options['recomecar']:
+            progresso.unlink(missing_ok=True)
+
+        if options['fake'] or options['tentativas']:
+            backend = (
+                FakeBackend(latencia=options['latencia'], taxa_falha=options['taxa_falha']) if options['fake']
+                else obter_provedor().backend
+            )
+            provedor = Provedor(backend, max_simultaneas=options['concorrencia'], tentativas=options['tentativas'])
+        else:
+            provedor = obter_provedor()
+        gerador = GeradorEmLote(
+            Progresso(progresso), provedor=provedor, concorrencia=options['concorrencia'],
+            por_segundo=options['por_segundo'], lote=options['lote'],
+        )
+        if gerador.progresso.concluidas:
+            self.stdout.write(f"Retomando: {len(gerador.progresso.concluidas)} linha(s) já concluída(s).")
+
+        inicio = time.perf_counter()
+
+        def informar(resultado):
+            if options['verbosity'] > 1:
+                feitas = resultado.geradas + resultado.reaproveitadas + resultado.falhas
+                self.stdout.write(f"{feitas} prompt(s) processado(s) ({feitas / (time.perf_counter() - inicio):.1f}/s)")
+
+        # async_to_sync (e não asyncio.run): as gravações rodam nesta thread, com a conexão dela
+        with caminho.open(encoding='utf-8-sig') as arquivo:
+            resultado = async_to_sync(gerador.executar)(ler_prompts(arquivo), ao_salvar=informar)
+
+        duracao = time.perf_counter() - inicio
+        feitas = resultado.geradas + resultado.reaproveitadas + resultado.falhas
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.lidas} linha(s) em {duracao:.1f}s ({feitas / max(duracao, 1e-9):.1f} prompts/s): "
+            f"{resultado.geradas} receita(s) gerada(s), {resultado.reaproveitadas} reaproveitada(s), "
+            f"{resultado.falhas} falha(s), {resultado.puladas} já concluída(s), {resultado.rejeitadas} rejeitada(s)."
+        ))
+        if resultado.falhas:
+            self.stdout.write(f"Rode de novo o mesmo comando para tentar outra vez as que falharam (ver {progresso}).")
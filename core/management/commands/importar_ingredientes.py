@@ -0,0 +1,47 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import Importador, ler_csv, ler_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa ingredientes (nome, caloria, categoria) de um arquivo CSV ou JSONL, "
+        "em lotes, criando as categorias que faltarem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--formato', choices=['csv', 'jsonl'],
+                            help="Padrão: deduzido da extensão do arquivo.")
+        parser.add_argument('--lote', type=int, default=1000, help="Linhas por transação.")
+        parser.add_argument('--delimitador', default=',', help="Separador das colunas do CSV.")
+
+    def handle(self, *args, **options):
+        caminho = Path(options['arquivo'])
+        if not caminho.is_file():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+        formato = options['formato'] or caminho.suffix.lstrip('.').lower()
+        if formato not in ('csv', 'jsonl'):
+            raise CommandError("Informe --formato csv ou jsonl.")
+
+        inicio = time.perf_counter()
+
+        def progresso(resultado):
+            if options['verbosity'] > 1:
+                taxa = resultado.lidas / (time.perf_counter() - inicio)
+                self.stdout.write(f"{resultado.lidas} linhas lidas ({taxa:.0f} linhas/s)")
+
+        with caminho.open(encoding='utf-8-sig', newline='') as arquivo:
+            linhas = ler_csv(arquivo, options['delimitador']) if formato == 'csv' else ler_jsonl(arquivo)
+            resultado = Importador(lote=options['lote']).importar(linhas, ao_concluir_lote=progresso)
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.lidas} linhas em {duracao:.1f}s ({resultado.lidas / max(duracao, 1e-9):.0f} linhas/s): "
+            f"{resultado.criados} criados, {resultado.atualizados} atualizados, "
+            f"{resultado.inalterados} inalterados, {resultado.rejeitadas} rejeitadas; "
+            f"{resultado.categorias_criadas} categoria(s) nova(s)."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core import busca_semantica
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói os vetores da busca de receitas (e o peso de cada termo). "
+        "Necessário antes da primeira busca (se o worker ainda não o fez) e útil após cargas em massa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help="Receitas lidas por consulta.")
+
+    def handle(self, *args, **options):
+        total = busca_semantica.reconstruir(lote=options['lote'])
+        self.stdout.write(f"{total} receita(s) indexada(s).")
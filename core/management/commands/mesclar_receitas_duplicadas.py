@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from core import duplicatas
+from core.models import Receita
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista os grupos de receitas quase iguais e, com --aplicar, mescla cada grupo "
+        "na receita mais antiga."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aplicar', action='store_true', help="Mescla os grupos (sem ela, só lista).")
+        parser.add_argument(
+            '--limiar', type=float, default=duplicatas.LIMIAR_RECEITA,
+            help="Semelhança mínima entre duas receitas (0 a 1).",
+        )
+        parser.add_argument(
+            '--reindexar', action='store_true',
+            help="Refaz antes as assinaturas de todas as receitas (ex.: após a migração).",
+        )
+        parser.add_argument('--lote', type=int, default=2000, help="Receitas por lote ao reindexar.")
+
+    def handle(self, *args, **options):
+        if options['reindexar']:
+            total = duplicatas.indexar_todas(lote=options['lote'])
+            self.stdout.write(f"{total} receita(s) indexada(s).")
+
+        grupos = duplicatas.grupos_duplicados(limiar=options['limiar'])
+        titulos = dict(Receita.objects.filter(
+            pk__in=[pk for grupo in grupos for pk in grupo]
+        ).values_list('id', 'titulo'))
+        for grupo in grupos:
+            principal, *copias = grupo
+            self.stdout.write(f"#{principal} {titulos.get(principal, '')}")
+            for pk in copias:
+                self.stdout.write(f"    #{pk} {titulos.get(pk, '')}")
+
+        copias = sum(len(grupo) - 1 for grupo in grupos)
+        if not options['aplicar']:
+            self.stdout.write(f"{len(grupos)} grupo(s), {copias} cópia(s). Use --aplicar para mesclar.")
+            return
+        apagadas = sum(duplicatas.mesclar(grupo) for grupo in grupos)
+        self.stdout.write(self.style.SUCCESS(f"{len(grupos)} grupo(s) mesclado(s), {apagadas} receita(s) apagada(s)."))
@@ -0,0 +1,46 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import planejamento
+from core.models import Dieta
+
+
+class Command(BaseCommand):
+    help = "Planeja uma semana de refeições para uma dieta ou, em lote, para todas as dietas ativas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dieta', type=int, help="Planeja apenas esta dieta.")
+        parser.add_argument('--inicio', type=date.fromisoformat, default=None,
+                            help="Primeiro dia da semana (AAAA-MM-DD). Padrão: hoje.")
+        parser.add_argument('--workers', type=int, default=1, help="Processos usados no modo em lote.")
+        parser.add_argument('--seed', type=int, default=None, help="Semente do sorteio, para planos reprodutíveis.")
+
+    def handle(self, *args, **options):
+        if options['dieta']:
+            try:
+                dieta = Dieta.objects.get(pk=options['dieta'])
+                refeicoes = planejamento.planejar_dieta(
+                    dieta, options['inicio'], planejamento.Planejador(options['seed'])
+                )
+            except Dieta.DoesNotExist:
+                raise CommandError(f"Dieta {options['dieta']} não encontrada.")
+            except planejamento.PlanejamentoImpossivel as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"{len(refeicoes)} refeição(ões) criada(s) para a dieta {dieta.pk}.")
+            return
+
+        inicio = time.perf_counter()
+        dietas = refeicoes = 0
+        for dieta_id, criadas, erro in planejamento.planejar_todas(
+            options['inicio'], workers=options['workers'], seed=options['seed']
+        ):
+            dietas += 1
+            refeicoes += criadas
+            if erro:
+                self.stderr.write(erro)
+        self.stdout.write(
+            f"{dietas} dieta(s) planejada(s), {refeicoes} refeição(ões) criada(s) "
+            f"em {time.perf_counter() - inicio:.1f}s."
+        )
@@ -0,0 +1,65 @@
+import asyncio
+import multiprocessing
+import time
+
+from django import db
+from django.core.management.base import BaseCommand
+
+from core import busca_semantica, geracao
+
+
+def _worker(intervalo, uma_vez, concorrencia):
+    """ Laço de um processo do pool: drena a fila e aguarda novos pedidos. """
+    # Cada processo abre as próprias conexões com o banco
+    db.connections.close_all()
+    if concorrencia > 1:
+        asyncio.run(geracao.atender_fila(concorrencia=concorrencia, intervalo=intervalo, uma_vez=uma_vez))
+        return
+    while True:
+        processados = geracao.processar_pendentes()
+        if uma_vez:
+            return
+        if not processados:
+            time.sleep(intervalo)
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de geração de receitas por IA com um pool de processos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Número de processos do pool.")
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help="Segundos de espera quando a fila está vazia.")
+        parser.add_argument('--concorrencia', type=int, default=50,
+                            help="Gerações aguardando a IA ao mesmo tempo em cada processo (1: uma por vez).")
+        parser.add_argument('--uma-vez', action='store_true',
+                            help="Esvazia a fila e encerra, em vez de ficar aguardando.")
+
+    def handle(self, *args, **options):
+        liberados = geracao.liberar_travadas()
+        if liberados:
+            self.stdout.write(f"{liberados} geração(ões) travada(s) devolvida(s) à fila.")
+        # A busca de receitas não constrói o índice; o worker o faz se ele ainda não existe
+        indexadas = busca_semantica.construir_se_preciso()
+        if indexadas is not None:
+            self.stdout.write(f"Índice da busca de receitas construído: {indexadas} receita(s).")
+
+        if options['workers'] <= 1:
+            _worker(options['intervalo'], options['uma_vez'], options['concorrencia'])
+            return
+
+        # As conexões do processo pai não podem ser herdadas pelos filhos
+        db.connections.close_all()
+        processos = [
+            multiprocessing.Process(target=_worker, args=(options['intervalo'], options['uma_vez'], options['concorrencia']))
+            for _ in range(options['workers'])
+        ]
+        for processo in processos:
+            processo.start()
+        self.stdout.write(f"{len(processos)} worker(s) de geração iniciados.")
+        try:
+            for processo in processos:
+                processo.join()
+        except KeyboardInterrupt:
+            for processo in processos:
+                processo.terminate()
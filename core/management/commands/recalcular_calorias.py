@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import calorias
+
+
+class Command(BaseCommand):
+    help = "Recalcula o total de calorias de todas as receitas, em lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help="Receitas por UPDATE.")
+
+    def handle(self, *args, **options):
+        atualizadas = calorias.recalcular_todas(lote=options['lote'])
+        self.stdout.write(f"{atualizadas} receita(s) atualizada(s).")
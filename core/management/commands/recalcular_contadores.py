@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import contadores
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os contadores da landing page a partir das tabelas."
+
+    def handle(self, *args, **options):
+        for nome, valor in contadores.recalcular().items():
+            self.stdout.write(f"{nome}: {valor}")
@@ -0,0 +1,19 @@
+# core/managers.py
+from django.db import models
+from django.dispatch import Signal
+
+# Enviado após QuerySet.bulk_create, que não dispara post_save.
+# Argumentos: sender (model), objs (objetos criados) e options (kwargs do bulk_create).
+bulk_create_concluido = Signal()
+
+
+class BulkSignalQuerySet(models.QuerySet):
+    """
+    QuerySet cujo ``bulk_create`` avisa os interessados (contadores, índices...)
+    que normalmente dependem do ``post_save`` de cada objeto.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bulk_create_concluido.send(sender=self.model, objs=objs, options=kwargs)
+        return objs
@@ -0,0 +1,73 @@
+# core/metricas.py
+"""
+Métricas de execução no formato de texto do Prometheus (servidas em /metrics).
+
+Por view (nome da rota): latência, tamanho da resposta e consultas SQL
+(quantidade e tempo), registradas por ``core.middleware.MetricasMiddleware``;
+e, do provedor de IA, latência, erros e tokens das chamadas ao modelo.
+
+Com vários processos (workers do servidor e ``processar_geracoes``), defina
+``PROMETHEUS_MULTIPROC_DIR`` com um diretório compartilhado e vazio no início
+do deploy: cada processo grava seus valores ali e /metrics soma todos.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+requisicao_segundos = Histogram(
+    'luiggis_http_request_duration_seconds', "Latência das requisições, por view.",
+    ['view', 'metodo', 'status'],
+)
+resposta_bytes = Histogram(
+    'luiggis_http_response_size_bytes', "Tamanho das respostas (não inclui streaming), por view.",
+    ['view'], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, float('inf')),
+)
+sql_consultas = Counter('luiggis_sql_queries', "Consultas SQL executadas, por view.", ['view'])
+sql_segundos = Counter('luiggis_sql_duration_seconds', "Tempo gasto em consultas SQL, por view.", ['view'])
+sql_por_requisicao = Histogram(
+    'luiggis_sql_queries_per_request', "Consultas SQL por requisição, por view.",
+    ['view'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
+)
+
+ia_segundos = Histogram(
+    'luiggis_ia_request_duration_seconds', "Latência de cada chamada ao modelo de IA.",
+    ['operacao', 'resultado'], buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, float('inf')),
+)
+ia_erros = Counter('luiggis_ia_errors', "Falhas nas chamadas ao modelo de IA, por tipo.", ['tipo'])
+ia_tokens = Counter('luiggis_ia_tokens', "Tokens consumidos nas chamadas ao modelo de IA.", ['tipo'])
+
+
+def registrar_requisicao(view, metodo, status, duracao, tamanho=None, consultas=None, tempo_sql=0.0):
+    requisicao_segundos.labels(view, metodo, status).observe(duracao)
+    if tamanho is not None:
+        resposta_bytes.labels(view).observe(tamanho)
+    if consultas is not None:
+        sql_consultas.labels(view).inc(consultas)
+        sql_segundos.labels(view).inc(tempo_sql)
+        sql_por_requisicao.labels(view).observe(consultas)
+
+
+def registrar_ia(operacao, duracao, erro=None):
+    ia_segundos.labels(operacao, 'erro' if erro else 'ok').observe(duracao)
+    if erro is not None:
+        ia_erros.labels(type(erro).__name__).inc()
+
+
+def registrar_tokens(uso):
+    """ ``uso`` é o ``usage_metadata`` de uma resposta do Gemini. """
+    if uso is None:
+        return
+    ia_tokens.labels('prompt').inc(getattr(uso, 'prompt_token_count', None) or 0)
+    ia_tokens.labels('resposta').inc(getattr(uso, 'candidates_token_count', None) or 0)
+
+
+def exportar():
+    """ Texto das métricas e seu content type; soma os processos no modo multiprocesso. """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
@@ -0,0 +1,103 @@
+# core/middleware.py
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metricas
+
+
+class ContadorSQL:
+    """ ``execute_wrapper`` que conta e cronometra as consultas da requisição. """
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+# Contador da requisição corrente. O asgiref copia o contexto para as threads
+# do sync_to_async, então as consultas das views assíncronas também contam.
+_contador_atual = ContextVar('contador_sql', default=None)
+
+
+def _contar_consulta(execute, sql, params, many, context):
+    contador = _contador_atual.get()
+    if contador is None:
+        return execute(sql, params, many, context)
+    return contador(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instalar_contador(sender, connection, **kwargs):
+    """ Põe ``_contar_consulta`` nos wrappers de cada conexão aberta (conectado em CoreConfig.ready()). """
+    if _contar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_contar_consulta)
+
+
+def _nome_da_view(request):
+    # Nome da rota (ex.: "lista_receitas"), para manter poucas séries por métrica
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'sem_rota'
+
+
+def _tamanho(response):
+    return None if response.streaming else len(response.content)
+
+
+class MetricasMiddleware:
+    """
+    Registra latência, tamanho da resposta e consultas SQL de cada requisição
+    (ver core/metricas.py). As consultas são contadas por um wrapper instalado
+    em toda conexão aberta, inclusive nas threads das views assíncronas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICAS_ATIVAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sql = ContadorSQL()
+        marcador = _contador_atual.set(sql)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _contador_atual.reset(marcador)
+        metricas.registrar_requisicao(
+            _nome_da_view(request), request.method, response.status_code,
+            time.perf_counter() - inicio, _tamanho(response), sql.consultas, sql.segundos,
+        )
+        return response
+
+    async def __acall__(self, request):
+        sql = ContadorSQL()
+        marcador = _contador_atual.set(sql)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _contador_atual.reset(marcador)
+        metricas.registrar_requisicao(
+            _nome_da_view(request), request.method, response.status_code,
+            time.perf_counter() - inicio, _tamanho(response), sql.consultas, sql.segundos,
+        )
+        return response
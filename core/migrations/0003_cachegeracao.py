@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_geracaoreceita'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheGeracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, unique=True)),
+                ('prompt_normalizado', models.TextField()),
+                ('modelo', models.CharField(max_length=50)),
+                ('resposta', models.TextField(blank=True, null=True)),
+                ('reservado_em', models.DateTimeField(help_text='Início da geração que preenche a entrada.')),
+                ('gerado_em', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_acesso', models.DateTimeField(db_index=True)),
+                ('hits', models.IntegerField(default=0)),
+                ('latencia_ms', models.IntegerField(default=0, help_text='Tempo gasto na chamada original à IA, economizado a cada hit.')),
+            ],
+            options={
+                'verbose_name': 'Cache de Geração',
+                'verbose_name_plural': 'Cache de Gerações',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_cachegeracao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingrediente',
+            index=models.Index(fields=['nome', 'id'], name='core_ingred_nome_b57ace_idx'),
+        ),
+    ]
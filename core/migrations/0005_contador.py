@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:37
+
+from django.db import migrations, models
+
+
+def preencher_contadores(apps, schema_editor):
+    Contador = apps.get_model('core', 'Contador')
+    Ingrediente = apps.get_model('core', 'Ingrediente')
+    Receita = apps.get_model('core', 'Receita')
+    Contador.objects.bulk_create([
+        Contador(nome='ingredientes', valor=Ingrediente.objects.count()),
+        Contador(nome='receitas', valor=Receita.objects.count()),
+        Contador(nome='receitas_ia', valor=Receita.objects.filter(is_ai_generated=True).count()),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ingrediente_nome_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=50, unique=True)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador',
+                'verbose_name_plural': 'Contadores',
+            },
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
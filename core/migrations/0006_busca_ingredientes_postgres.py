@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Só se aplica ao PostgreSQL; nos demais bancos a busca usa o índice em memória.
+CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() não é IMMUTABLE e por isso não pode ser usada em índices
+    """
+    CREATE OR REPLACE FUNCTION core_unaccent(text) RETURNS text
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS core_ingrediente_nome_trgm
+        ON core_ingrediente USING gin (core_unaccent(lower(nome)) gin_trgm_ops)
+    """,
+]
+
+REMOVER = [
+    "DROP INDEX IF EXISTS core_ingrediente_nome_trgm",
+    "DROP FUNCTION IF EXISTS core_unaccent(text)",
+]
+
+
+def _executar(comandos):
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_contador'),
+    ]
+
+    operations = [
+        migrations.RunPython(_executar(CRIAR), _executar(REMOVER)),
+    ]
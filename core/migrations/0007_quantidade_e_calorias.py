@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def calcular_totais(apps, schema_editor):
+    # Até aqui cada ingrediente de uma receita conta como uma porção
+    IngredienteReceita = apps.get_model('core', 'IngredienteReceita')
+    Receita = apps.get_model('core', 'Receita')
+    soma = (
+        IngredienteReceita.objects.filter(receita=models.OuterRef('pk'))
+        .values('receita')
+        .annotate(total=models.Sum('ingrediente__caloria'))
+        .values('total')
+    )
+    Receita.objects.update(total_caloria=Coalesce(models.Subquery(soma), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_busca_ingredientes_postgres'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredientereceita',
+            name='quantidade',
+            field=models.DecimalField(decimal_places=2, default=1, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='ingredientereceita',
+            name='unidade',
+            field=models.CharField(choices=[('g', 'Gramas'), ('ml', 'Mililitros'), ('porcao', 'Porções')], default='porcao', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='receita',
+            name='total_caloria',
+            field=models.IntegerField(db_index=True, default=0, help_text='Soma das calorias dos ingredientes, mantida por core/calorias.py.'),
+        ),
+        migrations.RunPython(calcular_totais, migrations.RunPython.noop),
+    ]
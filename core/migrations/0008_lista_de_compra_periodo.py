@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_quantidade_e_calorias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredientelistacompra',
+            name='ocorrencias',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ingredientelistacompra',
+            name='quantidade',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='listadecompra',
+            name='data_fim',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='listadecompra',
+            name='data_inicio',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='listadecompra',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='listas_de_compra', to='core.usuario'),
+        ),
+    ]
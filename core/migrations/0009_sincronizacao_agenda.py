@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_lista_de_compra_periodo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemocaoAgenda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('refeicao_id', models.BigIntegerField()),
+                ('versao', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Remoção de Agenda',
+                'verbose_name_plural': 'Remoções de Agendas',
+            },
+        ),
+        migrations.AddField(
+            model_name='agendaalimentar',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agendaalimentar',
+            name='versao',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='refeicaoagenda',
+            name='versao',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='refeicaoagenda',
+            index=models.Index(fields=['agenda_alimentar', 'versao'], name='core_refeic_agenda__8d6444_idx'),
+        ),
+        migrations.AddField(
+            model_name='remocaoagenda',
+            name='agenda_alimentar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='remocoes', to='core.agendaalimentar'),
+        ),
+        migrations.AddIndex(
+            model_name='remocaoagenda',
+            index=models.Index(fields=['agenda_alimentar', 'versao'], name='core_remoca_agenda__7be586_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_sincronizacao_agenda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredientedieta',
+            index=models.Index(fields=['dieta', 'ingrediente'], name='ingdieta_dieta_ingrediente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientelistacompra',
+            index=models.Index(fields=['lista_de_compra', 'ingrediente'], name='inglista_lista_ingrediente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientereceita',
+            index=models.Index(fields=['receita', 'ingrediente'], name='ingrec_receita_ingrediente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receitarefeicao',
+            index=models.Index(fields=['refeicao', 'receita'], name='recref_refeicao_receita_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='refeicao',
+            index=models.Index(fields=['usuario', 'date'], name='refeicao_usuario_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuariorestricao',
+            index=models.Index(fields=['usuario', 'restricao_alimentar'], name='usurest_usuario_restricao_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_indices_de_acesso'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receita',
+            name='criado_em',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='receita',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
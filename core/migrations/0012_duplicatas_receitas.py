@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_receita_datas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssinaturaReceita',
+            fields=[
+                ('receita', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='assinatura', serialize=False, to='core.receita')),
+                ('tema', models.BinaryField()),
+                ('conteudo', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Assinatura de Receita',
+                'verbose_name_plural': 'Assinaturas de Receitas',
+            },
+        ),
+        migrations.CreateModel(
+            name='BandaReceita',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('tema', 'Tema'), ('conteudo', 'Conteúdo')], max_length=10)),
+                ('chave', models.BigIntegerField()),
+                ('receita', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bandas', to='core.receita')),
+            ],
+            options={
+                'verbose_name': 'Banda de Receita',
+                'verbose_name_plural': 'Bandas de Receitas',
+                'indexes': [models.Index(fields=['tipo', 'chave'], name='banda_tipo_chave_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:50
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_duplicatas_receitas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlteracaoVersao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contador', models.CharField(max_length=50)),
+                ('versao', models.BigIntegerField()),
+                ('marca', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('ids', models.JSONField(help_text='Ids alterados nesta versão; nulo quando tudo deve ser recarregado.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Alteração de Versão',
+                'verbose_name_plural': 'Alterações de Versão',
+                'constraints': [models.UniqueConstraint(fields=('contador', 'versao'), name='alteracao_versao_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:05
+
+import uuid
+
+from django.db import migrations, models
+
+
+def gerar_tokens(apps, schema_editor):
+    # O default só é avaliado uma vez no AddField; cada agenda precisa do seu
+    AgendaAlimentar = apps.get_model('core', 'AgendaAlimentar')
+    for agenda in AgendaAlimentar.objects.only('id').iterator():
+        agenda.token = uuid.uuid4()
+        agenda.save(update_fields=['token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_log_de_versoes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agendaalimentar',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True),
+        ),
+        migrations.RunPython(gerar_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='agendaalimentar',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
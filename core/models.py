@@ -1,7 +1,11 @@
 # core/models.py
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from .managers import BulkSignalQuerySet
+
 # --- Modelos Sem Relacionamento de Chave Estrangeira Imediato ---
 
 class Perfil(models.Model):
@@ -69,9 +73,21 @@ class Ingrediente(models.Model):
         help_text="Calorias por porção (ex: 100g)."
     )
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Permite saber, no post_save, se as calorias ou o nome mudaram (ver core/signals.py)
+        instance._caloria_carregada = instance.__dict__.get('caloria')
+        instance._nome_carregado = instance.__dict__.get('nome')
+        return instance
+
     class Meta:
         verbose_name = "Ingrediente"
         verbose_name_plural = "Ingredientes"
+        # Suporta a paginação por cursor da listagem (ordem por nome, id)
+        indexes = [models.Index(fields=['nome', 'id'])]
 
     def __str__(self):
         return self.nome
@@ -93,6 +109,15 @@ class Receita(models.Model):
         help_text="Prompt usado para gerar a receita pela IA, se aplicável."
     )
     is_ai_generated = models.BooleanField(default=False)
+    total_caloria = models.IntegerField(
+        default=0,
+        db_index=True,
+        help_text="Soma das calorias dos ingredientes, mantida por core/calorias.py."
+    )
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Muda também quando os itens, as calorias ou os nomes dos ingredientes mudam
+    # (core/calorias.py e core/signals.py); é a validade do cache do detalhe
+    atualizado_em = models.DateTimeField(auto_now=True)
     
     # Relação N:M com Ingrediente (através da tabela IngredienteReceita)
     ingredientes = models.ManyToManyField(
@@ -101,6 +126,17 @@ class Receita(models.Model):
         related_name='receitas'
     )
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Permite saber, no post_save, se a receita passou a ser (ou deixou de ser) de IA
+        # e se o título mudou (ele aparece nos eventos do feed .ics)
+        instance._ia_carregada = instance.__dict__.get('is_ai_generated')
+        instance._titulo_carregado = instance.__dict__.get('titulo')
+        return instance
+
     class Meta:
         verbose_name = "Receita"
         verbose_name_plural = "Receitas"
@@ -116,6 +152,17 @@ class ListaDeCompra(models.Model):
     # id é criado automaticamente
     data_criacao = models.DateField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+
+    # Período das refeições cobertas pela lista (gerada por core/compras.py)
+    usuario = models.ForeignKey(
+        'Usuario',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='listas_de_compra'
+    )
+    data_inicio = models.DateField(null=True, blank=True)
+    data_fim = models.DateField(null=True, blank=True)
     
     # Relação N:M com Ingrediente
     ingredientes = models.ManyToManyField(
@@ -196,6 +243,12 @@ class AgendaAlimentar(models.Model):
         related_name='agendas_alimentares'
     )
 
+    # Identifica a agenda na URL do feed .ics, que não tem login; não dá para adivinhar como o id
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # Sobe a cada alteração nas refeições da agenda; é o token de sincronização do feed .ics
+    versao = models.BigIntegerField(default=0)
+    atualizado_em = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         verbose_name = "Agenda Alimentar"
         verbose_name_plural = "Agendas Alimentares"
@@ -292,9 +345,18 @@ class Refeicao(models.Model):
         related_name='refeicoes_agendadas'
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Permite saber, ao salvar, se a refeição mudou de dia (ver core/signals.py)
+        instance._data_carregada = instance.__dict__.get('date')
+        return instance
+
     class Meta:
         verbose_name = "Refeição"
         verbose_name_plural = "Refeições"
+        # Refeições de um usuário num período (listas de compras, planejamento)
+        indexes = [models.Index(fields=['usuario', 'date'], name='refeicao_usuario_date_idx')]
 
     def __str__(self):
         return f"Refeição de {self.usuario.username} em {self.date}"
@@ -320,13 +382,29 @@ class IngredienteReceita(models.Model):
         Receita,
         on_delete=models.RESTRICT
     )
-    
-    # Exemplo: Você poderia adicionar um campo 'quantidade' aqui.
+
+    GRAMA = 'g'
+    MILILITRO = 'ml'
+    PORCAO = 'porcao'
+
+    UNIDADE_CHOICES = [
+        (GRAMA, 'Gramas'),
+        (MILILITRO, 'Mililitros'),
+        (PORCAO, 'Porções'),
+    ]
+
+    # Ingrediente.caloria é por porção de 100g/100ml; em porções a quantidade é o multiplicador
+    quantidade = models.DecimalField(max_digits=8, decimal_places=2, default=1)
+    unidade = models.CharField(max_length=10, choices=UNIDADE_CHOICES, default=PORCAO)
+
+    objects = BulkSignalQuerySet.as_manager()
 
     class Meta:
         unique_together = ('ingrediente', 'receita')
         verbose_name = "Ingrediente em Receita"
         verbose_name_plural = "Ingredientes em Receitas"
+        # Caminho inverso ao da unique_together: ingredientes de uma receita
+        indexes = [models.Index(fields=['receita', 'ingrediente'], name='ingrec_receita_ingrediente_idx')]
         
     def __str__(self):
         return f"{self.ingrediente.nome} em {self.receita.titulo}"
@@ -352,10 +430,14 @@ class ReceitaRefeicao(models.Model):
         null=True
     )
 
+    objects = BulkSignalQuerySet.as_manager()
+
     class Meta:
         unique_together = ('receita', 'refeicao')
         verbose_name = "Receita em Refeição"
         verbose_name_plural = "Receitas em Refeições"
+        # Caminho inverso ao da unique_together: receitas de uma refeição
+        indexes = [models.Index(fields=['refeicao', 'receita'], name='recref_refeicao_receita_idx')]
 
 class RefeicaoDieta(models.Model):
     """
@@ -404,10 +486,34 @@ class RefeicaoAgenda(models.Model):
         null=True
     )
 
+    # Versão da agenda em que o evento mudou pela última vez (ver core/agenda.py)
+    versao = models.BigIntegerField(default=0)
+
     class Meta:
         unique_together = ('agenda_alimentar', 'refeicao')
         verbose_name = "Refeição em Agenda"
         verbose_name_plural = "Refeições em Agendas"
+        indexes = [models.Index(fields=['agenda_alimentar', 'versao'])]
+
+class RemocaoAgenda(models.Model):
+    """
+    Registro de uma refeição retirada de uma agenda, para que o feed
+    incremental avise os clientes que já a tinham sincronizado.
+    Tabela: REMOCAO_AGENDA
+    """
+    # id é criado automaticamente
+    agenda_alimentar = models.ForeignKey(
+        AgendaAlimentar,
+        on_delete=models.CASCADE,
+        related_name='remocoes'
+    )
+    refeicao_id = models.BigIntegerField()
+    versao = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = "Remoção de Agenda"
+        verbose_name_plural = "Remoções de Agendas"
+        indexes = [models.Index(fields=['agenda_alimentar', 'versao'])]
 
 class IngredienteDieta(models.Model):
     """
@@ -433,6 +539,8 @@ class IngredienteDieta(models.Model):
         unique_together = ('ingrediente', 'dieta')
         verbose_name = "Ingrediente em Dieta"
         verbose_name_plural = "Ingredientes em Dietas"
+        # Caminho inverso ao da unique_together: ingredientes restritos de uma dieta
+        indexes = [models.Index(fields=['dieta', 'ingrediente'], name='ingdieta_dieta_ingrediente_idx')]
 
 class UsuarioRestricao(models.Model):
     """
@@ -459,6 +567,8 @@ class UsuarioRestricao(models.Model):
         unique_together = ('restricao_alimentar', 'usuario')
         verbose_name = "Restrição de Usuário"
         verbose_name_plural = "Restrições de Usuários"
+        # Caminho inverso ao da unique_together: restrições de um usuário
+        indexes = [models.Index(fields=['usuario', 'restricao_alimentar'], name='usurest_usuario_restricao_idx')]
 
 class IngredienteListaCompra(models.Model):
     """
@@ -480,7 +590,193 @@ class IngredienteListaCompra(models.Model):
         null=True
     )
 
+    # Em gramas/mililitros (uma porção = 100); ocorrencias conta as receitas
+    # das refeições que usam o ingrediente, para atualizar a lista por diferença
+    quantidade = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    ocorrencias = models.PositiveIntegerField(default=0)
+
     class Meta:
         unique_together = ('ingrediente', 'lista_de_compra')
         verbose_name = "Ingrediente em Lista de Compra"
-        verbose_name_plural = "Ingredientes em Listas de Compra"
\ No newline at end of file
+        verbose_name_plural = "Ingredientes em Listas de Compra"
+        # Caminho inverso ao da unique_together: itens de uma lista
+        indexes = [models.Index(fields=['lista_de_compra', 'ingrediente'], name='inglista_lista_ingrediente_idx')]
+
+# --- Geração de Receitas por IA ---
+
+class GeracaoReceita(models.Model):
+    """
+    Pedido de geração de receita pela IA, processado em segundo plano
+    pelo comando `processar_geracoes`.
+    Tabela: GERACAO_RECEITA
+    """
+    PENDENTE = 'pendente'
+    PROCESSANDO = 'processando'
+    CONCLUIDA = 'concluida'
+    ERRO = 'erro'
+
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (PROCESSANDO, 'Processando'),
+        (CONCLUIDA, 'Concluída'),
+        (ERRO, 'Erro'),
+    ]
+
+    # id é criado automaticamente
+    prompt = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+    erro = models.TextField(blank=True, default='')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    # Receita criada quando a geração termina com sucesso
+    receita = models.ForeignKey(
+        Receita,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='geracoes'
+    )
+
+    class Meta:
+        verbose_name = "Geração de Receita"
+        verbose_name_plural = "Gerações de Receitas"
+        # O worker busca sempre o pedido pendente mais antigo
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"Geração {self.id} ({self.get_status_display()})"
+
+    @property
+    def finalizada(self):
+        return self.status in (self.CONCLUIDA, self.ERRO)
+
+
+class AssinaturaReceita(models.Model):
+    """
+    Assinaturas MinHash de uma receita (ver core/duplicatas.py), mantidas
+    pelos signals de core/signals.py.
+    Tabela: ASSINATURA_RECEITA
+    """
+    receita = models.OneToOneField(
+        Receita,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='assinatura'
+    )
+    # Título e prompt: comparada com o prompt de um novo pedido de geração
+    tema = models.BinaryField()
+    # Título, instruções e ingredientes: comparada com outras receitas
+    conteudo = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Assinatura de Receita"
+        verbose_name_plural = "Assinaturas de Receitas"
+
+
+class BandaReceita(models.Model):
+    """
+    Chave LSH de uma faixa da assinatura de uma receita: receitas com alguma
+    chave em comum são candidatas a quase iguais.
+    Tabela: BANDA_RECEITA
+    """
+    TEMA = 'tema'
+    CONTEUDO = 'conteudo'
+    TIPO_CHOICES = [(TEMA, 'Tema'), (CONTEUDO, 'Conteúdo')]
+
+    receita = models.ForeignKey(
+        Receita,
+        on_delete=models.CASCADE,
+        related_name='bandas'
+    )
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    chave = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = "Banda de Receita"
+        verbose_name_plural = "Bandas de Receitas"
+        indexes = [models.Index(fields=['tipo', 'chave'], name='banda_tipo_chave_idx')]
+
+
+class CacheGeracao(models.Model):
+    """
+    Resposta da IA guardada por prompt normalizado, instrução de sistema e modelo.
+    Enquanto ``resposta`` é nula a entrada marca uma geração em andamento,
+    e pedidos idênticos aguardam por ela em vez de chamar a IA de novo.
+    Tabela: CACHE_GERACAO
+    """
+    # id é criado automaticamente
+    chave = models.CharField(max_length=64, unique=True)
+    prompt_normalizado = models.TextField()
+    modelo = models.CharField(max_length=50)
+    resposta = models.TextField(null=True, blank=True)
+    reservado_em = models.DateTimeField(help_text="Início da geração que preenche a entrada.")
+    gerado_em = models.DateTimeField(null=True, blank=True)
+    ultimo_acesso = models.DateTimeField(db_index=True)
+    hits = models.IntegerField(default=0)
+    latencia_ms = models.IntegerField(
+        default=0,
+        help_text="Tempo gasto na chamada original à IA, economizado a cada hit."
+    )
+
+    class Meta:
+        verbose_name = "Cache de Geração"
+        verbose_name_plural = "Cache de Gerações"
+
+    def __str__(self):
+        return self.prompt_normalizado[:50]
+
+
+# --- Estatísticas ---
+
+class Contador(models.Model):
+    """
+    Totais mantidos pelos signals de core/signals.py, para que a landing page
+    não precise de COUNT(*) nas tabelas grandes. Reconstruídos pelo comando
+    `recalcular_contadores` caso se desviem.
+    Tabela: CONTADOR
+    """
+    INGREDIENTES = 'ingredientes'
+    RECEITAS = 'receitas'
+    RECEITAS_IA = 'receitas_ia'
+    # Sobe a cada alteração em ingredientes; invalida índices e caches derivados
+    VERSAO_INGREDIENTES = 'versao_ingredientes'
+    # Sobe a cada receita criada/removida ou ingrediente incluído/retirado dela
+    VERSAO_RECEITAS = 'versao_receitas'
+
+    nome = models.CharField(max_length=50, unique=True)
+    valor = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Contador"
+        verbose_name_plural = "Contadores"
+
+    def __str__(self):
+        return f"{self.nome}: {self.valor}"
+
+
+class AlteracaoVersao(models.Model):
+    """
+    Ids alterados em cada versão dos contadores ``versao_*``. Permite que um
+    processo com o índice em memória algumas versões atrás releia só esses
+    ids em vez de recarregar tudo (ver core/contadores.py).
+    Tabela: ALTERACAO_VERSAO
+    """
+    contador = models.CharField(max_length=50)
+    versao = models.BigIntegerField()
+    # Distingue a versão de uma homônima desfeita por rollback (ou por restauração da base)
+    marca = models.UUIDField(default=uuid.uuid4, editable=False)
+    ids = models.JSONField(
+        null=True,
+        help_text="Ids alterados nesta versão; nulo quando tudo deve ser recarregado."
+    )
+
+    class Meta:
+        verbose_name = "Alteração de Versão"
+        verbose_name_plural = "Alterações de Versão"
+        constraints = [
+            models.UniqueConstraint(fields=['contador', 'versao'], name='alteracao_versao_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.contador} v{self.versao}"
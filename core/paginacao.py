@@ -0,0 +1,155 @@
+# core/paginacao.py
+"""
+Paginação por cursor (keyset) para as listagens.
+
+Em vez de ``OFFSET``, cada página filtra a partir dos valores da ordenação do
+último item visto, então o custo não cresce com a posição na lista. O cursor
+é um token assinado e opaco para o cliente.
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+SALT = 'core.paginacao'
+
+
+class PaginaCursor:
+    """ Uma página de resultados, com os tokens das páginas vizinhas. """
+
+    def __init__(self, object_list, proximo=None, anterior=None):
+        self.object_list = object_list
+        self.proximo = proximo
+        self.anterior = anterior
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.proximo is not None
+
+    def has_previous(self):
+        return self.anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Pagina ``queryset`` pela ordenação ``ordering`` (ex.: ``('nome', 'id')``).
+    A ordenação precisa ser total: o último campo deve ser único.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        # Cada ordenação assina com o seu salt: o cursor de uma lista não vale em outra
+        self.salt = f'{SALT}:{",".join(self.ordering)}'
+
+    def _campos(self, invertido=False):
+        for campo in self.ordering:
+            decrescente = campo.startswith('-')
+            yield campo.lstrip('-'), decrescente != invertido
+
+    def _ordem(self, invertido=False):
+        return [('-' if decrescente else '') + nome for nome, decrescente in self._campos(invertido)]
+
+    def _apos(self, valores, invertido=False):
+        """ Filtro "vem depois de ``valores``" na ordenação (ou na inversa). """
+        condicao = Q()
+        iguais = Q()
+        for (nome, decrescente), valor in zip(self._campos(invertido), valores):
+            condicao |= iguais & Q(**{f'{nome}__{"lt" if decrescente else "gt"}': valor})
+            iguais &= Q(**{nome: valor})
+        return condicao
+
+    def _cursor(self, objeto, direcao):
+        valores = [getattr(objeto, nome) for nome, _ in self._campos()]
+        return signing.dumps({'v': valores, 'd': direcao}, salt=self.salt)
+
+    def decodificar(self, cursor):
+        """ Devolve ``(valores, direcao)`` ou ``None`` se o token for inválido. """
+        try:
+            dados = signing.loads(cursor, salt=self.salt)
+            valores, direcao = dados['v'], dados['d']
+        except (signing.BadSignature, KeyError, TypeError):
+            return None
+        if not isinstance(valores, list) or len(valores) != len(self.ordering) or direcao not in ('p', 'a'):
+            return None
+        return valores, direcao
+
+    def _consulta(self, cursor):
+        decodificado = self.decodificar(cursor) if cursor else None
+        valores, direcao = decodificado or (None, 'p')
+        voltando = direcao == 'a'
+
+        qs = self.queryset.order_by(*self._ordem(invertido=voltando))
+        if valores is not None:
+            try:
+                qs = qs.filter(self._apos(valores, invertido=voltando))
+            except (ValueError, TypeError, ValidationError):
+                # Valores que não servem para os campos: trata como cursor inválido
+                valores, voltando = None, False
+                qs = self.queryset.order_by(*self._ordem())
+        # Um item a mais indica se existe página seguinte nessa direção
+        return qs[:self.per_page + 1], valores, voltando
+
+    def _pagina(self, objetos, valores, voltando):
+        tem_mais = len(objetos) > self.per_page
+        objetos = objetos[:self.per_page]
+        if voltando:
+            objetos.reverse()
+
+        if not objetos:
+            return PaginaCursor([])
+        tem_proxima = tem_mais if not voltando else True
+        tem_anterior = tem_mais if voltando else valores is not None
+        return PaginaCursor(
+            objetos,
+            proximo=self._cursor(objetos[-1], 'p') if tem_proxima else None,
+            anterior=self._cursor(objetos[0], 'a') if tem_anterior else None,
+        )
+
+    def page(self, cursor=None):
+        qs, valores, voltando = self._consulta(cursor)
+        return self._pagina(list(qs), valores, voltando)
+
+    async def apage(self, cursor=None):
+        """ Versão assíncrona de ``page``. """
+        qs, valores, voltando = self._consulta(cursor)
+        return self._pagina([objeto async for objeto in qs], valores, voltando)
+
+
+class CursorPaginationMixin:
+    """
+    Substitui a paginação por offset do ``ListView`` pela paginação por cursor.
+    A view define ``paginate_by`` e ``cursor_ordering``; o cursor vem em ``?cursor=``.
+    """
+    cursor_ordering = ('-id',)
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, self.cursor_ordering, page_size)
+        pagina = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, pagina, pagina.object_list, pagina.has_other_pages()
+
+
+class AsyncCursorPaginationMixin(CursorPaginationMixin):
+    """
+    ``CursorPaginationMixin`` com ``get`` assíncrono: a página é lida pelo ORM
+    assíncrono antes de montar o contexto, e o template só recebe a lista pronta.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        paginator = CursorPaginator(self.object_list, self.cursor_ordering, self.get_paginate_by(self.object_list))
+        pagina = await paginator.apage(request.GET.get(self.cursor_kwarg))
+        self._pagina_lida = paginator, pagina, pagina.object_list, pagina.has_other_pages()
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        return self._pagina_lida
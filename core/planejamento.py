@@ -0,0 +1,202 @@
+# core/planejamento.py
+"""
+Planejamento semanal de refeições a partir das metas da ``Dieta``.
+
+Para cada dia escolhe entre ``min_refeicao`` e ``max_refeicao`` receitas
+compatíveis com a dieta cuja soma de calorias fique o mais perto possível de
+``total_caloria``. A escolha é feita em lote com numpy: para cada número de
+refeições sorteia-se várias combinações para as primeiras receitas, a última
+é encontrada por busca binária no vetor ordenado de calorias e fica a
+combinação de menor erro. Dias que já têm refeições da dieta são mantidos.
+"""
+import multiprocessing
+from datetime import date, timedelta
+
+import numpy as np
+from django import db
+from django.db import transaction
+
+from . import compatibilidade
+from .models import Dieta, Receita, ReceitaRefeicao, Refeicao, RefeicaoDieta
+
+DIAS = 7
+AMOSTRAS = 512
+
+# Tipos de refeição usados conforme a quantidade de refeições do dia
+TIPOS_POR_QUANTIDADE = {
+    1: [Refeicao.ALMOCO],
+    2: [Refeicao.ALMOCO, Refeicao.JANTAR],
+    3: [Refeicao.CAFE_MANHA, Refeicao.ALMOCO, Refeicao.JANTAR],
+    4: [Refeicao.CAFE_MANHA, Refeicao.ALMOCO, Refeicao.LANCHE, Refeicao.JANTAR],
+    5: [Refeicao.CAFE_MANHA, Refeicao.ALMOCO, Refeicao.LANCHE, Refeicao.JANTAR, Refeicao.CEIA],
+}
+# Das refeições que costumam ser maiores para as menores
+ORDEM_POR_PORCAO = [Refeicao.ALMOCO, Refeicao.JANTAR, Refeicao.CAFE_MANHA, Refeicao.LANCHE, Refeicao.CEIA]
+
+
+class PlanejamentoImpossivel(Exception):
+    """ A dieta não tem receitas compatíveis suficientes para montar o plano. """
+
+
+def tipos_refeicao(quantidade):
+    if quantidade in TIPOS_POR_QUANTIDADE:
+        return TIPOS_POR_QUANTIDADE[quantidade]
+    # Refeições além de cinco viram lanches extras
+    return TIPOS_POR_QUANTIDADE[5] + [Refeicao.LANCHE] * (quantidade - 5)
+
+
+def escolher_dia(calorias, alvo, minimo, maximo, rng, amostras=AMOSTRAS):
+    """
+    Posições em ``calorias`` (vetor ordenado) de entre ``minimo`` e
+    ``maximo`` receitas distintas com soma próxima de ``alvo``.
+    """
+    n = len(calorias)
+    melhor, melhor_erro = None, np.inf
+    for k in range(minimo, min(maximo, n) + 1):
+        # As primeiras k-1 receitas vêm de uma janela em torno de alvo/k
+        centro = int(np.searchsorted(calorias, alvo / k))
+        inicio = max(0, min(centro - n // 4, n - 2 * k))
+        fim = min(n, max(centro + n // 4, inicio + 2 * k))
+        combinacoes = rng.integers(inicio, fim, size=(amostras, k - 1))
+
+        # A última é a de caloria mais próxima do que falta para o alvo
+        restante = alvo - calorias[combinacoes].sum(axis=1)
+        direita = np.clip(np.searchsorted(calorias, restante), 0, n - 1)
+        esquerda = np.clip(direita - 1, 0, n - 1)
+        usa_esquerda = np.abs(calorias[esquerda] - restante) < np.abs(calorias[direita] - restante)
+        ultima = np.where(usa_esquerda, esquerda, direita)
+        erro = np.abs(calorias[ultima] - restante).astype(float)
+
+        # Descarta combinações que repetem receitas no mesmo dia
+        todas = np.sort(np.column_stack([combinacoes, ultima]), axis=1)
+        erro[np.any(todas[:, 1:] == todas[:, :-1], axis=1)] = np.inf
+
+        posicao = int(np.argmin(erro))
+        if erro[posicao] < melhor_erro:
+            melhor, melhor_erro = todas[posicao], erro[posicao]
+    if melhor is None:
+        raise PlanejamentoImpossivel("Receitas compatíveis insuficientes.")
+    return melhor
+
+
+class Planejador:
+    """
+    Carrega uma vez as calorias de todas as receitas (ids e calorias em
+    vetores) e planeja quantas dietas forem pedidas a partir delas.
+    """
+
+    def __init__(self, seed=None):
+        linhas = np.array(
+            list(Receita.objects.filter(total_caloria__gt=0).values_list('id', 'total_caloria')),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        ordem = np.argsort(linhas[:, 1], kind='stable')
+        self.ids = linhas[ordem, 0]
+        self.calorias = linhas[ordem, 1]
+        self.rng = np.random.default_rng(seed)
+
+    def planejar(self, dieta, inicio, dias=DIAS, pular=()):
+        """ ``{data: [ids das receitas]}`` para os dias do período fora de ``pular``. """
+        minimo = max(1, dieta.min_refeicao)
+        maximo = max(minimo, dieta.max_refeicao)
+        restritos = compatibilidade.ingredientes_restritos(dieta)
+        proibidas = compatibilidade.obter_indice().proibidas(restritos)
+        compativeis = ~np.isin(self.ids, np.fromiter(proibidas, dtype=np.int64, count=len(proibidas)))
+        if compativeis.sum() < minimo:
+            raise PlanejamentoImpossivel(f"Dieta {dieta.pk}: receitas compatíveis insuficientes.")
+
+        plano = {}
+        disponiveis = compativeis.copy()
+        for dia in range(dias):
+            data = inicio + timedelta(days=dia)
+            if data in pular:
+                continue
+            # Evita repetir receitas na semana enquanto houver opções
+            if disponiveis.sum() < 2 * maximo:
+                disponiveis = compativeis.copy()
+            posicoes = np.flatnonzero(disponiveis)
+            escolhidas = posicoes[escolher_dia(self.calorias[posicoes], dieta.total_caloria, minimo, maximo, self.rng)]
+            disponiveis[escolhidas] = False
+            plano[data] = [int(pk) for pk in self.ids[escolhidas[::-1]]]
+        return plano
+
+
+def dias_planejados(dieta, inicio, dias=DIAS):
+    return set(
+        Refeicao.objects.filter(
+            refeicaodieta__dieta=dieta, date__gte=inicio, date__lt=inicio + timedelta(days=dias)
+        ).values_list('date', flat=True)
+    )
+
+
+def salvar(dieta, plano):
+    """ Grava o plano com três ``bulk_create``. Devolve as refeições criadas. """
+    refeicoes, receitas = [], []
+    for data, ids in sorted(plano.items()):
+        # As receitas vêm da mais para a menos calórica
+        tipos = sorted(tipos_refeicao(len(ids)), key=ORDEM_POR_PORCAO.index)
+        for tipo, receita in zip(tipos, ids):
+            refeicoes.append(Refeicao(date=data, tipo_refeicao=tipo, usuario_id=dieta.usuario_id))
+            receitas.append(receita)
+    with transaction.atomic():
+        Refeicao.objects.bulk_create(refeicoes)
+        ReceitaRefeicao.objects.bulk_create(
+            [ReceitaRefeicao(receita_id=receita, refeicao=r) for receita, r in zip(receitas, refeicoes)]
+        )
+        RefeicaoDieta.objects.bulk_create([RefeicaoDieta(dieta=dieta, refeicao=r) for r in refeicoes])
+    return refeicoes
+
+
+def planejar_dieta(dieta, inicio=None, planejador=None):
+    """ Planeja e grava a semana de uma dieta a partir de ``inicio`` (padrão: hoje). """
+    inicio = inicio or date.today()
+    planejador = planejador or Planejador()
+    plano = planejador.planejar(dieta, inicio, pular=dias_planejados(dieta, inicio))
+    return salvar(dieta, plano)
+
+
+# --- Modo em lote ---
+
+_planejador = None
+
+
+def _iniciar_worker(seed):
+    global _planejador
+    # Cada processo abre as próprias conexões e carrega as receitas uma vez
+    db.connections.close_all()
+    _planejador = Planejador(seed)
+
+
+def _planejar(dieta_id, inicio):
+    dieta = Dieta.objects.get(pk=dieta_id)
+    try:
+        return dieta_id, len(planejar_dieta(dieta, inicio, _planejador)), None
+    except PlanejamentoImpossivel as e:
+        return dieta_id, 0, str(e)
+
+
+def _planejar_no_worker(argumentos):
+    return _planejar(*argumentos)
+
+
+def planejar_todas(inicio=None, workers=1, seed=None):
+    """
+    Planeja a semana de todas as dietas ativas, distribuindo as dietas entre
+    ``workers`` processos. Gera ``(dieta_id, refeicoes_criadas, erro)``.
+    """
+    inicio = inicio or date.today()
+    ids = list(Dieta.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+    if workers <= 1:
+        global _planejador
+        _planejador = Planejador(seed)
+        for dieta_id in ids:
+            yield _planejar(dieta_id, inicio)
+        return
+
+    # As conexões do processo pai não podem ser herdadas pelos filhos
+    db.connections.close_all()
+    # Os workers herdam o Django já configurado; com spawn/forkserver (padrão no
+    # macOS e, a partir do Python 3.14, no Linux) este módulo nem seria importável neles
+    contexto = multiprocessing.get_context('fork')
+    with contexto.Pool(workers, initializer=_iniciar_worker, initargs=(seed,)) as pool:
+        yield from pool.imap_unordered(_planejar_no_worker, [(dieta_id, inicio) for dieta_id in ids], chunksize=16)
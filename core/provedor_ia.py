@@ -0,0 +1,241 @@
+# core/provedor_ia.py
+"""
+Provedor de IA compartilhado pelo processo.
+
+Mantém uma única instância do backend (e, com ela, o pool de conexões HTTP do
+cliente do Gemini), limita as chamadas simultâneas, repete falhas transitórias
+com backoff exponencial e jitter e abre um circuito quando o serviço está fora
+do ar, para falhar rápido em vez de acumular chamadas presas.
+"""
+import asyncio
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import metricas
+
+try:
+    import httpx  # usado pelo cliente do Gemini
+    ERROS_DE_REDE = (ConnectionError, TimeoutError, httpx.TransportError)
+except ImportError:
+    ERROS_DE_REDE = (ConnectionError, TimeoutError)
+
+# Códigos HTTP que indicam sobrecarga ou indisponibilidade momentânea
+CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+
+class ErroIA(Exception):
+    """ Falha ao obter resposta do modelo de IA. """
+
+
+class ErroTransitorio(ErroIA):
+    """ Falha que pode dar certo numa nova tentativa (throttling, timeout...). """
+
+
+class CircuitoAberto(ErroIA):
+    """ O serviço falhou seguidamente e as chamadas estão suspensas. """
+
+
+def is_transitorio(erro):
+    if isinstance(erro, (ErroTransitorio,) + ERROS_DE_REDE):
+        return True
+    # google.genai.errors.APIError traz o status HTTP em ``code``
+    return getattr(erro, 'code', None) in CODIGOS_TRANSITORIOS
+
+
+class Circuito:
+    """
+    Circuit breaker: após ``limiar`` falhas seguidas fica aberto por ``pausa``
+    segundos; depois libera uma chamada de teste (meio aberto) e fecha de novo
+    se ela der certo.
+    """
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio_aberto'
+
+    def __init__(self, limiar, pausa, relogio=time.monotonic):
+        self.limiar = limiar
+        self.pausa = pausa
+        self.relogio = relogio
+        self.falhas = 0
+        self.aberto_em = None
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        if self.aberto_em is None:
+            return self.FECHADO
+        if self.relogio() - self.aberto_em >= self.pausa:
+            return self.MEIO_ABERTO
+        return self.ABERTO
+
+    def permitir(self):
+        """
+        Levanta ``CircuitoAberto`` se a chamada não deve ser feita agora.
+        Devolve True quando a chamada liberada é a de teste do circuito meio aberto.
+        """
+        with self._lock:
+            estado = self.estado
+            if estado == self.FECHADO:
+                return False
+            if estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+        raise CircuitoAberto("Serviço de IA indisponível no momento; tente novamente em instantes.")
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_em = None
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas += 1
+            if self._teste_em_andamento or self.falhas >= self.limiar:
+                self.aberto_em = self.relogio()
+            self._teste_em_andamento = False
+
+    def liberar_teste(self):
+        """ Desiste da chamada de teste sem concluí-la (ex.: cancelada pelo cliente). """
+        with self._lock:
+            self._teste_em_andamento = False
+
+
+class Provedor:
+    """ Envolve um backend com limite de concorrência, retentativas e circuit breaker. """
+
+    def __init__(self, backend, max_simultaneas=None, tentativas=None,
+                 backoff_base=None, backoff_max=None, circuito=None):
+        self.backend = backend
+        self.max_simultaneas = max_simultaneas or settings.IA_MAX_SIMULTANEAS
+        self.max_simultaneas_async = max_simultaneas or settings.IA_MAX_SIMULTANEAS_ASYNC
+        self.tentativas = tentativas or settings.IA_TENTATIVAS
+        self.backoff_base = settings.IA_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = settings.IA_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.circuito = circuito or Circuito(settings.IA_CIRCUITO_LIMIAR, settings.IA_CIRCUITO_PAUSA)
+        self._vagas = threading.BoundedSemaphore(self.max_simultaneas)
+        self._vagas_async = None
+        self._loop_vagas_async = None
+
+    def espera(self, tentativa):
+        """ Backoff exponencial com "full jitter" para a n-ésima retentativa. """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** tentativa))
+
+    def _registrar_erro(self, erro):
+        """ Atualiza o circuito e informa se o erro merece nova tentativa. """
+        if is_transitorio(erro):
+            self.circuito.registrar_falha()
+            return True
+        # Erro do pedido em si (ex.: prompt inválido), não do serviço
+        self.circuito.registrar_sucesso()
+        return False
+
+    def gerar(self, prompt, **kwargs):
+        for tentativa in range(self.tentativas):
+            teste = self.circuito.permitir()
+            try:
+                with self._vagas:
+                    inicio = time.perf_counter()
+                    resposta = self.backend.gerar(prompt, **kwargs)
+            except Exception as e:
+                metricas.registrar_ia('gerar', time.perf_counter() - inicio, e)
+                if not self._registrar_erro(e) or tentativa == self.tentativas - 1:
+                    raise
+                time.sleep(self.espera(tentativa))
+            except BaseException:
+                # Cancelamento/interrupção não diz nada sobre o serviço; só libera o teste
+                if teste:
+                    self.circuito.liberar_teste()
+                raise
+            else:
+                metricas.registrar_ia('gerar', time.perf_counter() - inicio)
+                self.circuito.registrar_sucesso()
+                return resposta
+
+    def _semaforo_async(self):
+        # Um asyncio.Semaphore só pode ser usado no loop em que foi criado
+        loop = asyncio.get_running_loop()
+        if self._loop_vagas_async is not loop:
+            self._loop_vagas_async = loop
+            self._vagas_async = asyncio.Semaphore(self.max_simultaneas_async)
+        return self._vagas_async
+
+    async def agerar(self, prompt, **kwargs):
+        """ Versão assíncrona de ``gerar``; as esperas não ocupam threads. """
+        for tentativa in range(self.tentativas):
+            teste = self.circuito.permitir()
+            try:
+                async with self._semaforo_async():
+                    inicio = time.perf_counter()
+                    resposta = await self.backend.agerar(prompt, **kwargs)
+            except Exception as e:
+                metricas.registrar_ia('gerar', time.perf_counter() - inicio, e)
+                if not self._registrar_erro(e) or tentativa == self.tentativas - 1:
+                    raise
+                await asyncio.sleep(self.espera(tentativa))
+            except BaseException:
+                if teste:
+                    self.circuito.liberar_teste()
+                raise
+            else:
+                metricas.registrar_ia('gerar', time.perf_counter() - inicio)
+                self.circuito.registrar_sucesso()
+                return resposta
+
+    async def gerar_stream(self, prompt, **kwargs):
+        """
+        Versão assíncrona e em partes de ``gerar``. Só repete a chamada se a
+        falha acontecer antes da primeira parte ter sido entregue.
+        """
+        for tentativa in range(self.tentativas):
+            teste = self.circuito.permitir()
+            entregou = False
+            try:
+                async with self._semaforo_async():
+                    inicio = time.perf_counter()
+                    async for parte in self.backend.gerar_stream(prompt, **kwargs):
+                        entregou = True
+                        yield parte
+            except Exception as e:
+                metricas.registrar_ia('stream', time.perf_counter() - inicio, e)
+                if not self._registrar_erro(e) or entregou or tentativa == self.tentativas - 1:
+                    raise
+                await asyncio.sleep(self.espera(tentativa))
+            except BaseException:
+                # GeneratorExit (cliente fechou o stream) ou CancelledError
+                if teste:
+                    self.circuito.liberar_teste()
+                raise
+            else:
+                metricas.registrar_ia('stream', time.perf_counter() - inicio)
+                self.circuito.registrar_sucesso()
+                return
+
+
+_provedor = None
+_provedor_lock = threading.Lock()
+
+
+def obter_provedor():
+    """ Devolve o provedor do processo, criando o backend na primeira chamada. """
+    global _provedor
+    if _provedor is None:
+        with _provedor_lock:
+            if _provedor is None:
+                _provedor = Provedor(import_string(settings.IA_BACKEND)())
+    return _provedor
+
+
+@receiver(setting_changed)
+def _descartar_provedor(*, setting, **kwargs):
+    # Permite que os testes troquem o backend com override_settings
+    global _provedor
+    if setting.startswith('IA_'):
+        _provedor = None
@@ -0,0 +1,133 @@
+# core/resolvedor.py
+"""
+Resolve os nomes de ingredientes devolvidos pela IA ("Cebolas", "açucar",
+"tomate-cereja") para ``Ingrediente`` cadastrados, sem consultar o banco a
+cada nome.
+
+A correspondência é tentada em três níveis, do mais ao menos confiável:
+
+1. nome exato, sem diferença de caixa;
+2. nome normalizado (sem acentos nem pontuação), também no singular e pelos
+   sinônimos de ``SINONIMOS``;
+3. nome parecido, pela similaridade de trigramas do índice de
+   core/busca.py, acima de ``SIMILARIDADE_MINIMA``.
+
+Os mapas dos níveis 1 e 2 são montados a partir dos nomes do índice de
+busca do processo e refeitos quando a versão dele muda. Em nomes repetidos
+vale o ingrediente de menor id.
+"""
+import threading
+
+from . import busca
+from .ia import QUANTIDADE_MAXIMA
+from .texto import palavras
+
+# Mais exigente que o autocomplete: aqui não há ninguém para escolher entre as sugestões
+SIMILARIDADE_MINIMA = 0.5
+
+# Nomes regionais (normalizados e no singular) -> nome mais comum
+SINONIMOS = {
+    'aipim': 'mandioca',
+    'macaxeira': 'mandioca',
+    'jerimum': 'abobora',
+    'mandioquinha': 'batata baroa',
+    'batata salsa': 'batata baroa',
+    'pimentao vermelho': 'pimentao',
+    'cheiro verde': 'salsinha',
+    'salsa': 'salsinha',
+    'polvilho': 'fecula de mandioca',
+    'feijao carioquinha': 'feijao carioca',
+    'oleo': 'oleo de soja',
+}
+
+
+def _singular(palavra):
+    if len(palavra) <= 3 or palavra.endswith('ss'):
+        return palavra
+    for sufixo, troca in (('oes', 'ao'), ('aes', 'ao'), ('ns', 'm'), ('res', 'r'), ('zes', 'z')):
+        if palavra.endswith(sufixo):
+            return palavra[:-len(sufixo)] + troca
+    return palavra[:-1] if palavra.endswith('s') else palavra
+
+
+def chaves(nome):
+    """ Formas normalizadas pelas quais um nome é reconhecido. """
+    termos = palavras(nome)
+    if not termos:
+        return []
+    normalizado = ' '.join(termos)
+    singular = ' '.join(_singular(termo) for termo in termos)
+    resultado = [normalizado, singular]
+    for chave in (normalizado, singular):
+        if chave in SINONIMOS:
+            resultado.append(SINONIMOS[chave])
+    return list(dict.fromkeys(resultado))
+
+
+class Resolvedor:
+    """ Mapas de nome exato e normalizado -> id, derivados do índice de busca. """
+
+    def __init__(self):
+        self.exatos = {}
+        self.normalizados = {}
+        self.versao = None
+
+    def carregar(self, itens):
+        """ Refaz os mapas a partir de ``{id: (nome, categoria)}``. """
+        self.exatos, self.normalizados = {}, {}
+        for pk, (nome, _) in sorted(itens.items()):
+            self.exatos.setdefault(nome.strip().casefold(), pk)
+            for chave in chaves(nome):
+                self.normalizados.setdefault(chave, pk)
+
+    def resolver(self, nome, indice):
+        """ Id do ingrediente correspondente ao nome, ou ``None``. """
+        pk = self.exatos.get(nome.strip().casefold())
+        if pk is not None:
+            return pk
+        candidatas = chaves(nome)
+        for chave in candidatas:
+            pk = self.normalizados.get(chave)
+            if pk is not None:
+                return pk
+        if not candidatas:
+            return None
+        parecidos = indice.parecidos(candidatas[0], SIMILARIDADE_MINIMA)
+        if not parecidos:
+            return None
+        # O mais parecido; no empate, o nome mais curto (o mais genérico)
+        return min(parecidos, key=lambda pk: (-parecidos[pk], len(indice.itens[pk][0]), pk))
+
+
+_resolvedor = Resolvedor()
+_lock = threading.Lock()
+
+
+def resolver(nomes):
+    """ ``{nome: id ou None}`` dos nomes dados. """
+    indice = busca.obter_indice()
+    with _lock, indice.lock:
+        if _resolvedor.versao is None or _resolvedor.versao != indice.versao:
+            _resolvedor.carregar(indice.itens)
+            _resolvedor.versao = indice.versao
+        return {nome: _resolvedor.resolver(nome, indice) for nome in nomes}
+
+
+def resolver_itens(itens):
+    """
+    ``[(ingrediente_id, quantidade, unidade)]`` dos itens interpretados da
+    resposta da IA (ver ``ia.interpretar_resposta``). Nomes sem
+    correspondência ficam de fora; um ingrediente repetido entra uma vez,
+    com as quantidades somadas quando a unidade é a mesma.
+    """
+    ids = resolver({item['nome'] for item in itens})
+    resultado = {}
+    for item in itens:
+        pk = ids[item['nome']]
+        if pk is None:
+            continue
+        if pk not in resultado:
+            resultado[pk] = [pk, item['quantidade'], item['unidade']]
+        elif resultado[pk][2] == item['unidade']:
+            resultado[pk][1] = min(resultado[pk][1] + item['quantidade'], QUANTIDADE_MAXIMA)
+    return [tuple(item) for item in resultado.values()]
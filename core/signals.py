@@ -0,0 +1,335 @@
+# core/signals.py
+"""
+Receivers que mantêm dados derivados (contadores, índices...) em dia com as
+tabelas principais. Conectados em CoreConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import agenda, busca, busca_semantica, calorias, compatibilidade, compras, contadores, duplicatas, fragmentos
+from .managers import bulk_create_concluido
+from .models import (
+    Categoria, Contador, Ingrediente, IngredienteReceita, Receita, ReceitaRefeicao, Refeicao, RefeicaoAgenda,
+)
+
+
+# --- Contadores da landing page ---
+
+@receiver(post_save, sender=Ingrediente)
+def contar_ingrediente_criado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        contadores.incrementar(Contador.INGREDIENTES)
+
+
+@receiver(post_delete, sender=Ingrediente)
+def contar_ingrediente_removido(sender, instance, **kwargs):
+    contadores.incrementar(Contador.INGREDIENTES, -1)
+
+
+@receiver(post_save, sender=Receita)
+def contar_receita_salva(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    carregada = getattr(instance, '_ia_carregada', None)
+    if created:
+        contadores.incrementar(Contador.RECEITAS)
+        if instance.is_ai_generated:
+            contadores.incrementar(Contador.RECEITAS_IA)
+    elif carregada is not None and carregada != instance.is_ai_generated:
+        contadores.incrementar(Contador.RECEITAS_IA, 1 if instance.is_ai_generated else -1)
+    instance._ia_carregada = instance.is_ai_generated
+
+
+@receiver(post_delete, sender=Receita)
+def contar_receita_removida(sender, instance, **kwargs):
+    contadores.incrementar(Contador.RECEITAS, -1)
+    if instance.is_ai_generated:
+        contadores.incrementar(Contador.RECEITAS_IA, -1)
+
+
+@receiver(bulk_create_concluido, sender=Ingrediente)
+@receiver(bulk_create_concluido, sender=Receita)
+def contar_bulk_create(sender, objs, options, **kwargs):
+    if options.get('ignore_conflicts') or options.get('update_conflicts'):
+        # Não há como saber quantas linhas foram realmente inseridas
+        contadores.recalcular()
+    elif sender is Ingrediente:
+        contadores.incrementar(Contador.INGREDIENTES, len(objs))
+    else:
+        contadores.incrementar(Contador.RECEITAS, len(objs))
+        contadores.incrementar(Contador.RECEITAS_IA, sum(1 for r in objs if r.is_ai_generated))
+
+
+# --- Índice de busca de ingredientes ---
+
+@receiver(post_save, sender=Ingrediente)
+def indexar_ingrediente(sender, instance, raw=False, **kwargs):
+    if not raw:
+        categoria = instance.categoria.nome if instance.categoria_id else None
+        busca.notificar_alteracao(ingredientes=[(instance.pk, instance.nome, categoria)])
+
+
+@receiver(post_delete, sender=Ingrediente)
+def desindexar_ingrediente(sender, instance, **kwargs):
+    busca.notificar_alteracao(removidos=[instance.pk])
+
+
+@receiver(bulk_create_concluido, sender=Ingrediente)
+def indexar_ingredientes_em_massa(sender, objs, options, **kwargs):
+    if options.get('ignore_conflicts') or options.get('update_conflicts') or any(o.pk is None for o in objs):
+        busca.notificar_alteracao(recarregar=True)
+        return
+    categorias = Categoria.objects.in_bulk({o.categoria_id for o in objs if o.categoria_id})
+    busca.notificar_alteracao(ingredientes=[
+        (o.pk, o.nome, categorias[o.categoria_id].nome if o.categoria_id else None) for o in objs
+    ])
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def reindexar_categoria(sender, instance, raw=False, **kwargs):
+    # O nome da categoria também é pesquisável em cada um de seus ingredientes
+    if not raw:
+        busca.notificar_alteracao(recarregar=True)
+
+
+# --- Calorias das receitas ---
+
+@receiver(post_save, sender=IngredienteReceita)
+@receiver(post_delete, sender=IngredienteReceita)
+def recalcular_calorias_da_receita(sender, instance, raw=False, **kwargs):
+    if not raw:
+        calorias.recalcular_receitas([instance.receita_id])
+
+
+@receiver(bulk_create_concluido, sender=IngredienteReceita)
+def recalcular_calorias_em_massa(sender, objs, **kwargs):
+    calorias.recalcular_receitas({o.receita_id for o in objs})
+
+
+@receiver(post_save, sender=Ingrediente)
+def propagar_caloria_do_ingrediente(sender, instance, created, raw=False, **kwargs):
+    carregada = getattr(instance, '_caloria_carregada', None)
+    if not created and not raw and carregada is not None and carregada != instance.caloria:
+        calorias.recalcular_por_ingrediente([instance.pk])
+    instance._caloria_carregada = instance.caloria
+
+
+@receiver(post_save, sender=Ingrediente)
+def atualizar_receitas_do_ingrediente(sender, instance, created, raw=False, **kwargs):
+    # O nome do ingrediente aparece no detalhe das receitas (ETag/Last-Modified)
+    # e nos vetores da busca de receitas
+    carregado = getattr(instance, '_nome_carregado', None)
+    if not created and not raw:
+        receitas = Receita.objects.filter(ingredientereceita__ingrediente=instance.pk)
+        receitas.update(atualizado_em=timezone.now())
+        if carregado is not None and carregado != instance.nome:
+            busca_semantica.notificar_alteracao(receitas.values_list('pk', flat=True))
+    instance._nome_carregado = instance.nome
+
+
+# --- Fragmentos de template cacheados (listas e detalhe) ---
+
+@receiver(post_save, sender=Receita)
+@receiver(post_delete, sender=Receita)
+def invalidar_fragmento_da_receita(sender, instance, **kwargs):
+    fragmentos.invalidar(Receita, [instance.pk])
+
+
+@receiver(post_save, sender=IngredienteReceita)
+@receiver(post_delete, sender=IngredienteReceita)
+def invalidar_fragmento_pelos_itens(sender, instance, **kwargs):
+    # Os itens aparecem no detalhe e mudam o total de calorias
+    fragmentos.invalidar(Receita, [instance.receita_id])
+
+
+@receiver(bulk_create_concluido, sender=Ingrediente)
+@receiver(bulk_create_concluido, sender=Receita)
+@receiver(bulk_create_concluido, sender=IngredienteReceita)
+def invalidar_fragmentos_em_massa(sender, objs, **kwargs):
+    # Ids novos podem repetir os de objetos apagados (SQLite sem AUTOINCREMENT)
+    if sender is IngredienteReceita:
+        fragmentos.invalidar(Receita, [o.receita_id for o in objs])
+    else:
+        fragmentos.invalidar(sender, [o.pk for o in objs])
+
+
+@receiver(post_save, sender=Ingrediente)
+@receiver(post_delete, sender=Ingrediente)
+def invalidar_fragmento_do_ingrediente(sender, instance, created=False, **kwargs):
+    fragmentos.invalidar(Ingrediente, [instance.pk])
+    if not created:
+        # Nome e caloria aparecem nas receitas que usam o ingrediente
+        fragmentos.invalidar(Receita, IngredienteReceita.objects.filter(
+            ingrediente=instance.pk
+        ).values_list('receita_id', flat=True))
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_fragmentos_da_categoria(sender, instance, **kwargs):
+    fragmentos.invalidar_tudo(Ingrediente)
+
+
+# --- Índice de receitas compatíveis com as dietas ---
+
+@receiver(post_save, sender=Receita)
+def indexar_receita_criada(sender, instance, created, raw=False, **kwargs):
+    # Editar título/instruções não muda a compatibilidade
+    if created and not raw:
+        compatibilidade.notificar_alteracao(receitas=[instance.pk])
+
+
+@receiver(post_delete, sender=Receita)
+def desindexar_receita(sender, instance, **kwargs):
+    compatibilidade.notificar_alteracao(receitas=[instance.pk])
+
+
+@receiver(post_save, sender=IngredienteReceita)
+@receiver(post_delete, sender=IngredienteReceita)
+def reindexar_ingredientes_da_receita(sender, instance, raw=False, **kwargs):
+    if not raw:
+        compatibilidade.notificar_alteracao(receitas=[instance.receita_id])
+
+
+@receiver(bulk_create_concluido, sender=Receita)
+@receiver(bulk_create_concluido, sender=IngredienteReceita)
+def reindexar_receitas_em_massa(sender, objs, options, **kwargs):
+    ids = [o.pk if sender is Receita else o.receita_id for o in objs]
+    recarregar = options.get('ignore_conflicts') or options.get('update_conflicts') or None in ids
+    compatibilidade.notificar_alteracao(receitas=ids, recarregar=bool(recarregar))
+
+
+# --- Assinaturas de receitas quase iguais ---
+
+@receiver(post_save, sender=Receita)
+def assinar_receita(sender, instance, raw=False, **kwargs):
+    if not raw:
+        duplicatas.indexar([instance.pk])
+
+
+@receiver(post_save, sender=IngredienteReceita)
+@receiver(post_delete, sender=IngredienteReceita)
+def reassinar_pelos_itens(sender, instance, raw=False, **kwargs):
+    if not raw:
+        duplicatas.indexar([instance.receita_id])
+
+
+@receiver(bulk_create_concluido, sender=Receita)
+@receiver(bulk_create_concluido, sender=IngredienteReceita)
+def assinar_receitas_em_massa(sender, objs, **kwargs):
+    duplicatas.indexar(o.pk if sender is Receita else o.receita_id for o in objs)
+
+
+# --- Vetores da busca de receitas ---
+
+@receiver(post_save, sender=Receita)
+@receiver(post_delete, sender=Receita)
+def revetorizar_receita(sender, instance, raw=False, **kwargs):
+    if not raw:
+        busca_semantica.notificar_alteracao([instance.pk])
+
+
+@receiver(post_save, sender=IngredienteReceita)
+@receiver(post_delete, sender=IngredienteReceita)
+def revetorizar_pelos_itens(sender, instance, raw=False, **kwargs):
+    if not raw:
+        busca_semantica.notificar_alteracao([instance.receita_id])
+
+
+@receiver(bulk_create_concluido, sender=Receita)
+@receiver(bulk_create_concluido, sender=IngredienteReceita)
+def revetorizar_receitas_em_massa(sender, objs, **kwargs):
+    busca_semantica.notificar_alteracao(o.pk if sender is Receita else o.receita_id for o in objs)
+
+
+# --- Listas de compras das refeições planejadas ---
+
+@receiver(post_save, sender=ReceitaRefeicao)
+def incluir_na_lista_de_compras(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        compras.ajustar([(instance.receita_id, instance.refeicao_id)], 1)
+
+
+@receiver(post_delete, sender=ReceitaRefeicao)
+def retirar_da_lista_de_compras(sender, instance, **kwargs):
+    compras.ajustar([(instance.receita_id, instance.refeicao_id)], -1)
+
+
+@receiver(bulk_create_concluido, sender=ReceitaRefeicao)
+def incluir_na_lista_de_compras_em_massa(sender, objs, **kwargs):
+    compras.ajustar([(o.receita_id, o.refeicao_id) for o in objs], 1)
+
+
+def _receitas_da_refeicao(refeicao):
+    return ReceitaRefeicao.objects.filter(refeicao=refeicao).values_list('receita_id', 'refeicao_id')
+
+
+@receiver(pre_delete, sender=Refeicao)
+def retirar_refeicao_da_lista_de_compras(sender, instance, **kwargs):
+    # Os vínculos ficam com refeicao nula (SET_NULL), sem post_delete
+    compras.ajustar(_receitas_da_refeicao(instance), -1)
+
+
+@receiver(pre_save, sender=Refeicao)
+def refeicao_sai_do_periodo(sender, instance, raw=False, **kwargs):
+    carregada = getattr(instance, '_data_carregada', None)
+    instance._mudou_de_data = not raw and carregada is not None and carregada != instance.date
+    if instance._mudou_de_data:
+        # Ainda com a data antiga no banco
+        compras.ajustar(_receitas_da_refeicao(instance), -1)
+
+
+@receiver(post_save, sender=Refeicao)
+def refeicao_entra_no_periodo(sender, instance, **kwargs):
+    if getattr(instance, '_mudou_de_data', False):
+        compras.ajustar(_receitas_da_refeicao(instance), 1)
+    instance._data_carregada = instance.date
+
+
+# --- Versões das agendas (feed .ics) ---
+
+@receiver(post_save, sender=RefeicaoAgenda)
+def agendar_refeicao(sender, instance, raw=False, **kwargs):
+    if not raw and instance.refeicao_id:
+        agenda.registrar_alteracao([instance.refeicao_id])
+
+
+@receiver(post_delete, sender=RefeicaoAgenda)
+def desagendar_refeicao(sender, instance, **kwargs):
+    agenda.registrar_remocao(instance.agenda_alimentar_id, [instance.refeicao_id])
+
+
+@receiver(post_save, sender=Refeicao)
+def atualizar_evento_da_refeicao(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        agenda.registrar_alteracao([instance.pk])
+
+
+@receiver(pre_delete, sender=Refeicao)
+def cancelar_evento_da_refeicao(sender, instance, **kwargs):
+    # Os vínculos com as agendas ficam com refeicao nula (SET_NULL), sem post_delete
+    for agenda_id in RefeicaoAgenda.objects.filter(refeicao=instance).values_list('agenda_alimentar_id', flat=True):
+        agenda.registrar_remocao(agenda_id, [instance.pk])
+
+
+@receiver(post_save, sender=ReceitaRefeicao)
+@receiver(post_delete, sender=ReceitaRefeicao)
+def atualizar_evento_pelas_receitas(sender, instance, raw=False, **kwargs):
+    if not raw and instance.refeicao_id:
+        agenda.registrar_alteracao([instance.refeicao_id])
+
+
+@receiver(bulk_create_concluido, sender=ReceitaRefeicao)
+def atualizar_eventos_pelas_receitas_em_massa(sender, objs, **kwargs):
+    agenda.registrar_alteracao({o.refeicao_id for o in objs if o.refeicao_id})
+
+
+@receiver(post_save, sender=Receita)
+def atualizar_eventos_pelo_titulo(sender, instance, created, raw=False, **kwargs):
+    # O título da receita compõe o SUMMARY dos eventos em que ela aparece
+    carregado = getattr(instance, '_titulo_carregado', None)
+    if not created and not raw and carregado is not None and carregado != instance.titulo:
+        agenda.registrar_alteracao(ReceitaRefeicao.objects.filter(receita=instance).values('refeicao_id'))
+    instance._titulo_carregado = instance.titulo
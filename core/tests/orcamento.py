@@ -0,0 +1,140 @@
+# core/tests/orcamento.py
+"""
+Base para testes de orçamento de consultas.
+
+``OrcamentoConsultasTestCase.assertOrcamento`` executa uma página (ou função)
+com a base semeada em tamanhos crescentes e verifica que:
+
+* o número de consultas não passa do máximo e não cresce com o volume
+  (pega N+1 como ``ingrediente.categoria`` sem ``select_related``);
+* o plano de cada SELECT é o mesmo em todos os tamanhos e não faz varredura
+  completa (``SCAN`` sem índice) das tabelas que crescem com o uso.
+
+A verificação de plano usa ``EXPLAIN QUERY PLAN`` e só roda no SQLite; nos
+demais bancos apenas as contagens são verificadas.
+"""
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from core.models import (
+    AgendaAlimentar, Categoria, Dieta, GeracaoReceita, Ingrediente, IngredienteDieta, IngredienteListaCompra,
+    IngredienteReceita, ListaDeCompra, Perfil, Receita, ReceitaRefeicao, Refeicao, RefeicaoAgenda, RefeicaoDieta,
+    Usuario,
+)
+
+# Tabelas que crescem com o uso e nunca devem ser varridas por inteiro
+TABELAS_GRANDES = {
+    model._meta.db_table for model in (
+        Ingrediente, Receita, IngredienteReceita, Refeicao, ReceitaRefeicao, RefeicaoDieta, RefeicaoAgenda,
+        IngredienteDieta, IngredienteListaCompra, ListaDeCompra, GeracaoReceita, Usuario,
+    )
+}
+
+_APELIDO = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?')
+_VARREDURA = re.compile(r'^SCAN (\w+)$')
+_LIMITE = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+
+
+class _Coletor:
+    """ ``execute_wrapper`` que guarda os SELECTs com os parâmetros originais. """
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+class OrcamentoConsultasTestCase(TestCase):
+    TAMANHOS = (3, 30)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "123")
+        cls.perfil = Perfil.objects.create(tipo="Comum")
+        cls.usuario = Usuario.objects.create_user(username="ana", password="123", perfil=cls.perfil)
+        cls.dieta = Dieta.objects.create(usuario=cls.usuario, min_refeicao=3, max_refeicao=4, total_caloria=2000)
+        cls.agenda = AgendaAlimentar.objects.create(usuario=cls.usuario)
+        cls.semeados = 0
+
+    def semear(self, tamanho):
+        """ Completa a base até ``tamanho`` itens de cada tipo. """
+        inicio, self.semeados = self.semeados, max(self.semeados, tamanho)
+        for i in range(inicio, tamanho):
+            categoria = Categoria.objects.create(nome=f"Categoria {i}")
+            ingrediente = Ingrediente.objects.create(nome=f"Ingrediente {i}", caloria=10 + i, categoria=categoria)
+            receita = Receita.objects.create(titulo=f"Receita {i}", instrucoes="...", tempo_preparo=10)
+            IngredienteReceita.objects.create(receita=receita, ingrediente=ingrediente, quantidade=2)
+            if i % 2:
+                IngredienteDieta.objects.create(dieta=self.dieta, ingrediente=ingrediente)
+            refeicao = Refeicao.objects.create(
+                date=date(2026, 10, 19) + timedelta(days=i % 7), tipo_refeicao=Refeicao.ALMOCO, usuario=self.usuario
+            )
+            ReceitaRefeicao.objects.create(receita=receita, refeicao=refeicao)
+            RefeicaoDieta.objects.create(dieta=self.dieta, refeicao=refeicao)
+            RefeicaoAgenda.objects.create(agenda_alimentar=self.agenda, refeicao=refeicao)
+            GeracaoReceita.objects.create(prompt=f"prompt {i}", status=GeracaoReceita.CONCLUIDA, receita=receita)
+            outro = Usuario.objects.create(username=f"usuario{i}", perfil=self.perfil)
+            lista = ListaDeCompra.objects.create(usuario=outro, data_inicio=date(2026, 10, 19))
+            IngredienteListaCompra.objects.create(lista_de_compra=lista, ingrediente=ingrediente, ocorrencias=1)
+
+    def _medir(self, executar):
+        coletor = _Coletor()
+        with connection.execute_wrapper(coletor):
+            executar()
+        selects = [(sql, params) for sql, params in coletor.consultas if sql.lstrip().upper().startswith('SELECT')]
+        return len(coletor.consultas), [(sql, self._plano(sql, params)) for sql, params in selects]
+
+    def _plano(self, sql, params):
+        if connection.vendor != 'sqlite':
+            return ()
+        apelidos = dict((apelido, tabela) for tabela, apelido in _APELIDO.findall(sql))
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            detalhes = [linha[-1] for linha in cursor.fetchall()]
+        # Troca os apelidos (U0, T3...) pelos nomes das tabelas
+        return tuple(
+            re.sub(r'\b([A-Z]\d+)\b', lambda m: apelidos.get(m.group(1), m.group(1)), detalhe)
+            for detalhe in detalhes
+        )
+
+    def assertOrcamento(self, executar, maximo, varreduras_permitidas=(), indices=()):
+        """
+        ``executar`` é uma URL (GET pelo client) ou uma função sem argumentos.
+        ``varreduras_permitidas``: tabelas que a página precisa ler inteiras.
+        ``indices``: nomes de índices que algum plano deve usar.
+        """
+        if isinstance(executar, str):
+            url = executar
+            executar = lambda: self.assertLess(self.client.get(url).status_code, 400, url)  # noqa: E731
+
+        medicoes = []
+        for tamanho in self.TAMANHOS:
+            self.semear(tamanho)
+            medicoes.append(self._medir(executar))
+
+        contagens = [consultas for consultas, _ in medicoes]
+        self.assertLessEqual(max(contagens), maximo, f"consultas por tamanho {dict(zip(self.TAMANHOS, contagens))}")
+        self.assertLessEqual(contagens[-1], contagens[0], f"consultas crescem com o volume: {contagens}")
+
+        planos = [planos for _, planos in medicoes]
+        novos = {plano for _, plano in planos[-1]} - {plano for _, plano in planos[0]}
+        self.assertFalse(novos, "o plano muda com o volume")
+        for sql, plano in planos[-1]:
+            # Percorrer a tabela na ordem do ORDER BY com LIMIT para cedo (paginação)
+            if _LIMITE.search(sql) and not any('TEMP B-TREE' in detalhe for detalhe in plano):
+                continue
+            for detalhe in plano:
+                varredura = _VARREDURA.match(detalhe)
+                if varredura and varredura.group(1) in TABELAS_GRANDES - set(varreduras_permitidas):
+                    self.fail(f"varredura completa de {varredura.group(1)}: {plano}\n{sql}")
+
+        if connection.vendor == 'sqlite':
+            usados = ' '.join(detalhe for _, plano in planos[-1] for detalhe in plano)
+            for indice in indices:
+                self.assertIn(f'INDEX {indice} ', usados, f"índice {indice} não usado")
@@ -0,0 +1,92 @@
+import uuid
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import AgendaAlimentar, Perfil, Receita, ReceitaRefeicao, Refeicao, RefeicaoAgenda, Usuario
+
+
+class AgendaIcsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(
+            username="ana", password="123", perfil=Perfil.objects.create(tipo="Comum")
+        )
+        cls.agenda = AgendaAlimentar.objects.create(usuario=cls.usuario)
+        cls.receita = Receita.objects.create(titulo="Arroz, feijão; e ovo", instrucoes="...", tempo_preparo=30)
+
+    def agendar(self, data, tipo=Refeicao.ALMOCO):
+        refeicao = Refeicao.objects.create(date=data, tipo_refeicao=tipo, usuario=self.usuario)
+        ReceitaRefeicao.objects.create(receita=self.receita, refeicao=refeicao)
+        RefeicaoAgenda.objects.create(agenda_alimentar=self.agenda, refeicao=refeicao)
+        return refeicao
+
+    def ics(self, **kwargs):
+        url = reverse("agenda_ics", kwargs={"token": self.agenda.token})
+        return self.client.get(url, kwargs.pop("params", {}), **kwargs)
+
+    def corpo(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_feed_completo_com_eventos_escapados(self):
+        self.agendar(date(2026, 10, 19))
+        response = self.ics()
+        corpo = self.corpo(response)
+
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn("DTSTART:20261019T120000\r\n", corpo)
+        self.assertIn("SUMMARY:Almoço: Arroz\\, feijão\\; e ovo\r\n", corpo)
+        self.assertTrue(corpo.startswith("BEGIN:VCALENDAR\r\n") and corpo.endswith("END:VCALENDAR\r\n"))
+
+    def test_304_com_uma_consulta_enquanto_nada_muda(self):
+        self.agendar(date(2026, 10, 19))
+        etag = self.ics()["ETag"]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ics(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.agendar(date(2026, 10, 20))
+        self.assertEqual(self.ics(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_modo_incremental_com_token(self):
+        segunda = self.agendar(date(2026, 10, 19))
+        terca = self.agendar(date(2026, 10, 20))
+        token = self.ics()["X-Sync-Token"]
+
+        quarta = self.agendar(date(2026, 10, 21))
+        RefeicaoAgenda.objects.filter(refeicao=terca).delete()
+        segunda.tipo_refeicao = Refeicao.JANTAR
+        segunda.save()
+
+        corpo = self.corpo(self.ics(params={"desde": token}))
+        self.assertIn(f"UID:refeicao-{quarta.pk}@luiggis", corpo)
+        self.assertIn(f"UID:refeicao-{segunda.pk}@luiggis\r\nDTSTAMP", corpo)
+        self.assertIn("DTSTART:20261019T190000", corpo)
+        self.assertIn(f"UID:refeicao-{terca.pk}@luiggis", corpo)
+        self.assertEqual(corpo.count("STATUS:CANCELLED"), 1)
+
+        novo_token = self.ics()["X-Sync-Token"]
+        self.assertNotIn("VEVENT", self.corpo(self.ics(params={"desde": novo_token})))
+
+    def test_renomear_receita_atualiza_os_eventos(self):
+        refeicao = self.agendar(date(2026, 10, 19))
+        response = self.ics()
+        etag, token = response["ETag"], response["X-Sync-Token"]
+
+        receita = Receita.objects.get(pk=self.receita.pk)
+        receita.titulo = "Baião de dois"
+        receita.save()
+
+        self.assertEqual(self.ics(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        corpo = self.corpo(self.ics(params={"desde": token}))
+        self.assertIn(f"UID:refeicao-{refeicao.pk}@luiggis", corpo)
+        self.assertIn("SUMMARY:Almoço: Baião de dois\r\n", corpo)
+
+    def test_feed_so_pelo_token_da_agenda(self):
+        self.assertEqual(self.ics().status_code, 200)
+        self.assertEqual(self.client.get(f"/agendas/{self.agenda.pk}/refeicoes.ics").status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse("agenda_ics", kwargs={"token": uuid.uuid4()})).status_code, 404
+        )
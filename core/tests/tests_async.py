@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import geracao
+from core.ia import FakeBackend
+from core.models import Categoria, GeracaoReceita, Ingrediente, IngredienteReceita, Receita
+
+
+class ViewsAssincronasTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Grãos")
+        arroz = Ingrediente.objects.create(nome="Arroz", caloria=130, categoria=categoria)
+        cls.receita = Receita.objects.create(titulo="Arroz branco", instrucoes="...", tempo_preparo=20)
+        IngredienteReceita.objects.create(receita=cls.receita, ingrediente=arroz, quantidade=2)
+
+    async def test_paginas_de_leitura_sob_asgi(self):
+        for url, texto in (
+            (reverse("landing"), None),
+            (reverse("lista_categorias"), "Grãos"),
+            (reverse("lista_ingredientes"), "Arroz"),
+            (reverse("lista_receitas"), "Arroz branco"),
+            (reverse("detalhes_receita", kwargs={"pk": self.receita.pk}), "Arroz"),
+        ):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            if texto:
+                self.assertContains(response, texto)
+
+    async def test_receita_inexistente(self):
+        response = await self.async_client.get(reverse("detalhes_receita", kwargs={"pk": 999}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_landing_sob_wsgi(self):
+        response = self.client.get(reverse("landing"))
+        self.assertEqual(response.context["total_receitas"], 1)
+
+
+@override_settings(IA_CACHE_ATIVO=False)
+class FilaAssincronaTest(TestCase):
+
+    async def test_geracoes_aguardam_a_ia_ao_mesmo_tempo(self):
+        for i in range(20):
+            await GeracaoReceita.objects.acreate(prompt=f"prato {i}")
+
+        inicio = time.perf_counter()
+        processados = await geracao.atender_fila(
+            FakeBackend(latencia=0.2), concorrencia=20, intervalo=0.05, uma_vez=True
+        )
+
+        # Em sequência seriam 4s; concorrentes, pouco mais que uma latência
+        self.assertLess(time.perf_counter() - inicio, 2)
+        self.assertEqual(processados, 20)
+        self.assertEqual(await GeracaoReceita.objects.filter(status=GeracaoReceita.CONCLUIDA).acount(), 20)
+        self.assertEqual(await Receita.objects.filter(is_ai_generated=True).acount(), 20)
+
+    async def test_falha_marca_erro(self):
+        class Falha:
+            async def agerar(self, prompt, **kwargs):
+                raise RuntimeError("upstream fora do ar")
+
+        pedido = await GeracaoReceita.objects.acreate(prompt="qualquer coisa")
+        await geracao.atender_fila(Falha(), concorrencia=5, intervalo=0.05, uma_vez=True)
+
+        await pedido.arefresh_from_db()
+        self.assertEqual(pedido.status, GeracaoReceita.ERRO)
+        self.assertIn("upstream fora do ar", pedido.erro)
+
+
+@override_settings(IA_CACHE_ATIVO=True, IA_CACHE_INTERVALO=0.01)
+class CoalescenciaAssincronaTest(TestCase):
+
+    async def test_geracoes_identicas_chamam_a_ia_uma_vez(self):
+        class ContadorBackend(FakeBackend):
+            chamadas = 0
+
+            async def agerar(self, prompt, **kwargs):
+                self.chamadas += 1
+                return await super().agerar(prompt, **kwargs)
+
+        backend = ContadorBackend(latencia=0.1)
+        pedidos = [await GeracaoReceita.objects.acreate(prompt=prompt) for prompt in ("arroz e feijão", "Feijão, arroz")]
+
+        await asyncio.gather(*(geracao.aprocessar(pedido, backend) for pedido in pedidos))
+
+        self.assertEqual(backend.chamadas, 1)
+        for pedido in pedidos:
+            await pedido.arefresh_from_db()
+            self.assertEqual(pedido.status, GeracaoReceita.CONCLUIDA)
@@ -0,0 +1,90 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import busca, contadores
+from core.models import Categoria, Contador, Ingrediente
+
+
+@override_settings(BUSCA_BACKEND='memoria')
+class BuscaIngredientesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        doces = Categoria.objects.create(nome="Adoçantes")
+        Ingrediente.objects.create(nome="Açúcar Mascavo", caloria=380, categoria=doces)
+        Ingrediente.objects.create(nome="Açúcar", caloria=387, categoria=doces)
+        Ingrediente.objects.create(nome="Abacate", caloria=160)
+        Ingrediente.objects.create(nome="Mel", caloria=304, categoria=doces)
+
+    def nomes(self, consulta, **kwargs):
+        return [r["nome"] for r in busca.buscar(consulta, **kwargs)]
+
+    def test_ignora_acentos_e_ordena_pelo_nome_mais_curto(self):
+        self.assertEqual(self.nomes("acucar"), ["Açúcar", "Açúcar Mascavo"])
+
+    def test_prefixo_de_palavra_e_de_categoria(self):
+        self.assertEqual(self.nomes("masc"), ["Açúcar Mascavo"])
+        self.assertIn("Mel", self.nomes("adocan"))
+
+    def test_tolera_erro_de_digitacao(self):
+        self.assertIn("Abacate", self.nomes("abacatte"))
+
+    def test_atualizacao_incremental_sem_recarregar(self):
+        indice = busca.obter_indice()
+        with self.captureOnCommitCallbacks(execute=True):
+            novo = Ingrediente.objects.create(nome="Açaí", caloria=58)
+        self.assertEqual(indice.versao, busca._versao_atual())
+        self.assertIn("Açaí", self.nomes("acai"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            novo.delete()
+        self.assertNotIn("Açaí", self.nomes("acai"))
+
+    def test_alteracoes_de_outro_processo_sao_lidas_do_log(self):
+        indice = busca.obter_indice()
+        # Sem executar os callbacks de on_commit, como se outro processo tivesse alterado
+        Ingrediente.objects.create(nome="Açaí", caloria=58)
+        Ingrediente.objects.filter(nome="Mel").delete()
+
+        with mock.patch.object(indice, "carregar", side_effect=AssertionError("recarregou tudo")):
+            self.assertIn("Açaí", self.nomes("acai"))
+            self.assertNotIn("Mel", self.nomes("mel"))
+
+        busca.notificar_alteracao(recarregar=True)
+        self.assertIn("Açaí", self.nomes("acai"))
+        self.assertEqual(indice.versao, busca._versao_atual())
+
+    def test_busca_aguarda_alteracao_em_andamento(self):
+        indice = busca.obter_indice()
+        # A alteração abaixo é só do índice em memória: o próximo teste recarrega
+        self.addCleanup(setattr, indice, "versao", None)
+        resultado = []
+        leitora = threading.Thread(target=lambda: resultado.append(indice.buscar("acucar")))
+        with indice.lock:
+            # Como um hook de on_commit no meio de uma renomeação
+            indice.remover(Ingrediente.objects.get(nome="Açúcar").pk)
+            leitora.start()
+            leitora.join(0.2)
+            self.assertTrue(leitora.is_alive())
+            indice.adicionar(Ingrediente.objects.get(nome="Açúcar").pk, "Açúcar Cristal", "Adoçantes")
+        leitora.join()
+        self.assertEqual([r["nome"] for r in resultado[0]], ["Açúcar Cristal", "Açúcar Mascavo"])
+
+    def test_log_de_versoes_e_podado(self):
+        for _ in range(contadores.VERSOES_NO_LOG + 100):
+            versao, marca = contadores.registrar_versao(Contador.VERSAO_INGREDIENTES, [1])
+        anterior = contadores.marca(Contador.VERSAO_INGREDIENTES, versao - 2)
+        self.assertEqual(
+            contadores.alteracoes(Contador.VERSAO_INGREDIENTES, versao - 2, anterior, versao), ({1}, marca)
+        )
+        self.assertIsNone(contadores.marca(Contador.VERSAO_INGREDIENTES, 1))
+        self.assertEqual(contadores.alteracoes(Contador.VERSAO_INGREDIENTES, 1, anterior, versao), (None, marca))
+
+    def test_endpoint_json(self):
+        response = self.client.get(reverse("busca_ingredientes"), {"q": "AÇU", "limite": 1})
+        self.assertEqual(response.json()["resultados"], [
+            {"id": Ingrediente.objects.get(nome="Açúcar").pk, "nome": "Açúcar", "categoria": "Adoçantes"},
+        ])
@@ -0,0 +1,97 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import busca_semantica
+from core.models import Ingrediente, IngredienteReceita, Receita
+
+
+class BuscaSemanticaTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.frango = Receita.objects.create(
+            titulo="Frango assado com limão",
+            instrucoes="Tempere o frango com limão e alho e asse no forno por uma hora.", tempo_preparo=70,
+        )
+        cls.bolo = Receita.objects.create(
+            titulo="Bolo de cenoura", instrucoes="Bata a cenoura com ovos e óleo e asse a massa.", tempo_preparo=50,
+        )
+        cls.salada = Receita.objects.create(
+            titulo="Salada verde", instrucoes="Lave as folhas e tempere com azeite.", tempo_preparo=10,
+        )
+        chocolate = Ingrediente.objects.create(nome="Chocolate meio amargo", caloria=540)
+        IngredienteReceita.objects.create(receita=cls.bolo, ingrediente=chocolate, quantidade=1)
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(BUSCA_RECEITAS_DIR=diretorio.name, BUSCA_RECEITAS_DIMENSOES=256)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _ids(self, consulta, **params):
+        response = self.client.get(reverse("busca_receitas"), {"q": consulta, **params})
+        self.assertEqual(response.status_code, 200)
+        return [resultado["id"] for resultado in response.json()["resultados"]]
+
+    def test_busca_por_titulo_instrucoes_e_ingredientes(self):
+        busca_semantica.reconstruir()
+        self.assertEqual(self._ids("frango no forno")[0], self.frango.pk)
+        self.assertEqual(self._ids("cenouras")[0], self.bolo.pk)  # radical: "cenouras" ~ "cenoura"
+        self.assertEqual(self._ids("chocolate")[0], self.bolo.pk)
+        self.assertEqual(self._ids("azeite", limite=1), [self.salada.pk])
+        self.assertEqual(self._ids("receita de"), [])
+        self.assertEqual(self._ids("")[:1], [])
+
+        resultado = self.client.get(reverse("busca_receitas"), {"q": "salada"}).json()["resultados"][0]
+        self.assertEqual(resultado["url"], reverse("detalhes_receita", kwargs={"pk": self.salada.pk}))
+        self.assertGreater(resultado["semelhanca"], 0)
+
+    def test_atualizacao_incremental(self):
+        busca_semantica.reconstruir()
+        vetores, _, _ = busca_semantica.obter_indice().mapear()
+        capacidade = len(vetores)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.salada.titulo = "Salada de grão-de-bico"
+            self.salada.save()
+            IngredienteReceita.objects.filter(receita=self.bolo).delete()
+            self.bolo.delete()
+            novas = Receita.objects.bulk_create([
+                Receita(titulo=f"Sopa de legumes {i}", instrucoes="Cozinhe os legumes.", tempo_preparo=30)
+                for i in range(100)
+            ])
+        self.assertEqual(self._ids("grão-de-bico")[0], self.salada.pk)
+        self.assertNotIn(self.bolo.pk, self._ids("cenoura"))
+        self.assertEqual(len(self._ids("sopa legumes", limite=50)), 50)
+
+        # Os arquivos cresceram no lugar, sem reconstrução
+        vetores, ids, _ = busca_semantica.obter_indice().mapear()
+        self.assertGreater(len(vetores), capacidade)
+        self.assertEqual(set(ids[ids > 0].tolist()), {self.frango.pk, self.salada.pk} | {r.pk for r in novas})
+
+    def test_sem_indice_nao_grava_nem_constroi_na_busca(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Receita.objects.create(titulo="Pudim", instrucoes="...", tempo_preparo=60)
+        self.assertEqual(self._ids("pudim"), [])
+        self.assertFalse(busca_semantica.obter_indice().existe())
+
+        saida = StringIO()
+        call_command("indexar_busca_receitas", stdout=saida)
+        self.assertIn("4 receita(s)", saida.getvalue())
+        self.assertTrue(busca_semantica.obter_indice().existe())
+
+    def test_renomear_ingrediente_revetoriza_as_receitas(self):
+        busca_semantica.reconstruir()
+        chocolate = Ingrediente.objects.get(nome="Chocolate meio amargo")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chocolate.nome = "Canela em pau"
+            chocolate.save()
+
+        self.assertEqual(self._ids("canela")[0], self.bolo.pk)
+        self.assertNotIn(self.bolo.pk, self._ids("chocolate"))
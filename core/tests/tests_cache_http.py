@@ -0,0 +1,61 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from core.models import Categoria, Ingrediente, IngredienteReceita, Receita
+
+
+class DetalheReceitaCondicionalTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Grãos")
+        cls.arroz = Ingrediente.objects.create(nome="Arroz", caloria=130, categoria=categoria)
+        cls.receita = Receita.objects.create(titulo="Arroz branco", instrucoes="...", tempo_preparo=20)
+        IngredienteReceita.objects.create(receita=cls.receita, ingrediente=cls.arroz, quantidade=2)
+        cls.url = reverse("detalhes_receita", kwargs={"pk": cls.receita.pk})
+
+    def test_cabecalhos_de_cache(self):
+        response = self.client.get(self.url)
+        receita = Receita.objects.get(pk=self.receita.pk)
+        self.assertTrue(response["ETag"].startswith(f'"receita-{receita.pk}-'))
+        self.assertEqual(response["Last-Modified"], http_date(receita.atualizado_em.timestamp()))
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage=600", response["Cache-Control"])
+
+    def test_304_sem_ler_os_itens(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        modificado = self.client.get(self.url)["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=modificado).status_code, 304)
+
+    def test_etag_muda_com_a_receita_e_seus_ingredientes(self):
+        etags = [self.client.get(self.url)["ETag"]]
+
+        receita = Receita.objects.get(pk=self.receita.pk)
+        receita.titulo = "Arroz soltinho"
+        receita.save()
+        etags.append(self.client.get(self.url)["ETag"])
+
+        feijao = Ingrediente.objects.create(nome="Feijão", caloria=80)
+        IngredienteReceita.objects.create(receita=self.receita, ingrediente=feijao, quantidade=1)
+        etags.append(self.client.get(self.url)["ETag"])
+
+        self.arroz.nome = "Arroz agulhinha"
+        self.arroz.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Arroz agulhinha")
+        etags.append(response["ETag"])
+
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_datas_da_receita(self):
+        receita = Receita.objects.get(pk=self.receita.pk)
+        self.assertIsNotNone(receita.criado_em)
+        self.assertGreaterEqual(receita.atualizado_em, receita.criado_em)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import cache_ia, ia
+from core.models import CacheGeracao
+
+
+class ContadorBackend(ia.FakeBackend):
+    def __init__(self):
+        super().__init__()
+        self.chamadas = 0
+
+    def gerar(self, prompt, **kwargs):
+        self.chamadas += 1
+        return super().gerar(prompt, **kwargs)
+
+
+class CacheGeracaoTest(TestCase):
+
+    def test_normalizacao_ignora_ordem_caixa_e_acentos(self):
+        self.assertEqual(
+            cache_ia.normalizar_prompt("Frango, Arroz, Brócolis"),
+            cache_ia.normalizar_prompt("brocolis, frango e arroz."),
+        )
+
+    def test_prompts_equivalentes_chamam_a_ia_uma_vez(self):
+        backend = ContadorBackend()
+
+        primeira = ia.gerar_receita("frango, arroz, brócolis", backend=backend)
+        segunda = ia.gerar_receita("BROCOLIS, arroz, frango", backend=backend)
+
+        self.assertEqual(backend.chamadas, 1)
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(CacheGeracao.objects.get().hits, 1)
+
+    def test_pedido_identico_aguarda_geracao_em_andamento(self):
+        agora = timezone.now()
+        normalizado = cache_ia.normalizar_prompt("ovos")
+        entrada = CacheGeracao.objects.create(
+            chave=cache_ia.calcular_chave(normalizado, ia.SYSTEM_INSTRUCTION, ia.MODELO),
+            prompt_normalizado=normalizado, modelo=ia.MODELO,
+            reservado_em=agora, ultimo_acesso=agora,
+        )
+
+        def outro_processo_termina(_):
+            CacheGeracao.objects.filter(pk=entrada.pk).update(resposta='{"titulo": "Omelete"}', gerado_em=timezone.now())
+
+        backend = ContadorBackend()
+        with mock.patch.object(cache_ia.time, 'sleep', side_effect=outro_processo_termina):
+            dados = ia.gerar_receita("Ovos", backend=backend)
+
+        self.assertEqual(backend.chamadas, 0)
+        self.assertEqual(dados['titulo'], "Omelete")
+
+    @override_settings(IA_CACHE_MAX_ENTRADAS=2)
+    def test_lru_remove_a_entrada_menos_usada(self):
+        backend = ContadorBackend()
+        ia.gerar_receita("arroz", backend=backend)
+        ia.gerar_receita("feijão", backend=backend)
+        ia.gerar_receita("arroz", backend=backend)  # renova o acesso de "arroz"
+        ia.gerar_receita("batata", backend=backend)
+
+        self.assertEqual(
+            set(CacheGeracao.objects.values_list('prompt_normalizado', flat=True)),
+            {"arroz", "batata"},
+        )
+
+    def test_resposta_vencida_gera_novamente(self):
+        backend = ContadorBackend()
+        ia.gerar_receita("arroz", backend=backend)
+        CacheGeracao.objects.update(gerado_em=timezone.now() - timedelta(days=30))
+
+        ia.gerar_receita("arroz", backend=backend)
+
+        self.assertEqual(backend.chamadas, 2)
+        self.assertEqual(CacheGeracao.objects.count(), 1)
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Ingrediente, IngredienteReceita, Receita
+
+
+class CaloriasTest(TestCase):
+
+    def setUp(self):
+        self.arroz = Ingrediente.objects.create(nome="Arroz", caloria=130)
+        self.ovo = Ingrediente.objects.create(nome="Ovo", caloria=70)
+        self.receita = Receita.objects.create(titulo="Arroz com ovo", instrucoes="...", tempo_preparo=20)
+
+    def total(self, receita=None):
+        receita = receita or self.receita
+        receita.refresh_from_db(fields=["total_caloria"])
+        return receita.total_caloria
+
+    def test_total_acompanha_inclusao_e_remocao_de_itens(self):
+        IngredienteReceita.objects.create(
+            receita=self.receita, ingrediente=self.arroz, quantidade=Decimal("250"), unidade=IngredienteReceita.GRAMA
+        )
+        item = IngredienteReceita.objects.create(receita=self.receita, ingrediente=self.ovo, quantidade=2)
+        self.assertEqual(self.total(), 325 + 140)
+
+        item.delete()
+        self.assertEqual(self.total(), 325)
+
+    def test_mudanca_de_caloria_do_ingrediente_propaga_para_as_receitas(self):
+        IngredienteReceita.objects.create(receita=self.receita, ingrediente=self.ovo, quantidade=3)
+        self.ovo.caloria = 80
+        self.ovo.save()
+        self.assertEqual(self.total(), 240)
+
+    def test_bulk_create_de_itens(self):
+        outra = Receita.objects.create(titulo="Omelete", instrucoes="...", tempo_preparo=10)
+        IngredienteReceita.objects.bulk_create([
+            IngredienteReceita(receita=self.receita, ingrediente=self.arroz, quantidade=1),
+            IngredienteReceita(receita=outra, ingrediente=self.ovo, quantidade=2),
+        ])
+        self.assertEqual((self.total(), self.total(outra)), (130, 140))
+
+    def test_comando_recalcula_totais_desviados(self):
+        IngredienteReceita.objects.create(receita=self.receita, ingrediente=self.arroz, quantidade=2)
+        Receita.objects.update(total_caloria=0)
+
+        saida = StringIO()
+        call_command("recalcular_calorias", "--lote", "1", stdout=saida)
+        self.assertEqual(self.total(), 260)
+
+    def test_lista_filtra_por_faixa_de_calorias(self):
+        IngredienteReceita.objects.create(receita=self.receita, ingrediente=self.arroz, quantidade=2)
+        Receita.objects.create(titulo="Água", instrucoes="...", tempo_preparo=1)
+
+        response = self.client.get(reverse("lista_receitas"), {"min_caloria": "100", "max_caloria": "300"})
+        self.assertEqual([r.titulo for r in response.context["receitas"]], ["Arroz com ovo"])
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Ingrediente
+
+
+class CatalogoIngredientesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingrediente.objects.create(nome="Feijão", caloria=76)
+        Ingrediente.objects.create(nome="Arroz", caloria=130)
+
+    def test_catalogo_com_etag_e_304(self):
+        url = reverse("catalogo_ingredientes")
+        response = self.client.get(url)
+        self.assertEqual(response.json()["ingredientes"], ["Arroz", "Feijão"])
+
+        with self.assertNumQueries(1):
+            revalidacao = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidacao.status_code, 304)
+
+        Ingrediente.objects.create(nome="Milho", caloria=86)
+        alterado = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(alterado.status_code, 200)
+        self.assertIn("Milho", alterado.json()["ingredientes"])
+
+    def test_url_versionada_pode_ficar_em_cache(self):
+        versao = self.client.get(reverse("catalogo_ingredientes")).json()["versao"]
+        response = self.client.get(reverse("catalogo_ingredientes"), {"v": versao})
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_formulario_nao_embute_os_ingredientes(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("receita_geracao_ia"))
+        self.assertContains(response, "<title>Gerar Receita com IA</title>", html=False)
+        self.assertContains(response, f'?v={response.context["versao_catalogo"]}')
+        self.assertNotContains(response, "Feijão")
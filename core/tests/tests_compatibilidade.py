@@ -0,0 +1,95 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core import compatibilidade
+from core.models import Dieta, Ingrediente, IngredienteDieta, IngredienteReceita, Perfil, Receita, Usuario
+
+
+class ReceitasCompativeisTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leite = Ingrediente.objects.create(nome="Leite", caloria=61)
+        cls.ovo = Ingrediente.objects.create(nome="Ovo", caloria=70)
+        cls.arroz = Ingrediente.objects.create(nome="Arroz", caloria=130)
+        cls.usuario = Usuario.objects.create_user(
+            username="ana", password="123", perfil=Perfil.objects.create(tipo="Comum")
+        )
+        cls.dieta = Dieta.objects.create(usuario=cls.usuario, min_refeicao=3, max_refeicao=5, total_caloria=2000)
+        IngredienteDieta.objects.create(dieta=cls.dieta, ingrediente=cls.leite)
+
+    def receita(self, titulo, *ingredientes):
+        receita = Receita.objects.create(titulo=titulo, instrucoes="...", tempo_preparo=10)
+        IngredienteReceita.objects.bulk_create(
+            [IngredienteReceita(receita=receita, ingrediente=i) for i in ingredientes]
+        )
+        return receita
+
+    def titulos(self, **params):
+        response = self.client.get(reverse("receitas_compativeis", kwargs={"pk": self.usuario.pk}), params)
+        return [r["titulo"] for r in response.json()["receitas"]], response.json()
+
+    def test_exclui_receitas_com_ingredientes_restritos(self):
+        self.receita("Pudim", self.leite, self.ovo)
+        self.receita("Arroz", self.arroz)
+        self.receita("Omelete", self.ovo)
+
+        titulos, dados = self.titulos()
+        self.assertEqual(titulos, ["Omelete", "Arroz"])
+        self.assertEqual((dados["dieta"], dados["total"]), (self.dieta.pk, 2))
+
+    def test_paginacao_por_antes_de(self):
+        for i in range(5):
+            self.receita(f"R{i}", self.arroz)
+
+        titulos, dados = self.titulos(limite=3)
+        self.assertEqual(titulos, ["R4", "R3", "R2"])
+        titulos, dados = self.titulos(limite=3, antes_de=dados["proximo"])
+        self.assertEqual((titulos, dados["proximo"]), (["R1", "R0"], None))
+
+    def test_indice_aplica_alteracoes_incrementalmente(self):
+        arroz = self.receita("Arroz", self.arroz)
+        indice = compatibilidade.obter_indice()
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredienteReceita.objects.create(receita=arroz, ingrediente=self.leite)
+            pudim = self.receita("Pudim", self.ovo)
+
+        # Aplicado no índice do processo, sem recarregar
+        with self.assertNumQueries(1):
+            self.assertIs(compatibilidade.obter_indice(), indice)
+        self.assertEqual(indice.compativeis([self.leite.pk]), [pudim.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredienteReceita.objects.filter(receita=arroz).delete()
+        self.assertEqual(indice.compativeis([self.leite.pk]), [pudim.pk, arroz.pk])
+
+    def test_indice_alcanca_outro_processo_pelo_log(self):
+        arroz = self.receita("Arroz", self.arroz)
+        indice = compatibilidade.obter_indice()
+        # Sem os callbacks de on_commit: o índice deste processo fica versões atrás
+        IngredienteReceita.objects.create(receita=arroz, ingrediente=self.leite)
+        pudim = self.receita("Pudim", self.ovo)
+
+        with mock.patch.object(indice, "carregar", side_effect=AssertionError("recarregou tudo")):
+            self.assertIs(compatibilidade.obter_indice(), indice)
+        self.assertEqual(indice.compativeis([self.leite.pk]), [pudim.pk])
+
+    def test_consulta_aguarda_alteracao_em_andamento(self):
+        arroz = self.receita("Arroz", self.arroz)
+        indice = compatibilidade.obter_indice()
+        # A alteração abaixo é só do índice em memória: o próximo teste recarrega
+        self.addCleanup(setattr, indice, "versao", None)
+        resultado = []
+        leitora = threading.Thread(target=lambda: resultado.append(indice.compativeis([self.leite.pk])))
+        with indice.lock:
+            # Como um hook de on_commit no meio da releitura da receita
+            indice.remover(arroz.pk)
+            leitora.start()
+            leitora.join(0.2)
+            self.assertTrue(leitora.is_alive())
+            indice.atualizar(arroz.pk, [self.arroz.pk, self.leite.pk])
+        leitora.join()
+        self.assertEqual(resultado, [[]])
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from core import compras
+from core.models import (
+    Ingrediente, IngredienteListaCompra, IngredienteReceita, Perfil, Receita, ReceitaRefeicao, Refeicao, Usuario,
+)
+
+SEGUNDA = date(2026, 10, 19)
+
+
+class ListaDeComprasTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(
+            username="ana", password="123", perfil=Perfil.objects.create(tipo="Comum")
+        )
+        cls.arroz = Ingrediente.objects.create(nome="Arroz", caloria=130)
+        cls.ovo = Ingrediente.objects.create(nome="Ovo", caloria=70)
+        cls.arroz_com_ovo = cls.receita("Arroz com ovo", (cls.arroz, 200, IngredienteReceita.GRAMA), (cls.ovo, 2, "porcao"))
+        cls.omelete = cls.receita("Omelete", (cls.ovo, 3, IngredienteReceita.PORCAO))
+
+    @staticmethod
+    def receita(titulo, *itens):
+        receita = Receita.objects.create(titulo=titulo, instrucoes="...", tempo_preparo=10)
+        for ingrediente, quantidade, unidade in itens:
+            IngredienteReceita.objects.create(
+                receita=receita, ingrediente=ingrediente, quantidade=quantidade, unidade=unidade
+            )
+        return receita
+
+    def refeicao(self, data, *receitas):
+        refeicao = Refeicao.objects.create(date=data, tipo_refeicao=Refeicao.ALMOCO, usuario=self.usuario)
+        ReceitaRefeicao.objects.bulk_create([ReceitaRefeicao(receita=r, refeicao=refeicao) for r in receitas])
+        return refeicao
+
+    def itens(self, lista):
+        return {
+            item.ingrediente.nome: (item.ocorrencias, item.quantidade)
+            for item in IngredienteListaCompra.objects.filter(lista_de_compra=lista).select_related("ingrediente")
+        }
+
+    def test_gera_lista_deduplicada_em_poucas_consultas(self):
+        self.refeicao(SEGUNDA, self.arroz_com_ovo)
+        self.refeicao(SEGUNDA + timedelta(days=1), self.arroz_com_ovo, self.omelete)
+        self.refeicao(SEGUNDA + timedelta(days=9), self.omelete)  # fora do período
+
+        with self.assertNumQueries(5):  # savepoint, lista, agregação, bulk_create, release
+            lista = compras.gerar_lista(self.usuario, SEGUNDA, SEGUNDA + timedelta(days=6))
+        self.assertEqual(self.itens(lista), {"Arroz": (2, 400), "Ovo": (3, 700)})
+
+    def test_lista_acompanha_refeicoes_incluidas_e_removidas(self):
+        lista = compras.gerar_lista(self.usuario, SEGUNDA, SEGUNDA + timedelta(days=6))
+        refeicao = self.refeicao(SEGUNDA + timedelta(days=2), self.arroz_com_ovo)
+        ReceitaRefeicao.objects.create(receita=self.omelete, refeicao=refeicao)
+        self.assertEqual(self.itens(lista), {"Arroz": (1, 200), "Ovo": (2, 500)})
+
+        ReceitaRefeicao.objects.filter(receita=self.arroz_com_ovo).delete()
+        self.assertEqual(self.itens(lista), {"Ovo": (1, 300)})
+
+        refeicao.date = SEGUNDA + timedelta(days=10)
+        refeicao.save()
+        self.assertEqual(self.itens(lista), {})
+
+        refeicao.date = SEGUNDA
+        refeicao.save()
+        self.assertEqual(self.itens(lista), {"Ovo": (1, 300)})
+
+        refeicao.delete()
+        self.assertEqual(self.itens(lista), {})
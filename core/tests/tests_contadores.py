@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core import contadores
+from core.models import Contador, Ingrediente, Receita
+
+
+class ContadoresTest(TestCase):
+
+    def totais(self):
+        return contadores.valores(Contador.INGREDIENTES, Contador.RECEITAS, Contador.RECEITAS_IA)
+
+    def test_criacao_e_remocao_atualizam_os_contadores(self):
+        arroz = Ingrediente.objects.create(nome="Arroz", caloria=130)
+        Ingrediente.objects.create(nome="Feijão", caloria=76)
+        Receita.objects.create(titulo="Baião", instrucoes="...", tempo_preparo=40, is_ai_generated=True)
+        arroz.delete()
+
+        self.assertEqual(self.totais(), {"ingredientes": 1, "receitas": 1, "receitas_ia": 1})
+
+    def test_bulk_create_e_delete_em_massa(self):
+        Receita.objects.bulk_create([
+            Receita(titulo=f"R{i}", instrucoes="...", tempo_preparo=10, is_ai_generated=i % 2 == 0)
+            for i in range(10)
+        ])
+        Receita.objects.filter(titulo__in=["R0", "R1"]).delete()
+
+        self.assertEqual(self.totais(), {"ingredientes": 0, "receitas": 8, "receitas_ia": 4})
+
+    def test_alternar_receita_de_ia_ajusta_o_contador(self):
+        receita = Receita.objects.create(titulo="Baião", instrucoes="...", tempo_preparo=40)
+        receita.is_ai_generated = True
+        receita.save()
+        self.assertEqual(self.totais()[Contador.RECEITAS_IA], 1)
+
+        receita = Receita.objects.get(pk=receita.pk)
+        receita.is_ai_generated = False
+        receita.save()
+        receita.save()
+        self.assertEqual(self.totais(), {"ingredientes": 0, "receitas": 1, "receitas_ia": 0})
+
+    def test_landing_page_le_os_contadores_em_uma_consulta(self):
+        Ingrediente.objects.create(nome="Arroz", caloria=130)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("landing"))
+        self.assertEqual(response.context["total_ingredientes"], 1)
+
+    def test_comando_reconstroi_contadores_desviados(self):
+        Ingrediente.objects.create(nome="Arroz", caloria=130)
+        contadores.definir(Contador.INGREDIENTES, 99)
+
+        call_command("recalcular_contadores", stdout=StringIO())
+
+        self.assertEqual(self.totais()[Contador.INGREDIENTES], 1)
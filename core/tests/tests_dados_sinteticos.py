@@ -0,0 +1,95 @@
+# core/tests/tests_dados_sinteticos.py
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from core import benchmark, busca, contadores
+from core.dados_sinteticos import GeradorDados
+from core.models import (
+    AgendaAlimentar, Contador, Ingrediente, IngredienteDieta, IngredienteReceita, Receita, ReceitaRefeicao, Refeicao,
+    RefeicaoAgenda, RefeicaoDieta, Usuario,
+)
+
+QUANTIDADES = {'ingredientes': 30, 'receitas': 40, 'usuarios': 4, 'refeicoes': 60}
+
+
+def _assinatura():
+    # Conteúdo da base sem os ids, que dependem da sequência do banco
+    return (
+        list(Ingrediente.objects.order_by('id').values_list('nome', 'caloria', 'categoria__nome')),
+        list(Receita.objects.order_by('id').values_list('titulo', 'tempo_preparo', 'total_caloria')),
+        list(Refeicao.objects.order_by('id').values_list('usuario__username', 'date', 'tipo_refeicao')),
+        list(AgendaAlimentar.objects.order_by('id').values_list('usuario__username', 'token')),
+    )
+
+
+class GeradorDadosTest(TestCase):
+    def test_gera_volumes_juncoes_e_dados_derivados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            totais = GeradorDados(seed=1, lote=25).gerar(**QUANTIDADES)
+
+        self.assertEqual(totais['ingrediente'], 30)
+        self.assertEqual(Receita.objects.count(), 40)
+        self.assertEqual(Usuario.objects.count(), 4)
+        self.assertEqual(Refeicao.objects.count(), 60)
+        self.assertEqual(RefeicaoDieta.objects.count(), 60)
+        self.assertEqual(RefeicaoAgenda.objects.count(), 60)
+        por_receita = IngredienteReceita.objects.values('receita').annotate(n=Count('id'))
+        self.assertTrue(all(3 <= linha['n'] <= 10 for linha in por_receita))
+        self.assertTrue(ReceitaRefeicao.objects.count() >= 60)
+        # Três refeições por dia, por usuário
+        self.assertEqual(Refeicao.objects.values('usuario', 'date').annotate(n=Count('id')).filter(n__gt=3).count(), 0)
+
+        self.assertFalse(Receita.objects.filter(total_caloria=0).exists())
+        self.assertEqual(contadores.valores(Contador.RECEITAS)[Contador.RECEITAS], 40)
+        self.assertEqual(len(busca.obter_indice().itens), 30)
+
+    def test_mesma_semente_gera_a_mesma_base(self):
+        GeradorDados(seed=7).gerar(**QUANTIDADES)
+        primeira = _assinatura()
+        for model in (
+            ReceitaRefeicao, RefeicaoDieta, RefeicaoAgenda, Refeicao, IngredienteDieta, IngredienteReceita, Receita,
+            Usuario, Ingrediente,
+        ):
+            model.objects.all().delete()
+
+        GeradorDados(seed=7).gerar(**QUANTIDADES)
+        self.assertEqual(_assinatura(), primeira)
+
+
+class ComandosBenchmarkTest(TestCase):
+    def test_base_sem_ingredientes_e_erro_do_benchmark(self):
+        GeradorDados(seed=1).gerar(**QUANTIDADES)
+        IngredienteReceita.objects.all().delete()
+        IngredienteDieta.objects.all().delete()
+        Ingrediente.objects.all().delete()
+        with self.assertRaisesMessage(benchmark.ErroBenchmark, "ingredientes"):
+            benchmark.casos()
+
+    def test_gera_base_e_relatorio_comparavel(self):
+        call_command("gerar_dados_sinteticos", "--escala", "teste", "--refeicoes", "90", stdout=StringIO())
+        self.assertEqual(Refeicao.objects.count(), 90)
+        with self.assertRaises(CommandError):
+            call_command("gerar_dados_sinteticos", stdout=StringIO())
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "base.json")
+            call_command("benchmark_orm", "--repeticoes", "2", "--saida", caminho, stdout=StringIO())
+            with open(caminho, encoding="utf-8") as arquivo:
+                relatorio = json.load(arquivo)
+            self.assertEqual(relatorio["volumes"]["refeicao"], 90)
+            self.assertIn("view:lista_receitas", relatorio["casos"])
+            self.assertGreater(relatorio["casos"]["view:agenda_ics"]["consultas"], 0)
+
+            saida = StringIO()
+            call_command(
+                "benchmark_orm", "--repeticoes", "1", "--caso", "view:landing", "--comparar", caminho, stdout=saida
+            )
+            self.assertIn("Comparação com", saida.getvalue())
+            self.assertIn("view:landing", saida.getvalue())
@@ -0,0 +1,100 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import duplicatas, geracao
+from core.models import (
+    BandaReceita, GeracaoReceita, Ingrediente, IngredienteReceita, Perfil, Receita, ReceitaRefeicao, Refeicao,
+    Usuario,
+)
+
+INSTRUCOES = "Tempere o frango com sal e limão, grelhe por dez minutos de cada lado e sirva com os legumes no vapor."
+
+
+@override_settings(IA_BACKEND='core.ia.FakeBackend')
+class DuplicatasTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.frango = Receita.objects.create(
+            titulo="Frango grelhado com legumes", instrucoes=INSTRUCOES, tempo_preparo=30,
+            prompt_geracao="frango grelhado com legumes", is_ai_generated=True,
+        )
+        cls.bolo = Receita.objects.create(
+            titulo="Bolo de cenoura", instrucoes="Bata tudo no liquidificador e asse por 40 minutos.",
+            tempo_preparo=60,
+        )
+
+    def test_assinaturas_mantidas_pelos_signals(self):
+        self.assertEqual(BandaReceita.objects.filter(receita=self.frango).count(), 2 * duplicatas.BANDAS)
+        self.assertEqual(duplicatas.semelhantes_ao_prompt("bolo de cenoura")[0][1], self.bolo)
+
+        self.bolo.titulo = "Torta de maçã"
+        self.bolo.save()
+        self.assertEqual(duplicatas.semelhantes_ao_prompt("bolo de cenoura"), [])
+        self.assertEqual(duplicatas.semelhantes_ao_prompt("torta de maçã")[0][1], self.bolo)
+
+        self.bolo.delete()
+        self.assertFalse(BandaReceita.objects.filter(receita_id=self.bolo.pk).exists())
+
+    def test_prompt_parecido(self):
+        semelhanca, receita = duplicatas.semelhantes_ao_prompt("Quero legumes e frango grelhado")[0]
+        self.assertEqual(receita, self.frango)
+        self.assertEqual(semelhanca, 1.0)
+        self.assertEqual(duplicatas.semelhantes_ao_prompt("frango assado com batatas"), [])
+        self.assertEqual(duplicatas.semelhantes_ao_prompt(""), [])
+
+    def test_view_oferece_receita_existente(self):
+        url = reverse("receita_geracao_ia")
+        response = self.client.post(url, {"prompt_geracao": "legumes com frango grelhado"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Frango grelhado com legumes")
+        self.assertContains(response, reverse("detalhes_receita", kwargs={"pk": self.frango.pk}))
+        self.assertFalse(GeracaoReceita.objects.exists())
+
+        response = self.client.post(url, {"prompt_geracao": "legumes com frango grelhado", "gerar_mesmo_assim": "1"})
+        self.assertRedirects(response, reverse("status_geracao", kwargs={"pk": GeracaoReceita.objects.get().pk}))
+
+    def test_geracao_reaproveita_receita_quase_igual(self):
+        dados = {
+            "titulo": "Frango grelhado com legumes!", "instrucoes": INSTRUCOES + " Bom apetite.", "tempo_preparo": 25,
+        }
+        self.assertEqual(geracao.salvar_receita("frango", dados), self.frango)
+
+        dados["titulo"] = "Frango ao curry"
+        dados["instrucoes"] = "Doure o frango, junte o curry e o leite de coco e cozinhe por 15 minutos."
+        self.assertNotEqual(geracao.salvar_receita("frango", dados), self.frango)
+        self.assertEqual(Receita.objects.count(), 3)
+
+    def test_ingredientes_entram_na_assinatura(self):
+        copia = Receita.objects.create(titulo=self.frango.titulo, instrucoes=INSTRUCOES, tempo_preparo=30)
+        self.assertEqual(duplicatas.grupos_duplicados(), [[self.frango.pk, copia.pk]])
+
+        for i in range(12):
+            ingrediente = Ingrediente.objects.create(nome=f"Ingrediente {i}", caloria=10)
+            IngredienteReceita.objects.create(receita=copia, ingrediente=ingrediente, quantidade=1)
+        self.assertEqual(duplicatas.grupos_duplicados(), [])
+
+    def test_mesclar_duplicatas(self):
+        copia = Receita.objects.create(titulo=self.frango.titulo, instrucoes=INSTRUCOES, tempo_preparo=35)
+        outra = Receita.objects.create(titulo=self.frango.titulo + ".", instrucoes=INSTRUCOES, tempo_preparo=40)
+        usuario = Usuario.objects.create(username="ana", perfil=Perfil.objects.create(tipo="Comum"))
+        refeicao = Refeicao.objects.create(date=date(2026, 10, 19), tipo_refeicao=Refeicao.ALMOCO, usuario=usuario)
+        ReceitaRefeicao.objects.create(receita=copia, refeicao=refeicao)
+        ReceitaRefeicao.objects.create(receita=outra, refeicao=refeicao)
+        pedido = GeracaoReceita.objects.create(prompt="frango", status=GeracaoReceita.CONCLUIDA, receita=outra)
+
+        saida = StringIO()
+        call_command("mesclar_receitas_duplicadas", stdout=saida)
+        self.assertIn("1 grupo(s), 2 cópia(s)", saida.getvalue())
+        self.assertEqual(Receita.objects.count(), 4)
+
+        call_command("mesclar_receitas_duplicadas", "--aplicar", stdout=StringIO())
+        self.assertEqual(set(Receita.objects.values_list("pk", flat=True)), {self.frango.pk, self.bolo.pk})
+        self.assertEqual(list(ReceitaRefeicao.objects.values_list("receita_id", "refeicao_id")),
+                         [(self.frango.pk, refeicao.pk)])
+        pedido.refresh_from_db()
+        self.assertEqual(pedido.receita, self.frango)
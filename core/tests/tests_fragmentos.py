@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import calorias
+from core.models import Categoria, Ingrediente, IngredienteReceita, Receita
+
+
+class FragmentosTest(TestCase):
+    """
+    Os testes mudam o banco com ``update()`` (sem signals) para saber se uma
+    linha veio do cache: o texto antigo continua na página até a invalidação.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nome="Grãos")
+        cls.arroz = Ingrediente.objects.create(nome="Arroz", caloria=130, categoria=cls.categoria)
+        cls.feijao = Ingrediente.objects.create(nome="Feijão", caloria=80, categoria=cls.categoria)
+        cls.receita = Receita.objects.create(titulo="Arroz branco", instrucoes="...", tempo_preparo=20)
+        cls.outra = Receita.objects.create(titulo="Feijoada", instrucoes="...", tempo_preparo=90)
+        IngredienteReceita.objects.create(receita=cls.receita, ingrediente=cls.arroz, quantidade=2)
+        IngredienteReceita.objects.create(receita=cls.outra, ingrediente=cls.feijao, quantidade=3)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lista_rerrenderiza_apenas_a_linha_alterada(self):
+        url = reverse("lista_receitas")
+        self.client.get(url)
+        Receita.objects.filter(pk=self.outra.pk).update(titulo="Feijoada (sem signal)")
+
+        receita = Receita.objects.get(pk=self.receita.pk)
+        receita.titulo = "Arroz soltinho"
+        receita.save()
+
+        response = self.client.get(url)
+        self.assertContains(response, "Arroz soltinho")
+        self.assertContains(response, "Feijoada")
+        self.assertNotContains(response, "sem signal")
+
+    def test_detalhe_acompanha_itens_e_calorias(self):
+        url = reverse("detalhes_receita", kwargs={"pk": self.receita.pk})
+        self.assertContains(self.client.get(url), "260")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.arroz.caloria = 100
+            self.arroz.save()
+        self.assertContains(self.client.get(url), "200")
+
+        IngredienteReceita.objects.create(receita=self.receita, ingrediente=self.feijao, quantidade=1)
+        self.assertContains(self.client.get(url), "Feijão")
+
+    def test_detalhe_em_cache_nao_le_os_itens(self):
+        url = reverse("detalhes_receita", kwargs={"pk": self.receita.pk})
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertContains(self.client.get(url), "Arroz")
+        self.assertFalse([q["sql"] for q in consultas if "core_ingredientereceita" in q["sql"]])
+
+    def test_categoria_invalida_todos_os_ingredientes(self):
+        url = reverse("lista_ingredientes")
+        self.client.get(url)
+        Ingrediente.objects.update(caloria=999)
+        self.assertNotContains(self.client.get(url), "999")
+
+        self.categoria.nome = "Cereais"
+        self.categoria.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Cereais", count=2)
+        self.assertContains(response, "999", count=2)
+
+    def test_recalcular_todas_invalida_as_receitas(self):
+        url = reverse("lista_receitas")
+        self.client.get(url)
+        Ingrediente.objects.filter(pk=self.arroz.pk).update(caloria=50)
+        self.assertNotContains(self.client.get(url), "🔥 100")
+
+        calorias.recalcular_todas()
+        self.assertContains(self.client.get(url), "🔥 100")
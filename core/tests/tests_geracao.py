@@ -0,0 +1,47 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import geracao
+from core.models import GeracaoReceita, Receita
+
+
+class FalhaBackend:
+    def gerar(self, prompt, **kwargs):
+        raise RuntimeError("upstream fora do ar")
+
+
+@override_settings(IA_BACKEND='core.ia.FakeBackend')
+class GeracaoReceitaTest(TestCase):
+
+    def test_post_enfileira_sem_chamar_ia(self):
+        response = self.client.post(reverse("receita_geracao_ia"), {"prompt_geracao": "frango e arroz"})
+
+        geracao_criada = GeracaoReceita.objects.get()
+        self.assertRedirects(response, reverse("status_geracao", kwargs={"pk": geracao_criada.pk}))
+        self.assertEqual(geracao_criada.status, GeracaoReceita.PENDENTE)
+        self.assertFalse(Receita.objects.exists())
+
+    def test_worker_processa_e_status_aponta_para_receita(self):
+        pedido = geracao.enfileirar("frango e arroz")
+
+        self.assertEqual(geracao.processar_pendentes(), 1)
+
+        pedido.refresh_from_db()
+        self.assertEqual(pedido.status, GeracaoReceita.CONCLUIDA)
+        self.assertTrue(pedido.receita.is_ai_generated)
+        self.assertEqual(pedido.receita.prompt_geracao, "frango e arroz")
+
+        url_receita = reverse("detalhes_receita", kwargs={"pk": pedido.receita_id})
+        status = self.client.get(reverse("status_geracao_json", kwargs={"pk": pedido.pk})).json()
+        self.assertEqual(status["url"], url_receita)
+        self.assertRedirects(self.client.get(reverse("status_geracao", kwargs={"pk": pedido.pk})), url_receita)
+
+    def test_falha_da_ia_marca_erro(self):
+        pedido = geracao.enfileirar("qualquer coisa")
+
+        geracao.processar_pendentes(backend=FalhaBackend())
+
+        pedido.refresh_from_db()
+        self.assertEqual(pedido.status, GeracaoReceita.ERRO)
+        self.assertIn("upstream fora do ar", pedido.erro)
+        self.assertEqual(self.client.get(reverse("status_geracao", kwargs={"pk": pedido.pk})).status_code, 200)
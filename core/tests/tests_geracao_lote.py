@@ -0,0 +1,134 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from core.geracao_lote import GeradorEmLote, LimiteTaxa, Progresso, ler_prompts
+from core.ia import FakeBackend
+from core.models import Contador, Receita
+from core.provedor_ia import Circuito, ErroTransitorio, Provedor
+
+
+class InterrompeBackend(FakeBackend):
+    """ Falha de vez (erro não transitório) a partir da n-ésima chamada. """
+
+    def __init__(self, limite):
+        super().__init__(latencia=0.01)
+        self.limite = limite
+        self.chamadas = 0
+
+    async def agerar(self, prompt, **kwargs):
+        self.chamadas += 1
+        if self.chamadas > self.limite:
+            raise RuntimeError("processo interrompido")
+        return await super().agerar(prompt, **kwargs)
+
+
+class FalhaDuasVezesBackend(FakeBackend):
+    def __init__(self):
+        super().__init__(latencia=0)
+        self.falhas = {}
+
+    async def agerar(self, prompt, **kwargs):
+        self.falhas[prompt] = self.falhas.get(prompt, 0) + 1
+        if self.falhas[prompt] <= 2:
+            raise ErroTransitorio("429")
+        return await super().agerar(prompt, **kwargs)
+
+
+
+class TempoInvalidoBackend(FakeBackend):
+    """ Responde com um ``tempo_preparo`` que não é um número para um dos prompts. """
+
+    def _resposta(self, prompt):
+        resposta = super()._resposta(prompt)
+        if prompt == "prato número 3 com legumes":
+            resposta = resposta.replace('"tempo_preparo": 20', '"tempo_preparo": "rápido"')
+        return resposta
+
+@override_settings(IA_CACHE_ATIVO=False)
+class GeracaoEmLoteTest(TestCase):
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = Path(diretorio.name)
+        self.arquivo = self.diretorio / "prompts.jsonl"
+        linhas = [json.dumps({"prompt": f"prato número {i} com legumes"}) for i in range(30)]
+        linhas[5] = "não é json"
+        linhas.insert(10, "")
+        self.arquivo.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+
+    def _gerador(self, backend, **kwargs):
+        provedor = Provedor(backend, backoff_base=0, tentativas=3, circuito=Circuito(limiar=100, pausa=0))
+        return GeradorEmLote(Progresso(self.diretorio / "progresso.jsonl"), provedor=provedor, **kwargs)
+
+    async def _executar(self, gerador):
+        with self.arquivo.open(encoding="utf-8") as arquivo:
+            return await gerador.executar(ler_prompts(arquivo))
+
+    async def test_gera_em_lotes_e_retoma_de_onde_parou(self):
+        resultado = await self._executar(self._gerador(InterrompeBackend(12), concorrencia=4, lote=5))
+        self.assertEqual((resultado.lidas, resultado.rejeitadas), (30, 1))
+        self.assertEqual(resultado.geradas, 12)
+        self.assertEqual(resultado.falhas, 17)
+        self.assertEqual(await Receita.objects.filter(is_ai_generated=True).acount(), 12)
+
+        resultado = await self._executar(self._gerador(FakeBackend(latencia=0), concorrencia=4, lote=5))
+        self.assertEqual((resultado.puladas, resultado.geradas, resultado.falhas), (12, 17, 0))
+        self.assertEqual(await Receita.objects.acount(), 29)
+        prompts = [r async for r in Receita.objects.values_list("prompt_geracao", flat=True)]
+        self.assertEqual(len(set(prompts)), 29)
+        contador = await Contador.objects.aget(nome=Contador.RECEITAS_IA)
+        self.assertEqual(contador.valor, 29)
+
+    async def test_prompt_ja_gerado_reaproveita_a_receita(self):
+        existente = await Receita.objects.acreate(
+            titulo="Prato", instrucoes="...", tempo_preparo=10,
+            prompt_geracao="prato número 0 com legumes", is_ai_generated=True,
+        )
+        resultado = await self._executar(self._gerador(FakeBackend(latencia=0), lote=100))
+        self.assertEqual((resultado.geradas, resultado.reaproveitadas), (28, 1))
+        registros = [json.loads(linha) for linha in (self.diretorio / "progresso.jsonl").read_text().splitlines()]
+        self.assertIn({"linha": 1, "receita": existente.pk}, registros)
+
+    async def test_resposta_invalida_falha_so_a_sua_linha(self):
+        resultado = await self._executar(self._gerador(TempoInvalidoBackend(latencia=0), lote=100))
+        self.assertEqual((resultado.geradas, resultado.falhas), (28, 1))
+        registros = [json.loads(linha) for linha in (self.diretorio / "progresso.jsonl").read_text().splitlines()]
+        falha, = [registro for registro in registros if "erro" in registro]
+        self.assertEqual(falha["linha"], 4)
+        self.assertIn("RespostaInvalida", falha["erro"])
+
+    async def test_repete_falhas_transitorias(self):
+        backend = FalhaDuasVezesBackend()
+        resultado = await self._executar(self._gerador(backend, concorrencia=8))
+        self.assertEqual((resultado.geradas, resultado.falhas), (29, 0))
+        self.assertEqual(set(backend.falhas.values()), {3})
+
+    async def test_limite_de_taxa(self):
+        agora = [0.0]
+        limite = LimiteTaxa(por_segundo=4, relogio=lambda: agora[0])
+        for _ in range(3):
+            await limite.aguardar()
+        self.assertAlmostEqual(limite.proximo, 0.75)
+
+    def test_comando_com_backend_local(self):
+        saida = StringIO()
+        call_command("gerar_receitas_em_lote", str(self.arquivo), "--fake", "--latencia", "0", stdout=saida)
+        self.assertIn("29 receita(s) gerada(s)", saida.getvalue())
+
+        saida = StringIO()
+        call_command("gerar_receitas_em_lote", str(self.arquivo), "--fake", "--latencia", "0", stdout=saida)
+        self.assertIn("Retomando: 29 linha(s)", saida.getvalue())
+        self.assertIn("0 receita(s) gerada(s)", saida.getvalue())
+        self.assertEqual(Receita.objects.count(), 29)
+
+    def test_comando_rejeita_parametros_invalidos(self):
+        for opcao, valor in (("--concorrencia", "0"), ("--lote", "0"), ("--por-segundo", "-1")):
+            with self.subTest(opcao=opcao, valor=valor), self.assertRaisesMessage(CommandError, opcao):
+                call_command("gerar_receitas_em_lote", str(self.arquivo), "--fake", opcao, valor, stdout=StringIO())
+        self.assertEqual(Receita.objects.count(), 0)
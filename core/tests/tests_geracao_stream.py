@@ -0,0 +1,86 @@
+import json
+import time
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import geracao
+from core.ia import FakeBackend
+from core.models import CacheGeracao, Receita
+from core.provedor_ia import Provedor
+
+
+def eventos(conteudo):
+    """ Converte o corpo SSE em uma lista de (evento, dados). """
+    resultado = []
+    for bloco in conteudo.split("\n\n"):
+        linhas = dict(linha.split(": ", 1) for linha in bloco.splitlines() if not linha.startswith(":"))
+        if linhas:
+            resultado.append((linhas["event"], json.loads(linhas["data"])))
+    return resultado
+
+
+@override_settings(IA_BACKEND='core.ia.FakeBackend')
+class GeracaoStreamTest(TestCase):
+
+    async def _gerar(self, prompt, **dados):
+        response = await self.async_client.post(
+            reverse("receita_geracao_stream"), {"prompt_geracao": prompt, **dados}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        corpo = "".join([parte.decode() async for parte in response.streaming_content])
+        return eventos(corpo)
+
+    async def test_stream_repassa_partes_e_salva_receita(self):
+        recebidos = await self._gerar("frango e arroz")
+
+        parciais = [dados for nome, dados in recebidos if nome == "parcial"]
+        self.assertGreater(len(parciais), 1)
+        nome, dados = recebidos[-1]
+        self.assertEqual(nome, "concluida")
+
+        receita = await Receita.objects.aget()
+        self.assertEqual(dados["url"], reverse("detalhes_receita", kwargs={"pk": receita.pk}))
+        self.assertEqual(json.loads("".join(parciais))["titulo"], receita.titulo)
+        self.assertTrue(receita.is_ai_generated)
+        self.assertTrue(await CacheGeracao.objects.filter(resposta__isnull=False).aexists())
+
+    async def test_prompt_em_cache_nao_chama_a_ia(self):
+        await self._gerar("frango e arroz")
+        with self.settings(IA_FAKE_TAXA_FALHA=1.0):
+            recebidos = await self._gerar("arroz, frango", gerar_mesmo_assim="1")
+
+        self.assertEqual(recebidos[-1][0], "concluida")
+        # A resposta em cache é a mesma receita: reaproveita a já gravada
+        self.assertEqual(await Receita.objects.acount(), 1)
+
+    async def test_prompt_parecido_com_receita_existente(self):
+        await self._gerar("frango e arroz")
+        response = await self.async_client.post(
+            reverse("receita_geracao_stream"), {"prompt_geracao": "arroz com frango"}
+        )
+        self.assertEqual(response.status_code, 409)
+        receita = await Receita.objects.aget()
+        self.assertEqual(response.json()["parecidas"][0]["titulo"], receita.titulo)
+
+    async def test_falha_da_ia_gera_evento_de_erro(self):
+        with self.settings(IA_FAKE_TAXA_FALHA=1.0, IA_TENTATIVAS=1):
+            recebidos = await self._gerar("frango")
+
+        self.assertEqual(recebidos[-1][0], "erro")
+        self.assertFalse(await Receita.objects.aexists())
+
+    @override_settings(IA_CACHE_ESPERA=3, IA_CACHE_INTERVALO=0.01)
+    async def test_cliente_desconectado_libera_a_reserva(self):
+        stream = geracao.gerar_em_stream("frango e arroz", Provedor(FakeBackend(latencia=0.8)))
+        await anext(stream)  # ": gerando"
+        await anext(stream)  # primeiro "parcial"
+        await stream.aclose()
+
+        inicio = time.perf_counter()
+        recebidos = eventos("".join([parte async for parte in geracao.gerar_em_stream(
+            "arroz, frango", Provedor(FakeBackend(latencia=0))
+        )]))
+        # Com a reserva abandonada, esperaria IA_CACHE_ESPERA inteiro
+        self.assertLess(time.perf_counter() - inicio, 1)
+        self.assertEqual(recebidos[-1][0], "concluida")
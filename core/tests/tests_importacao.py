@@ -0,0 +1,81 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import busca, contadores
+from core.models import Categoria, Contador, Ingrediente, IngredienteReceita, Receita
+
+CSV = """nome;caloria;categoria
+Arroz;130;Cereais
+Feijão;76;Leguminosas
+Lentilha;116;Leguminosas
+Inválido;abc;Cereais
+"""
+
+
+@override_settings(BUSCA_BACKEND='memoria')
+class ImportarIngredientesTest(TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.diretorio.cleanup)
+
+    def arquivo(self, nome, conteudo):
+        caminho = Path(self.diretorio.name) / nome
+        caminho.write_text(conteudo, encoding='utf-8')
+        return str(caminho)
+
+    def importar(self, caminho, *args):
+        saida = StringIO()
+        call_command("importar_ingredientes", caminho, "--delimitador", ";", "--lote", "2", *args, stdout=saida)
+        return saida.getvalue()
+
+    def test_importa_csv_criando_categorias_e_contando(self):
+        saida = self.importar(self.arquivo("tabela.csv", CSV))
+
+        self.assertIn("3 criados", saida)
+        self.assertIn("1 rejeitadas", saida)
+        self.assertEqual(Categoria.objects.count(), 2)
+        self.assertEqual(Ingrediente.objects.get(nome="Lentilha").categoria.nome, "Leguminosas")
+        self.assertEqual(contadores.valores(Contador.INGREDIENTES)[Contador.INGREDIENTES], 3)
+        self.assertEqual([r["nome"] for r in busca.buscar("lenti")], ["Lentilha"])
+
+    def test_reimportar_o_mesmo_arquivo_nao_escreve_nada(self):
+        caminho = self.arquivo("tabela.csv", CSV)
+        self.importar(caminho)
+
+        with CaptureQueriesContext(connection) as consultas:
+            saida = self.importar(caminho)
+        self.assertIn("3 inalterados", saida)
+        escritas = [q["sql"] for q in consultas if not q["sql"].startswith(("SELECT", "SAVEPOINT", "RELEASE"))]
+        self.assertEqual(escritas, [])
+
+    def test_jsonl_atualiza_existentes_e_recalcula_receitas(self):
+        arroz = Ingrediente.objects.create(nome="Arroz", caloria=100)
+        receita = Receita.objects.create(titulo="Arroz", instrucoes="...", tempo_preparo=20)
+        IngredienteReceita.objects.create(receita=receita, ingrediente=arroz, quantidade=2)
+        linhas = [{"nome": "Arroz", "caloria": 130, "categoria": "Cereais"}, {"nome": "Milho", "caloria": "86,5"}]
+        caminho = self.arquivo("tabela.jsonl", "\n".join(json.dumps(linha) for linha in linhas))
+
+        saida = self.importar(caminho)
+
+        self.assertIn("1 criados, 1 atualizados", saida)
+        arroz.refresh_from_db()
+        receita.refresh_from_db()
+        self.assertEqual((arroz.caloria, arroz.categoria.nome), (130, "Cereais"))
+        self.assertEqual(receita.total_caloria, 260)
+        self.assertEqual(Ingrediente.objects.get(nome="Milho").caloria, 86)
+
+    def test_jsonl_com_linhas_malformadas_rejeita_so_essas_linhas(self):
+        conteudo = '{"nome": "Arroz", "caloria": 130}\n{"nome": "Feij\n[1, 2]\n"Milho"\n{"nome": "Milho", "caloria": 86}\n'
+        saida = self.importar(self.arquivo("tabela.jsonl", conteudo))
+
+        self.assertIn("2 criados", saida)
+        self.assertIn("3 rejeitadas", saida)
+        self.assertEqual(set(Ingrediente.objects.values_list("nome", flat=True)), {"Arroz", "Milho"})
@@ -0,0 +1,104 @@
+# core/tests/tests_metricas.py
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from core.ia import FakeBackend
+from core.models import Categoria, Ingrediente
+from core.provedor_ia import ErroTransitorio, Provedor
+
+
+def valor(nome, **rotulos):
+    return REGISTRY.get_sample_value(nome, rotulos) or 0
+
+
+class MetricasRequisicaoTest(TestCase):
+    def setUp(self):
+        categoria = Categoria.objects.create(nome="Frutas")
+        Ingrediente.objects.create(nome="Banana", caloria=89, categoria=categoria)
+
+    def test_registra_latencia_tamanho_e_sql_por_view(self):
+        antes = {
+            'requisicoes': valor(
+                'luiggis_http_request_duration_seconds_count', view='lista_ingredientes', metodo='GET', status='200'
+            ),
+            'bytes': valor('luiggis_http_response_size_bytes_sum', view='lista_ingredientes'),
+            'sql': valor('luiggis_sql_queries_total', view='lista_ingredientes'),
+        }
+        response = self.client.get(reverse('lista_ingredientes'))
+
+        self.assertEqual(valor(
+            'luiggis_http_request_duration_seconds_count', view='lista_ingredientes', metodo='GET', status='200'
+        ), antes['requisicoes'] + 1)
+        self.assertEqual(
+            valor('luiggis_http_response_size_bytes_sum', view='lista_ingredientes'),
+            antes['bytes'] + len(response.content),
+        )
+        self.assertGreater(valor('luiggis_sql_queries_total', view='lista_ingredientes'), antes['sql'])
+
+    def test_rota_inexistente_usa_rotulo_fixo(self):
+        antes = valor('luiggis_http_request_duration_seconds_count', view='sem_rota', metodo='GET', status='404')
+        self.client.get('/nao-existe/')
+        self.assertEqual(
+            valor('luiggis_http_request_duration_seconds_count', view='sem_rota', metodo='GET', status='404'),
+            antes + 1,
+        )
+
+    def test_endpoint_no_formato_do_prometheus(self):
+        self.client.get(reverse('lista_ingredientes'))
+        response = self.client.get(reverse('metricas'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'luiggis_http_request_duration_seconds_bucket{', response.content)
+        self.assertIn(b'view="lista_ingredientes"', response.content)
+
+
+    async def test_conta_sql_das_views_assincronas(self):
+        antes = valor('luiggis_sql_queries_total', view='lista_ingredientes')
+        response = await self.async_client.get(reverse('lista_ingredientes'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(valor('luiggis_sql_queries_total', view='lista_ingredientes'), antes)
+
+    @override_settings(METRICAS_TOKEN='segredo')
+    def test_endpoint_restrito_por_ip_ou_token(self):
+        self.assertEqual(self.client.get(reverse('metricas'), REMOTE_ADDR='10.0.0.5').status_code, 403)
+        self.assertEqual(self.client.get(
+            reverse('metricas'), REMOTE_ADDR='10.0.0.5', HTTP_AUTHORIZATION='Bearer errado'
+        ).status_code, 403)
+        self.assertEqual(self.client.get(
+            reverse('metricas'), REMOTE_ADDR='10.0.0.5', HTTP_AUTHORIZATION='Bearer segredo'
+        ).status_code, 200)
+
+
+class MetricasIATest(TestCase):
+    def test_registra_tentativas_e_erros(self):
+        class FalhaUmaVez(FakeBackend):
+            falhas = 1
+
+            def gerar(self, prompt, **kwargs):
+                if self.falhas:
+                    self.falhas -= 1
+                    raise ErroTransitorio("503")
+                return super().gerar(prompt, **kwargs)
+
+        ok = valor('luiggis_ia_request_duration_seconds_count', operacao='gerar', resultado='ok')
+        erro = valor('luiggis_ia_request_duration_seconds_count', operacao='gerar', resultado='erro')
+        erros = valor('luiggis_ia_errors_total', tipo='ErroTransitorio')
+
+        Provedor(FalhaUmaVez(), tentativas=2, backoff_base=0).gerar("bolo")
+
+        self.assertEqual(valor('luiggis_ia_request_duration_seconds_count', operacao='gerar', resultado='ok'), ok + 1)
+        self.assertEqual(
+            valor('luiggis_ia_request_duration_seconds_count', operacao='gerar', resultado='erro'), erro + 1
+        )
+        self.assertEqual(valor('luiggis_ia_errors_total', tipo='ErroTransitorio'), erros + 1)
+
+
+@override_settings(METRICAS_ATIVAS=False)
+class MetricasDesativadasTest(TestCase):
+    def test_middleware_nao_registra(self):
+        antes = valor('luiggis_http_request_duration_seconds_count', view='landing', metodo='GET', status='200')
+        self.client.get(reverse('landing'))
+        self.assertEqual(
+            valor('luiggis_http_request_duration_seconds_count', view='landing', metodo='GET', status='200'), antes
+        )
@@ -0,0 +1,71 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib import admin
+from django.test import override_settings
+from django.urls import reverse
+
+from core import compras, contadores
+from core.models import Receita
+from core.tests.orcamento import OrcamentoConsultasTestCase
+
+
+@override_settings(BUSCA_BACKEND='memoria')
+class OrcamentoDasPaginasTest(OrcamentoConsultasTestCase):
+
+    def test_landing(self):
+        self.assertOrcamento(reverse("landing"), 1)
+
+    def test_listas_paginadas(self):
+        self.assertOrcamento(reverse("lista_ingredientes"), 1)
+        self.assertOrcamento(reverse("lista_receitas") + "?min_caloria=20", 1)
+
+    def test_detalhe_da_receita(self):
+        self.semear(1)
+        url = reverse("detalhes_receita", kwargs={"pk": Receita.objects.first().pk})
+        self.assertOrcamento(url, 2)
+
+    def test_busca_e_catalogo(self):
+        # Índice em memória e catálogo são postos em dia quando a versão muda
+        # (o índice consulta também o log de alterações)
+        self.assertOrcamento(reverse("busca_ingredientes") + "?q=ingre", 3, varreduras_permitidas={"core_ingrediente"})
+        self.assertOrcamento(reverse("catalogo_ingredientes"), 2, varreduras_permitidas={"core_ingrediente"})
+
+    def test_receitas_compativeis(self):
+        url = reverse("receitas_compativeis", kwargs={"pk": self.usuario.pk})
+        # Mede a recarga completa do índice (sem alcançar pelo log), mais a consulta ao log
+        self.enterContext(mock.patch.object(contadores, "VERSOES_NO_LOG", 0))
+        self.assertOrcamento(url, 8, varreduras_permitidas={"core_receita", "core_ingredientereceita"})
+
+    def test_feed_da_agenda(self):
+        self.assertOrcamento(reverse("agenda_ics", kwargs={"token": self.agenda.token}), 2)
+
+    def test_lista_de_compras(self):
+        self.assertOrcamento(
+            lambda: compras.gerar_lista(self.usuario, date(2026, 10, 19), date(2026, 10, 25)), 6,
+            indices={"refeicao_usuario_date_idx", "recref_refeicao_receita_idx"},
+        )
+
+
+class OrcamentoDoAdminTest(OrcamentoConsultasTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        # Com poucas linhas o admin não pagina (e não usa LIMIT); força a paginação
+        for model_admin in admin.site._registry.values():
+            self.enterContext(mock.patch.object(model_admin, "list_per_page", 2))
+
+    def test_changelist_de_ingredientes(self):
+        self.assertOrcamento(reverse("admin:core_ingrediente_changelist"), 6)
+
+    def test_changelist_de_receitas(self):
+        self.assertOrcamento(reverse("admin:core_receita_changelist"), 6)
+
+    def test_changelist_de_usuarios(self):
+        self.assertOrcamento(reverse("admin:core_usuario_changelist"), 6)
+
+    def test_changelist_de_geracoes(self):
+        self.assertOrcamento(reverse("admin:core_geracaoreceita_changelist"), 6)
+
+    def test_changelist_de_listas_de_compra(self):
+        self.assertOrcamento(reverse("admin:core_listadecompra_changelist"), 6)
@@ -0,0 +1,65 @@
+from django.core import signing
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Categoria, Ingrediente, Receita
+from core.paginacao import CursorPaginator
+
+
+class CursorPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Grãos")
+        # Nomes repetidos exercitam o desempate pelo id
+        for nome in ["Feijão", "Arroz", "Lentilha", "Arroz", "Milho", "Aveia", "Grão-de-bico"]:
+            Ingrediente.objects.create(nome=nome, caloria=100, categoria=categoria)
+
+    def test_percorre_todas_as_paginas_nas_duas_direcoes(self):
+        paginator = CursorPaginator(Ingrediente.objects.all(), ('nome', 'id'), per_page=3)
+        esperado = list(Ingrediente.objects.order_by('nome', 'id'))
+
+        paginas = [paginator.page()]
+        while paginas[-1].has_next():
+            paginas.append(paginator.page(paginas[-1].proximo))
+        self.assertEqual([i for p in paginas for i in p], esperado)
+        self.assertFalse(paginas[0].has_previous())
+
+        voltando = paginator.page(paginas[-1].anterior)
+        self.assertEqual(voltando.object_list, paginas[-2].object_list)
+
+    def test_cursor_invalido_volta_para_o_inicio(self):
+        paginator = CursorPaginator(Ingrediente.objects.all(), ('nome', 'id'), per_page=3)
+        self.assertEqual(paginator.page("adulterado").object_list, paginator.page().object_list)
+
+    def test_cursor_de_outra_ordenacao_ou_com_valores_invalidos_volta_para_o_inicio(self):
+        ingredientes = CursorPaginator(Ingrediente.objects.all(), ('nome', 'id'), per_page=3)
+        receitas = CursorPaginator(Receita.objects.all(), ('-id',), per_page=3)
+        self.assertIsNone(receitas.decodificar(ingredientes.page().proximo))
+
+        response = self.client.get(reverse("lista_receitas"), {"cursor": ingredientes.page().proximo})
+        self.assertEqual(response.status_code, 200)
+
+        # Assinado com o salt certo, mas com valores que não servem para o campo
+        adulterado = signing.dumps({'v': ['Arroz'], 'd': 'p'}, salt=receitas.salt)
+        self.assertEqual(receitas.page(adulterado).object_list, receitas.page().object_list)
+        incompleto = signing.dumps({'v': ['Arroz'], 'd': 'p'}, salt=ingredientes.salt)
+        self.assertIsNone(ingredientes.decodificar(incompleto))
+
+    def test_lista_de_ingredientes_nao_faz_uma_consulta_por_linha(self):
+        url = reverse("lista_ingredientes")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, "Grãos")
+
+    def test_lista_de_receitas_pagina_pela_mais_recente(self):
+        for i in range(60):
+            Receita.objects.create(titulo=f"Receita {i}", instrucoes="...", tempo_preparo=10)
+
+        response = self.client.get(reverse("lista_receitas"))
+        receitas = response.context["receitas"]
+        self.assertEqual(len(receitas), 50)
+        self.assertEqual(receitas[0].titulo, "Receita 59")
+
+        seguinte = self.client.get(reverse("lista_receitas"), {"cursor": response.context["page_obj"].proximo})
+        self.assertEqual([r.titulo for r in seguinte.context["receitas"]], [f"Receita {i}" for i in range(9, -1, -1)])
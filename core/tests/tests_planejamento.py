@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import planejamento
+from core.models import (
+    Dieta, Ingrediente, IngredienteDieta, IngredienteReceita, Perfil, Receita, ReceitaRefeicao, Refeicao, Usuario,
+)
+
+INICIO = date(2026, 10, 19)
+
+
+class PlanejamentoTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.carne = Ingrediente.objects.create(nome="Carne", caloria=250)
+        cls.base = Ingrediente.objects.create(nome="Base", caloria=1)
+        receitas = Receita.objects.bulk_create([
+            Receita(titulo=f"R{i}", instrucoes="...", tempo_preparo=10) for i in range(60)
+        ])
+        IngredienteReceita.objects.bulk_create([
+            IngredienteReceita(receita=r, ingrediente=cls.carne if i % 3 == 0 else cls.base, quantidade=100 + 20 * i)
+            for i, r in enumerate(receitas)
+        ])
+        perfil = Perfil.objects.create(tipo="Comum")
+        cls.usuario = Usuario.objects.create_user(username="ana", password="123", perfil=perfil)
+        cls.dieta = Dieta.objects.create(usuario=cls.usuario, min_refeicao=3, max_refeicao=4, total_caloria=2000)
+        IngredienteDieta.objects.create(dieta=cls.dieta, ingrediente=cls.carne)
+
+    def test_escolher_dia_aproxima_o_alvo(self):
+        calorias = np.arange(100, 1100, 7)
+        posicoes = planejamento.escolher_dia(calorias, 2345, 3, 4, np.random.default_rng(1))
+        self.assertTrue(3 <= len(posicoes) <= 4)
+        self.assertEqual(len(set(posicoes)), len(posicoes))
+        self.assertLessEqual(abs(calorias[posicoes].sum() - 2345), 3)
+
+    def test_semana_respeita_metas_e_restricoes(self):
+        refeicoes = planejamento.planejar_dieta(self.dieta, INICIO, planejamento.Planejador(seed=1))
+
+        por_dia = {}
+        for link in ReceitaRefeicao.objects.filter(refeicao__in=refeicoes).select_related("receita", "refeicao"):
+            por_dia.setdefault(link.refeicao.date, []).append(link.receita)
+        self.assertEqual(sorted(por_dia), [INICIO + timedelta(days=d) for d in range(7)])
+        for receitas in por_dia.values():
+            self.assertTrue(3 <= len(receitas) <= 4)
+            self.assertLess(abs(sum(r.total_caloria for r in receitas) - 2000), 100)
+            self.assertFalse(any(r.ingredientes.filter(pk=self.carne.pk).exists() for r in receitas))
+        self.assertTrue(all(r.dietas.filter(pk=self.dieta.pk).exists() for r in refeicoes))
+
+    def test_comando_em_lote_nao_replaneja_dias_existentes(self):
+        saida = StringIO()
+        call_command("planejar_refeicoes", "--inicio", INICIO.isoformat(), "--seed", "1", stdout=saida)
+        total = Refeicao.objects.count()
+        self.assertIn("1 dieta(s) planejada(s)", saida.getvalue())
+
+        call_command("planejar_refeicoes", "--inicio", INICIO.isoformat(), stdout=StringIO())
+        self.assertEqual(Refeicao.objects.count(), total)
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+from django.test import SimpleTestCase
+
+from core.ia import FakeBackend
+from core.provedor_ia import Circuito, CircuitoAberto, ErroTransitorio, Provedor
+
+
+class FalhasSeguidasBackend:
+    def __init__(self, falhas):
+        self.falhas = falhas
+        self.chamadas = 0
+
+    def gerar(self, prompt, **kwargs):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            raise ErroTransitorio("503")
+        return "ok"
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class ProvedorIATest(SimpleTestCase):
+
+    def test_repete_falhas_transitorias(self):
+        backend = FalhasSeguidasBackend(falhas=2)
+        provedor = Provedor(backend, tentativas=3, backoff_base=0)
+
+        self.assertEqual(provedor.gerar("arroz"), "ok")
+        self.assertEqual(backend.chamadas, 3)
+
+    def test_erro_nao_transitorio_nao_e_repetido(self):
+        class InvalidoBackend:
+            chamadas = 0
+
+            def gerar(self, prompt, **kwargs):
+                self.chamadas += 1
+                raise ValueError("prompt inválido")
+
+        backend = InvalidoBackend()
+        with self.assertRaises(ValueError):
+            Provedor(backend, tentativas=3, backoff_base=0).gerar("arroz")
+        self.assertEqual(backend.chamadas, 1)
+
+    def test_circuito_aberto_falha_rapido_e_fecha_apos_pausa(self):
+        relogio = RelogioFalso()
+        backend = FalhasSeguidasBackend(falhas=2)
+        provedor = Provedor(backend, tentativas=1, backoff_base=0,
+                            circuito=Circuito(limiar=2, pausa=30, relogio=relogio))
+
+        for _ in range(2):
+            with self.assertRaises(ErroTransitorio):
+                provedor.gerar("arroz")
+        with self.assertRaises(CircuitoAberto):
+            provedor.gerar("arroz")
+        self.assertEqual(backend.chamadas, 2)
+
+        relogio.agora = 31
+        self.assertEqual(provedor.gerar("arroz"), "ok")
+        self.assertEqual(provedor.circuito.estado, Circuito.FECHADO)
+
+    def test_limite_de_chamadas_simultaneas(self):
+        ativos = []
+        pico = []
+        lock = threading.Lock()
+
+        class MedidorBackend(FakeBackend):
+            def gerar(self, prompt, **kwargs):
+                with lock:
+                    ativos.append(1)
+                    pico.append(len(ativos))
+                try:
+                    return super().gerar(prompt, **kwargs)
+                finally:
+                    with lock:
+                        ativos.pop()
+
+        provedor = Provedor(MedidorBackend(latencia=0.02), max_simultaneas=3)
+        threads = [threading.Thread(target=provedor.gerar, args=("arroz",)) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(pico), 3)
+
+    async def test_versao_assincrona_repete_falhas_transitorias(self):
+        class FalhaUmaVezAsync(FakeBackend):
+            chamadas = 0
+
+            async def agerar(self, prompt, **kwargs):
+                self.chamadas += 1
+                if self.chamadas == 1:
+                    raise ErroTransitorio("503")
+                return await super().agerar(prompt, **kwargs)
+
+        backend = FalhaUmaVezAsync(latencia=0)
+        resposta = await Provedor(backend, tentativas=2, backoff_base=0).agerar("arroz")
+
+        self.assertIn("arroz", resposta)
+        self.assertEqual(backend.chamadas, 2)
+
+    async def test_stream_cancelado_no_meio_aberto_libera_nova_tentativa(self):
+        relogio = RelogioFalso()
+        circuito = Circuito(limiar=1, pausa=30, relogio=relogio)
+        provedor = Provedor(FakeBackend(latencia=0), tentativas=1, backoff_base=0, circuito=circuito)
+        circuito.registrar_falha()
+        relogio.agora = 31
+
+        # O cliente desiste do stream de teste depois da primeira parte
+        stream = provedor.gerar_stream("arroz")
+        await anext(stream)
+        await stream.aclose()
+
+        self.assertEqual(circuito.estado, Circuito.MEIO_ABERTO)
+        self.assertIn("arroz", await provedor.agerar("arroz"))
+        self.assertEqual(circuito.estado, Circuito.FECHADO)
+
+    async def test_chamada_de_teste_cancelada_libera_o_circuito(self):
+        relogio = RelogioFalso()
+        circuito = Circuito(limiar=1, pausa=30, relogio=relogio)
+        provedor = Provedor(FakeBackend(latencia=10), tentativas=1, backoff_base=0, circuito=circuito)
+        circuito.registrar_falha()
+        relogio.agora = 31
+
+        tarefa = asyncio.create_task(provedor.agerar("arroz"))
+        await asyncio.sleep(0)
+        tarefa.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await tarefa
+
+        provedor.backend.latencia = 0
+        self.assertIn("arroz", await provedor.agerar("arroz"))
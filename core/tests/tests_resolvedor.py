@@ -0,0 +1,131 @@
+import json
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import geracao, ia, resolvedor
+from core.models import Categoria, Ingrediente, IngredienteReceita, Receita
+
+
+class InterpretarIngredientesTest(TestCase):
+
+    def test_lista_de_ingredientes_da_resposta(self):
+        dados = ia.interpretar_resposta(json.dumps({
+            "titulo": "Arroz", "instrucoes": "...", "tempo_preparo": 20,
+            "ingredientes": [
+                {"nome": " Arroz ", "quantidade": "200,5", "unidade": "Gramas"},
+                {"nome": "Água", "quantidade": 400, "unidade": "ml"},
+                "sal",
+                {"nome": "", "quantidade": 1},
+                {"quantidade": 2},
+                {"nome": "Alho", "quantidade": "dois dentes", "unidade": "dente"},
+            ],
+        }))
+        self.assertEqual(dados["ingredientes"], [
+            {"nome": "Arroz", "quantidade": Decimal("200.50"), "unidade": "g"},
+            {"nome": "Água", "quantidade": Decimal("400.00"), "unidade": "ml"},
+            {"nome": "sal", "quantidade": Decimal(1), "unidade": "porcao"},
+            {"nome": "Alho", "quantidade": Decimal(1), "unidade": "porcao"},
+        ])
+        self.assertEqual(ia.interpretar_resposta('{"titulo": "X"}')["ingredientes"], [])
+
+    def test_converte_quilos_e_litros_e_ignora_quantidades_nao_finitas(self):
+        dados = ia.interpretar_resposta(json.dumps({
+            "titulo": "Bolo", "instrucoes": "...", "tempo_preparo": 40,
+            "ingredientes": [
+                {"nome": "Farinha", "quantidade": "1,5", "unidade": "kg"},
+                {"nome": "Leite", "quantidade": 1, "unidade": "Litro"},
+                {"nome": "Água", "quantidade": "0.25", "unidade": "l"},
+                {"nome": "Açúcar", "quantidade": "NaN", "unidade": "g"},
+                {"nome": "Sal", "quantidade": "Infinity", "unidade": "g"},
+            ],
+        }))
+        self.assertEqual(dados["ingredientes"], [
+            {"nome": "Farinha", "quantidade": Decimal("1500.00"), "unidade": "g"},
+            {"nome": "Leite", "quantidade": Decimal("1000.00"), "unidade": "ml"},
+            {"nome": "Água", "quantidade": Decimal("250.00"), "unidade": "ml"},
+            {"nome": "Açúcar", "quantidade": Decimal(1), "unidade": "g"},
+            {"nome": "Sal", "quantidade": Decimal(1), "unidade": "g"},
+        ])
+
+    def test_campos_da_receita_sao_validados(self):
+        dados = ia.interpretar_resposta(json.dumps({
+            "titulo": "  " + "Bolo " * 30, "instrucoes": ["Misture.", "Asse."], "tempo_preparo": "30 minutos",
+        }))
+        self.assertEqual(len(dados["titulo"]), 100)
+        self.assertEqual((dados["instrucoes"], dados["tempo_preparo"]), ("Misture.\nAsse.", 30))
+        self.assertEqual(ia.interpretar_resposta('{"tempo_preparo": 45.0}')["tempo_preparo"], 45)
+
+        for resposta in (
+            {"tempo_preparo": "rápido"}, {"tempo_preparo": 0}, {"tempo_preparo": True},
+            {"titulo": {"nome": "Bolo"}}, {"instrucoes": 3},
+        ):
+            with self.subTest(resposta=resposta), self.assertRaises(ia.RespostaInvalida):
+                ia.interpretar_resposta(json.dumps(resposta))
+        with self.assertRaises(ia.RespostaInvalida):
+            ia.interpretar_resposta("[]")
+
+
+@override_settings(IA_BACKEND='core.ia.FakeBackend', IA_CACHE_ATIVO=False)
+class ResolvedorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Hortaliças")
+        cls.acucar = Ingrediente.objects.create(nome="Açúcar", caloria=387)
+        cls.cebola = Ingrediente.objects.create(nome="Cebola", caloria=40, categoria=categoria)
+        cls.tomate = Ingrediente.objects.create(nome="Tomate", caloria=18, categoria=categoria)
+        cls.mandioca = Ingrediente.objects.create(nome="Mandioca", caloria=160)
+        cls.limao = Ingrediente.objects.create(nome="Limão", caloria=29)
+
+    def test_niveis_de_correspondencia(self):
+        self.assertEqual(resolvedor.resolver([
+            "açúcar", "acucar", "Cebolas", "limões", "aipim", "tomatte", "chocolate",
+        ]), {
+            "açúcar": self.acucar.pk,
+            "acucar": self.acucar.pk,
+            "Cebolas": self.cebola.pk,
+            "limões": self.limao.pk,
+            "aipim": self.mandioca.pk,
+            "tomatte": self.tomate.pk,
+            "chocolate": None,
+        })
+
+    def test_ingrediente_novo_entra_no_indice(self):
+        self.assertEqual(resolvedor.resolver(["Chocolate"]), {"Chocolate": None})
+        with self.captureOnCommitCallbacks(execute=True):
+            chocolate = Ingrediente.objects.create(nome="Chocolate", caloria=540)
+        self.assertEqual(resolvedor.resolver(["chocolates"]), {"chocolates": chocolate.pk})
+
+    def test_receita_gerada_vincula_ingredientes_num_bulk_create(self):
+        dados = ia.interpretar_resposta(json.dumps({
+            "titulo": "Vinagrete", "instrucoes": "Pique tudo e tempere.", "tempo_preparo": 10,
+            "ingredientes": [
+                {"nome": "tomates", "quantidade": 200, "unidade": "g"},
+                {"nome": "cebola", "quantidade": 100, "unidade": "g"},
+                {"nome": "Cebola roxa", "quantidade": 50, "unidade": "g"},
+                {"nome": "coentro", "quantidade": 1},
+            ],
+        }))
+        with CaptureQueriesContext(connection) as consultas:
+            receita = geracao.salvar_receita("vinagrete", dados)
+        insercoes = [
+            c["sql"] for c in consultas.captured_queries
+            if c["sql"].startswith('INSERT INTO "core_ingredientereceita"')
+        ]
+        self.assertEqual(len(insercoes), 1)
+
+        itens = dict(IngredienteReceita.objects.filter(receita=receita).values_list("ingrediente_id", "quantidade"))
+        self.assertEqual(itens, {self.tomate.pk: Decimal(200), self.cebola.pk: Decimal(150)})
+        receita.refresh_from_db()
+        self.assertEqual(receita.total_caloria, 36 + 60)
+
+    def test_backend_local_devolve_ingredientes(self):
+        receita = geracao.processar(geracao.enfileirar("tomate e cebola")).receita
+        self.assertEqual(
+            set(IngredienteReceita.objects.filter(receita=receita).values_list("ingrediente_id", flat=True)),
+            {self.tomate.pk, self.cebola.pk},
+        )
+        self.assertEqual(Receita.objects.count(), 1)
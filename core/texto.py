@@ -0,0 +1,34 @@
+# core/texto.py
+""" Normalização de texto compartilhada pela busca, pelo cache da IA etc. """
+import re
+import unicodedata
+
+_ESPACOS = re.compile(r'\s+')
+_PALAVRAS = re.compile(r'\w+')
+
+# Palavras (já normalizadas) que não distinguem receitas nem pedidos de receita
+PALAVRAS_VAZIAS = frozenset("""
+    a ao aos as com da das de do dos e em gostaria me na nas no nos o os ou para pra por quero
+    receita receitas uma um umas uns faca fazer prato pratos algo alguma algum eu tenho
+""".split())
+
+
+def normalizar(texto):
+    """ Minúsculo, sem acentos e com espaços simples: "Açúcar  Mascavo" -> "acucar mascavo". """
+    texto = unicodedata.normalize('NFKD', texto.casefold())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return _ESPACOS.sub(' ', texto).strip()
+
+
+def palavras(texto):
+    """ Palavras do texto já normalizado. """
+    return _PALAVRAS.findall(normalizar(texto))
+
+
+def trigramas(texto, normalizado=False):
+    """ Trigramas no estilo do pg_trgm: cada palavra recebe bordas em branco. """
+    resultado = set()
+    for palavra in _PALAVRAS.findall(texto if normalizado else normalizar(texto)):
+        palavra = f'  {palavra} '
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
@@ -11,6 +11,13 @@ urlpatterns = [
     # Lista de Ingredientes (Read)
     path('ingredientes/', views.IngredienteListView.as_view(), name='lista_ingredientes'),
     
+    # Busca/autocomplete de ingredientes (JSON)
+    path('ingredientes/busca/', views.busca_ingredientes, name='busca_ingredientes'),
+    path('receitas/busca/', views.busca_receitas, name='busca_receitas'),
+
+    # Catálogo versionado de nomes, usado pelo formulário de geração (JSON)
+    path('ingredientes/catalogo.json', views.catalogo_ingredientes, name='catalogo_ingredientes'),
+
     # Adicionar Ingrediente (Create)
     path('ingredientes/adicionar/', views.IngredienteCreateView.as_view(), name='adicionar_ingrediente'),
     
@@ -24,6 +31,18 @@ urlpatterns = [
     path('receitas/', views.ReceitaListView.as_view(), name='lista_receitas'),
     path('receitas/<int:pk>/', views.ReceitaDetailView.as_view(), name='detalhes_receita'),
     
+    # Receitas compatíveis com a dieta ativa de um usuário (JSON)
+    path('usuarios/<int:pk>/receitas-compativeis/', views.receitas_compativeis, name='receitas_compativeis'),
+
+    # Feed iCalendar da agenda alimentar (sem login: o token da agenda é o segredo)
+    path('agendas/<uuid:token>/refeicoes.ics', views.agenda_ics, name='agenda_ics'),
+
+    # Métricas no formato do Prometheus
+    path('metrics', views.metricas_view, name='metricas'),
+
     # Geração de Receita via IA
     path('receitas/gerar/', views.GerarReceitaIAView.as_view(), name='receita_geracao_ia'),
+    path('receitas/gerar/stream/', views.gerar_receita_stream, name='receita_geracao_stream'),
+    path('receitas/geracoes/<int:pk>/', views.GeracaoStatusView.as_view(), name='status_geracao'),
+    path('receitas/geracoes/<int:pk>/status/', views.geracao_status_json, name='status_geracao_json'),
 ]
\ No newline at end of file
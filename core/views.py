@@ -1,5 +1,13 @@
-from django.shortcuts import render, redirect
-from django.urls import reverse_lazy
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.decorators.http import condition, require_POST
 from django.views.generic import (
     TemplateView,
     ListView, 
@@ -8,10 +16,13 @@ from django.views.generic import (
     UpdateView, 
     DeleteView
 )
-from .models import Ingrediente, Categoria, Receita # Importe os Models
+from .models import Ingrediente, Categoria, Receita, GeracaoReceita, Contador, Usuario, AgendaAlimentar # Importe os Models
 from .forms import IngredienteForm, ReceitaIAForm # Importe os Forms
-from google import genai 
-import os
+from . import busca, busca_semantica, catalogo, compatibilidade, contadores, duplicatas, fragmentos, metricas
+from .agenda import gerar_ics
+from .fragmentos import FragmentosMixin
+from .geracao import enfileirar, gerar_em_stream
+from .paginacao import AsyncCursorPaginationMixin
 
 # --- Landing Page ---
 
@@ -19,13 +30,16 @@ class LandingPageView(TemplateView):
     """Exibe a página inicial/landing page do aplicativo."""
     template_name = 'core/landing.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Passa estatísticas para a landing page
-        context['total_ingredientes'] = Ingrediente.objects.count()
-        context['total_receitas'] = Receita.objects.count()
-        context['total_receitas_ia'] = Receita.objects.filter(is_ai_generated=True).count()
-        return context
+    async def get(self, request, *args, **kwargs):
+        # Passa estatísticas para a landing page (contadores materializados,
+        # mantidos pelos signals em core/signals.py)
+        totais = await contadores.avalores(Contador.INGREDIENTES, Contador.RECEITAS, Contador.RECEITAS_IA)
+        return self.render_to_response(self.get_context_data(
+            total_ingredientes=totais[Contador.INGREDIENTES],
+            total_receitas=totais[Contador.RECEITAS],
+            total_receitas_ia=totais[Contador.RECEITAS_IA],
+            **kwargs
+        ))
 
 
 # --- Vistas para Categoria (Opcional) ---
@@ -35,14 +49,24 @@ class CategoriaListView(ListView):
     template_name = 'core/categoria_lista.html'
     context_object_name = 'categorias'
 
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [categoria async for categoria in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
 
 # --- Vistas para Ingrediente (CRUD) ---
 
-class IngredienteListView(ListView):
-    """ Exibe a lista de todos os ingredientes. """
+class IngredienteListView(FragmentosMixin, AsyncCursorPaginationMixin, ListView):
+    """ Exibe a lista de ingredientes, paginada por cursor em ordem alfabética. """
     model = Ingrediente
     template_name = 'core/ingrediente_lista.html'
     context_object_name = 'ingredientes' # Nome que será usado no template
+    paginate_by = 50
+    cursor_ordering = ('nome', 'id')
+
+    def get_queryset(self):
+        # A categoria é exibida em cada linha: carrega no mesmo SELECT
+        return Ingrediente.objects.select_related('categoria')
 
 class IngredienteCreateView(CreateView):
     """ Permite adicionar um novo ingrediente. """
@@ -66,28 +90,111 @@ class IngredienteDeleteView(DeleteView):
     success_url = reverse_lazy('lista_ingredientes')
 
 
+def busca_ingredientes(request):
+    """
+    Autocomplete de ingredientes: ``?q=acucar`` encontra "Açúcar Mascavo".
+    Aceita ``limite`` (padrão 10, máximo 50).
+    """
+    try:
+        limite = min(max(int(request.GET.get('limite', 10)), 1), 50)
+    except ValueError:
+        limite = 10
+    return JsonResponse({'resultados': busca.buscar(request.GET.get('q', ''), limite)})
+
+
+def busca_receitas(request):
+    """
+    Busca de receitas por título, instruções e ingredientes, ordenada pela
+    semelhança com a consulta: ``?q=frango com limão``. Aceita ``limite``
+    (padrão 10, máximo 50).
+    """
+    try:
+        limite = min(max(int(request.GET.get('limite', 10)), 1), 50)
+    except ValueError:
+        limite = 10
+    resultados = busca_semantica.buscar(request.GET.get('q', ''), limite)
+    for resultado in resultados:
+        resultado['url'] = reverse('detalhes_receita', kwargs={'pk': resultado['id']})
+    return JsonResponse({'resultados': resultados})
+
+
+def _etag_catalogo(request):
+    request.versao_catalogo = catalogo.versao_atual()
+    return f'"catalogo-{request.versao_catalogo}"'
+
+
+@condition(etag_func=_etag_catalogo)
+def catalogo_ingredientes(request):
+    """
+    Nomes de todos os ingredientes em JSON. Com ``?v=<versão atual>`` a resposta
+    é imutável e pode ficar em cache indefinidamente; sem ela, o navegador
+    revalida pelo ETag e recebe 304 enquanto nada mudar.
+    """
+    response = HttpResponse(catalogo.conteudo(request.versao_catalogo), content_type='application/json')
+    if request.GET.get('v') == str(request.versao_catalogo):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, no-cache'
+    return response
+
+
 # --- Vistas para Receita ---
 
-class ReceitaListView(ListView):
-    """ Exibe a lista de todas as receitas criadas. """
+class ReceitaListView(FragmentosMixin, AsyncCursorPaginationMixin, ListView):
+    """ Exibe a lista de receitas criadas, paginada por cursor. """
     model = Receita
     template_name = 'core/receita_lista.html'
     context_object_name = 'receitas'
-    ordering = ['-id']  # Ordena pela mais recente primeiro
+    paginate_by = 50
+    cursor_ordering = ('-id',)  # Ordena pela mais recente primeiro
+
+    def get_queryset(self):
+        # Filtros opcionais por calorias (?min_caloria=&max_caloria=), sobre o total pré-calculado
+        queryset = super().get_queryset()
+        for parametro, lookup in (('min_caloria', 'total_caloria__gte'), ('max_caloria', 'total_caloria__lte')):
+            valor = self.request.GET.get(parametro)
+            if valor and valor.isdigit():
+                queryset = queryset.filter(**{lookup: int(valor)})
+        return queryset
 
 
 # --- Vistas para Receita ---
 
-class ReceitaDetailView(DetailView):
+class ReceitaDetailView(FragmentosMixin, DetailView):
     """ Exibe os detalhes de uma receita gerada. """
     model = Receita
     template_name = 'core/receita_detalhe.html'
     context_object_name = 'receita'
 
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except Receita.DoesNotExist:
+            raise Http404("Receita não encontrada.")
+        # Revalidação por ETag/Last-Modified: quem já tem a versão atual recebe 304
+        # sem que os itens sejam lidos nem o template renderizado
+        alterada = self.object.atualizado_em
+        etag = f'"receita-{self.object.pk}-{alterada.timestamp():.6f}"'
+        response = get_conditional_response(request, etag=etag, last_modified=int(alterada.timestamp()))
+        if response is None:
+            await fragmentos.aversionar([self.object])
+            # Queryset não avaliado: o template (renderizado numa thread) só o lê
+            # se o fragmento do detalhe não estiver em cache
+            itens = self.object.ingredientereceita_set.select_related('ingrediente').order_by('ingrediente__nome')
+            response = self.render_to_response(self.get_context_data(itens=itens))
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(alterada.timestamp())
+        # Navegadores revalidam cedo; caches compartilhados (CDN) guardam por mais tempo
+        patch_cache_control(
+            response, public=True,
+            max_age=settings.RECEITA_CACHE_MAX_AGE, s_maxage=settings.RECEITA_CACHE_S_MAXAGE,
+        )
+        return response
+
 
 class GerarReceitaIAView(CreateView):
     """
-    Exibe o formulário de prompt e processa a geração da receita via IA.
+    Exibe o formulário de prompt e enfileira a geração da receita via IA.
     """
     model = Receita
     form_class = ReceitaIAForm
@@ -95,56 +202,164 @@ class GerarReceitaIAView(CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Passamos a lista de ingredientes disponíveis para o template, 
-        # caso queira dar opções para o prompt.
-        context['ingredientes_disponiveis'] = list(Ingrediente.objects.values_list('nome', flat=True))
+        # Os ingredientes disponíveis vêm do catálogo versionado, carregado
+        # pelo navegador à parte (e mantido em cache enquanto a versão não muda).
+        context['versao_catalogo'] = catalogo.versao_atual()
+        # Sob ASGI o formulário usa a geração em streaming; sob WSGI, a fila
+        context['streaming_disponivel'] = isinstance(self.request, ASGIRequest)
         return context
 
     def form_valid(self, form):
-        prompt = form.instance.prompt_geracao
-        
-        # 1. Configurar o Cliente IA
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            # Em um projeto real, você faria um tratamento de erro melhor
-            raise EnvironmentError("GEMINI_API_KEY não configurada no ambiente.")
-            
-        try:
-            client = genai.Client(api_key=api_key)
-
-            # 2. Formular o Prompt para a IA
-            system_instruction = (
-                "Você é um chef IA. Dada a lista de ingredientes e restrições do usuário, "
-                "gere uma receita completa. O resultado deve ser em JSON no formato: "
-                '{"titulo": "Nome da Receita", "instrucoes": "Passos...", "tempo_preparo": 30}'
-            )
-
-            response = client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config=genai.types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    response_mime_type="application/json",
-                )
-            )
-
-            # 3. Processar e Salvar o Resultado
-            import json
-            receita_data = json.loads(response.text)
-            
-            # Atualiza a instância do formulário com os dados da IA
-            form.instance.titulo = receita_data.get('titulo', 'Receita Gerada')
-            form.instance.instrucoes = receita_data.get('instrucoes', 'Instruções não geradas.')
-            form.instance.tempo_preparo = receita_data.get('tempo_preparo', 20)
-            form.instance.is_ai_generated = True
-            
-            # Salva o Model Receita
-            return super().form_valid(form)
-
-        except Exception as e:
-            form.add_error(None, f"Erro ao gerar receita com IA: {e}")
-            return self.form_invalid(form)
-
-    def get_success_url(self):
-        """Redireciona para a página da receita criada para exibir o resultado."""
-        return reverse_lazy('detalhes_receita', kwargs={'pk': self.object.pk})
\ No newline at end of file
+        prompt = form.cleaned_data['prompt_geracao'] or ''
+        if not form.cleaned_data['gerar_mesmo_assim']:
+            # Antes de gastar uma chamada à IA, oferece as receitas que já atendem ao pedido
+            parecidas = duplicatas.semelhantes_ao_prompt(prompt)
+            if parecidas:
+                return self.render_to_response(self.get_context_data(form=form, parecidas=parecidas))
+        # A chamada à IA é feita pelo worker (comando processar_geracoes),
+        # assim a requisição não fica presa esperando o modelo responder.
+        geracao = enfileirar(prompt)
+        return redirect('status_geracao', pk=geracao.pk)
+
+
+class GeracaoStatusView(DetailView):
+    """
+    Acompanha um pedido de geração; redireciona para a receita quando concluído.
+    """
+    model = GeracaoReceita
+    template_name = 'core/receita_geracao_status.html'
+    context_object_name = 'geracao'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if self.object.status == GeracaoReceita.CONCLUIDA and self.object.receita_id:
+            return redirect('detalhes_receita', pk=self.object.receita_id)
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+def receitas_compativeis(request, pk):
+    """
+    Receitas que não usam nenhum ingrediente restrito da dieta ativa do
+    usuário, das mais recentes para as mais antigas. Aceita ``limite``
+    (padrão 20, máximo 100) e ``antes_de`` (o ``proximo`` da página anterior).
+    """
+    usuario = get_object_or_404(Usuario, pk=pk)
+    try:
+        limite = min(max(int(request.GET.get('limite', 20)), 1), 100)
+        antes_de = int(request.GET['antes_de']) if request.GET.get('antes_de') else None
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetros inválidos.'}, status=400)
+
+    dieta = compatibilidade.dieta_ativa(usuario)
+    restritos = compatibilidade.ingredientes_restritos(dieta)
+    indice = compatibilidade.obter_indice()
+    ids = indice.compativeis(restritos, limite=limite + 1, antes_de=antes_de)
+    receitas = Receita.objects.only('titulo', 'total_caloria').in_bulk(ids[:limite])
+    return JsonResponse({
+        'dieta': dieta.pk if dieta else None,
+        'total': indice.total_compativeis(restritos),
+        'receitas': [
+            {
+                'id': pk,
+                'titulo': receitas[pk].titulo,
+                'total_caloria': receitas[pk].total_caloria,
+                'url': reverse('detalhes_receita', kwargs={'pk': pk}),
+            }
+            for pk in ids[:limite] if pk in receitas
+        ],
+        'proximo': ids[limite - 1] if len(ids) > limite else None,
+    })
+
+
+def _agenda_do_feed(request, token):
+    # Uma consulta atende ETag, Last-Modified e o cabeçalho do calendário
+    if not hasattr(request, 'agenda_feed'):
+        request.agenda_feed = (
+            AgendaAlimentar.objects.select_related('usuario').filter(token=token, is_active=True).first()
+        )
+    return request.agenda_feed
+
+
+def _etag_agenda(request, token):
+    agenda = _agenda_do_feed(request, token)
+    return f'"agenda-{agenda.pk}-{agenda.versao}"' if agenda else None
+
+
+def _ultima_alteracao_agenda(request, token):
+    agenda = _agenda_do_feed(request, token)
+    return agenda.atualizado_em if agenda else None
+
+
+@condition(etag_func=_etag_agenda, last_modified_func=_ultima_alteracao_agenda)
+def agenda_ics(request, token):
+    """
+    Refeições da agenda em iCalendar. ``?desde=<token>`` devolve apenas o que
+    mudou após o token (o ``X-LUIGGIS-SYNC-TOKEN`` de uma resposta anterior),
+    com as refeições retiradas como eventos cancelados.
+    """
+    agenda = _agenda_do_feed(request, token)
+    if agenda is None:
+        raise Http404("Agenda não encontrada.")
+    desde = request.GET.get('desde')
+    if desde is not None and not desde.isdigit():
+        return HttpResponse("Token de sincronização inválido.", status=400)
+
+    response = StreamingHttpResponse(
+        gerar_ics(agenda, int(desde) if desde is not None else None),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Sync-Token'] = str(agenda.versao)
+    return response
+
+
+def _pode_ler_metricas(request):
+    token = settings.METRICAS_TOKEN
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICAS_IPS
+
+
+def metricas_view(request):
+    """ Métricas de execução no formato de texto do Prometheus (ver core/metricas.py). """
+    if not _pode_ler_metricas(request):
+        return HttpResponseForbidden("Acesso às métricas não permitido.")
+    conteudo, content_type = metricas.exportar()
+    return HttpResponse(conteudo, content_type=content_type)
+
+
+def geracao_status_json(request, pk):
+    """ Endpoint de polling usado pela página de status da geração. """
+    geracao = get_object_or_404(GeracaoReceita, pk=pk)
+    dados = {'status': geracao.status, 'erro': geracao.erro, 'url': None}
+    if geracao.status == GeracaoReceita.CONCLUIDA and geracao.receita_id:
+        dados['url'] = reverse('detalhes_receita', kwargs={'pk': geracao.receita_id})
+    return JsonResponse(dados)
+
+
+@require_POST
+async def gerar_receita_stream(request):
+    """
+    Gera a receita repassando a saída da IA como Server-Sent Events.
+    Deve ser servida via ASGI (luiggis/asgi.py) para que cada stream não
+    ocupe uma thread enquanto o modelo gera.
+    """
+    form = ReceitaIAForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'erros': form.errors}, status=400)
+    prompt = form.cleaned_data['prompt_geracao'] or ''
+    if not form.cleaned_data['gerar_mesmo_assim']:
+        # O navegador volta ao POST comum, que mostra as receitas parecidas
+        parecidas = await sync_to_async(duplicatas.semelhantes_ao_prompt)(prompt)
+        if parecidas:
+            return JsonResponse({'parecidas': [
+                {'titulo': receita.titulo, 'url': reverse('detalhes_receita', kwargs={'pk': receita.pk})}
+                for _, receita in parecidas
+            ]}, status=409)
+    response = StreamingHttpResponse(
+        gerar_em_stream(prompt),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # evita buffer em proxies como o nginx
+    return response
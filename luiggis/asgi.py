@@ -3,6 +3,11 @@ ASGI config for luiggis project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Servir por aqui (ex.: ``uvicorn luiggis.asgi:application``) é necessário para a
+geração de receitas em streaming (``receita_geracao_stream``): sob ASGI a
+resposta é repassada ao navegador em partes, sem ocupar uma thread por stream.
+As páginas de leitura (landing, listas e detalhe) também são views assíncronas.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,38 @@
+"""
+Configuração do gunicorn no modo de produção (ver servir.sh).
+
+``SERVIDOR=wsgi`` usa workers ``gthread``: cada processo atende ``WEB_THREADS``
+requisições ao mesmo tempo, o que cobre a espera pelo banco. ``SERVIDOR=asgi``
+usa workers do uvicorn, um loop de eventos por processo. Os valores padrão
+seguem o número de CPUs e podem ser ajustados por ``WEB_WORKERS``,
+``WEB_THREADS`` e ``WEB_TIMEOUT``.
+"""
+import multiprocessing
+import os
+
+asgi = os.environ.get('SERVIDOR') == 'asgi'
+cpus = multiprocessing.cpu_count()
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn_worker.UvicornWorker' if asgi else 'gthread'
+# Sob ASGI um worker por CPU basta; com threads, o dobro mais um compensa as esperas de I/O
+workers = int(os.environ.get('WEB_WORKERS', cpus if asgi else 2 * cpus + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recicla os workers de tempos em tempos (limita vazamentos de memória), em momentos diferentes
+max_requests = 2000
+max_requests_jitter = 200
+
+# Evita que o heartbeat dos workers bloqueie em discos lentos (overlay do Docker)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = '-'
+
+
+def child_exit(server, worker):
+    # Métricas em modo multiprocesso (core/metricas.py): descarta os gauges do worker que saiu
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Serve os arquivos estáticos coletados (comprimidos e com cache longo) sem passar pelas views
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.MetricasMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -69,6 +73,16 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Fora do DEBUG os templates são compilados uma vez por processo e não são relidos do disco
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'luiggis.wsgi.application'
 
 
@@ -92,6 +106,45 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Guarda os fragmentos de template (ver core/fragmentos.py). Todos os processos e
+# hosts precisam ver as mesmas invalidações: com REDIS_URL o cache é o Redis,
+# compartilhado. Sem ele, fora do DEBUG cai para arquivo em CACHE_DIR, que só é
+# compartilhado pelos workers do mesmo host (ou de um volume comum); o limite é
+# baixo porque esse backend lista o diretório inteiro a cada gravação.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+elif os.environ.get('CACHE_DIR') or not DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'luiggis-cache'),
+            'OPTIONS': {'MAX_ENTRIES': 5_000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10_000},
+        }
+    }
+
+FRAGMENTOS_TTL = int(os.environ.get('FRAGMENTOS_TTL', 24 * 3600))  # segundos
+
+# Cache-Control do detalhe da receita (segundos): navegador e caches compartilhados/CDN.
+# Depois disso a página é revalidada pelo ETag/Last-Modified (304 sem renderizar).
+RECEITA_CACHE_MAX_AGE = int(os.environ.get('RECEITA_CACHE_MAX_AGE', 60))
+RECEITA_CACHE_S_MAXAGE = int(os.environ.get('RECEITA_CACHE_S_MAXAGE', 600))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -128,6 +181,70 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Destino do collectstatic (feito pelo servir.sh no modo de produção)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Fora do DEBUG os estáticos ganham hash no nome e versões gzip/brotli; o WhiteNoise
+# serve os arquivos com hash com cache de um ano (immutable)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+# Em desenvolvimento (e nos testes) os estáticos vêm direto dos apps, sem collectstatic
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
+
+# Geração de receitas por IA
+# Classe usada para falar com o modelo; 'core.ia.FakeBackend' roda sem rede.
+
+IA_BACKEND = os.environ.get('IA_BACKEND', 'core.ia.GeminiBackend')
+
+# Provedor compartilhado (ver core/provedor_ia.py)
+IA_MAX_SIMULTANEAS = int(os.environ.get('IA_MAX_SIMULTANEAS', 8))  # por processo
+# Chamadas assíncronas (streaming e worker assíncrono) só aguardam o modelo, sem ocupar threads
+IA_MAX_SIMULTANEAS_ASYNC = int(os.environ.get('IA_MAX_SIMULTANEAS_ASYNC', 256))  # por processo
+IA_TENTATIVAS = 3
+IA_BACKOFF_BASE = 0.5  # segundos
+IA_BACKOFF_MAX = 8
+IA_CIRCUITO_LIMIAR = 5  # falhas seguidas que abrem o circuito
+IA_CIRCUITO_PAUSA = 30  # segundos com o circuito aberto
+
+# Comportamento do backend local (core.ia.FakeBackend)
+IA_FAKE_LATENCIA = float(os.environ.get('IA_FAKE_LATENCIA', 0))
+IA_FAKE_TAXA_FALHA = float(os.environ.get('IA_FAKE_TAXA_FALHA', 0))
+
+# Cache das respostas da IA (ver core/cache_ia.py)
+IA_CACHE_ATIVO = os.environ.get('IA_CACHE_ATIVO', 'True') == 'True'
+IA_CACHE_MAX_ENTRADAS = int(os.environ.get('IA_CACHE_MAX_ENTRADAS', 5000))
+IA_CACHE_TTL = int(os.environ.get('IA_CACHE_TTL', 7 * 24 * 3600))  # segundos
+IA_CACHE_ESPERA = 120  # segundos aguardando uma geração idêntica em andamento
+IA_CACHE_INTERVALO = 0.25
+
+# Busca de ingredientes (ver core/busca.py): 'auto', 'memoria' ou 'postgres'
+
+BUSCA_BACKEND = os.environ.get('BUSCA_BACKEND', 'auto')
+
+# Busca de receitas por vetores (ver core/busca_semantica.py). O diretório
+# precisa ser o mesmo para todos os workers, que mapeiam os arquivos em memória.
+BUSCA_RECEITAS_DIR = Path(os.environ.get('BUSCA_RECEITAS_DIR', BASE_DIR / 'indices'))
+BUSCA_RECEITAS_DIMENSOES = int(os.environ.get('BUSCA_RECEITAS_DIMENSOES', 512))
+
+# Métricas em /metrics (ver core/metricas.py). Com vários processos, defina
+# PROMETHEUS_MULTIPROC_DIR no ambiente para que os valores sejam somados.
+
+METRICAS_ATIVAS = os.environ.get('METRICAS_ATIVAS', 'True') == 'True'
+# Quem pode ler /metrics: os IPs (REMOTE_ADDR) listados ou, se definido, quem
+# enviar "Authorization: Bearer <METRICAS_TOKEN>" (configurável no Prometheus)
+METRICAS_IPS = os.environ.get('METRICAS_IPS', '127.0.0.1,::1').split(',')
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
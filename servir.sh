@@ -0,0 +1,28 @@
+#!/bin/sh
+# Sobe a aplicação conforme SERVIDOR:
+#   dev  - runserver do Django (padrão), com recarga automática
+#   wsgi - gunicorn com workers gthread (luiggis/gunicorn.conf.py)
+#   asgi - gunicorn com workers do uvicorn, para o streaming e as views assíncronas
+set -e
+
+case "${SERVIDOR:-dev}" in
+    dev)
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+    wsgi|asgi)
+        python manage.py collectstatic --noinput --verbosity 0
+        if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+            # Os valores de execuções anteriores não podem ser somados aos novos
+            rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+            mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+        fi
+        if [ "$SERVIDOR" = asgi ]; then
+            exec gunicorn luiggis.asgi:application --config luiggis/gunicorn.conf.py
+        fi
+        exec gunicorn luiggis.wsgi:application --config luiggis/gunicorn.conf.py
+        ;;
+    *)
+        echo "SERVIDOR deve ser dev, wsgi ou asgi (recebido: $SERVIDOR)" >&2
+        exit 1
+        ;;
+esac